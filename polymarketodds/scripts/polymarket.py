@@ -3,6 +3,7 @@
 # requires-python = ">=3.10"
 # dependencies = [
 #     "requests>=2.28.0",
+#     "numpy>=1.24",
 # ]
 # ///
 """
@@ -17,18 +18,37 @@ Enhanced with:
 """
 
 import argparse
+import hashlib
+import heapq
 import json
+import math
 import os
 import re
+import sqlite3
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BASE_URL = "https://gamma-api.polymarket.com"
 DATA_DIR = Path.home() / ".polymarket"
+HTTP_CACHE_DIR = DATA_DIR / "http_cache"
+HTTP_CACHE_TTL = 60  # Seconds; 0 disables the response cache (--no-cache)
+HTTP_CACHE_MAX_AGE = 3600  # Older cache files are pruned
+HTTP_POOL_SIZE = 16
+SLUG_BATCH_SIZE = 20  # Slugs per /events request
+MAX_CONCURRENT_FETCHES = 8
+
+_session = None
+_cache_pruned = False
 
 
 def ensure_data_dir():
@@ -54,12 +74,113 @@ def save_json(filename: str, data):
     path.write_text(json.dumps(data, indent=2, default=str))
 
 
-def fetch(endpoint: str, params: dict = None) -> dict:
-    """Fetch from Gamma API."""
+def get_session() -> requests.Session:
+    """Shared keep-alive session; retries 429/5xx with exponential backoff."""
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=4,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+        _session = requests.Session()
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+        _session.headers.update({"Accept": "application/json", "User-Agent": "polymarket-skill"})
+    return _session
+
+
+def _cache_path(endpoint: str, params: dict = None) -> Path:
+    """Cache file for an endpoint + params (order-independent)."""
+    key = json.dumps([endpoint, sorted((params or {}).items())], default=str)
+    return HTTP_CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+
+def _prune_http_cache():
+    """Drop cache files past HTTP_CACHE_MAX_AGE (once per process)."""
+    global _cache_pruned
+    if _cache_pruned:
+        return
+    _cache_pruned = True
+    cutoff = time.time() - HTTP_CACHE_MAX_AGE
+    for path in HTTP_CACHE_DIR.glob("*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def fetch(endpoint: str, params: dict = None, ttl: float = None) -> dict:
+    """Fetch from Gamma API, reusing responses younger than `ttl` seconds."""
+    ttl = HTTP_CACHE_TTL if ttl is None else ttl
+    path = _cache_path(endpoint, params)
+    if ttl > 0:
+        try:
+            if time.time() - path.stat().st_mtime < ttl:
+                return json.loads(path.read_text())
+        except (OSError, ValueError):
+            pass
+
     url = f"{BASE_URL}{endpoint}"
-    resp = requests.get(url, params=params, timeout=30)
+    resp = get_session().get(url, params=params, timeout=30)
     resp.raise_for_status()
-    return resp.json()
+    data = resp.json()
+
+    if ttl > 0:
+        try:
+            HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(data))
+            tmp.replace(path)
+            _prune_http_cache()
+        except OSError:
+            pass
+    return data
+
+
+def fetch_events_by_slug(slugs: list, ttl: int = None) -> dict:
+    """
+    Resolve many event slugs at once: deduped, SLUG_BATCH_SIZE slugs per
+    /events request (repeated `slug` params), batches fetched concurrently.
+    Slugs a batch didn't return are retried one by one. Returns slug -> Event;
+    slugs that can't be found or fetched are left out.
+    """
+    slugs = list(dict.fromkeys(s for s in slugs if s))
+    if not slugs:
+        return {}
+
+    def fetch_batch(batch):
+        try:
+            data = fetch('/events', {'slug': batch}, ttl=ttl)
+        except requests.RequestException:
+            return []
+        return data if isinstance(data, list) else [data]
+
+    def fetch_one(slug):
+        try:
+            data = fetch('/events', {'slug': slug}, ttl=ttl)
+        except requests.RequestException:
+            return []
+        return (data if isinstance(data, list) else [data])[:1]
+
+    events = {}
+    batches = [slugs[i:i + SLUG_BATCH_SIZE] for i in range(0, len(slugs), SLUG_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_FETCHES, len(slugs))) as pool:
+        for data in pool.map(fetch_batch, batches):
+            for event in data:
+                if event and event.get('slug') in slugs and event['slug'] not in events:
+                    events[event['slug']] = Event(event)
+
+        missing = [s for s in slugs if s not in events]
+        for slug, data in zip(missing, pool.map(fetch_one, missing)):
+            if data and data[0]:
+                events[slug] = Event(data[0])
+    return events
 
 
 def format_price(price) -> str:
@@ -146,139 +267,754 @@ def extract_slug_from_url(url_or_slug: str) -> str:
     return url_or_slug
 
 
-def get_market_price(market: dict) -> float:
-    """Get current Yes price from market."""
-    prices = market.get('outcomePrices')
-    if prices:
-        if isinstance(prices, str):
-            try:
-                prices = json.loads(prices)
-            except:
-                return 0
-        if prices and len(prices) >= 1:
-            try:
-                return float(prices[0])
-            except:
-                pass
-    return 0
+# ==================== MODEL ====================
+
+def _float(value, default=None):
+    """API number (often sent as a string) as a float, or `default`."""
+    if value is None or value == '':
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _json_list(value) -> list:
+    """API list field, which may arrive JSON-encoded as a string."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return value if isinstance(value, list) else []
 
 
-def format_market(market: dict, verbose: bool = False) -> str:
+def parse_iso(timestamp: str):
+    """ISO timestamp as an aware datetime (UTC unless it says otherwise), or None."""
+    if not timestamp:
+        return None
+    try:
+        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class Market:
+    """One market (outcome) of an event, with its numbers parsed once."""
+    __slots__ = (
+        'id', 'question', 'name', 'slug', 'outcomes', 'prices', 'price',
+        'day_change', 'week_change', 'month_change', 'best_bid', 'best_ask',
+        'volume', 'volume24hr', 'liquidity', 'end_date', 'active', 'raw',
+    )
+
+    def __init__(self, data: dict):
+        self.raw = data
+        self.id = str(data.get('id', ''))
+        self.question = data.get('question') or data.get('title') or ''
+        self.name = data.get('groupItemTitle') or ''
+        self.slug = data.get('slug') or data.get('market_slug') or ''
+        self.outcomes = _json_list(data.get('outcomes'))
+        self.prices = tuple(_float(p, 0.0) for p in _json_list(data.get('outcomePrices')))
+        self.price = self.prices[0] if self.prices else 0  # Yes price
+        self.day_change = _float(data.get('oneDayPriceChange'))
+        self.week_change = _float(data.get('oneWeekPriceChange'))
+        self.month_change = _float(data.get('oneMonthPriceChange'))
+        self.best_bid = _float(data.get('bestBid'))
+        self.best_ask = _float(data.get('bestAsk'))
+        self.volume = _float(data.get('volumeNum')) or _float(data.get('volume'), 0.0)
+        self.volume24hr = _float(data.get('volume24hr'), 0.0)
+        self.liquidity = _float(data.get('liquidityNum')) or _float(data.get('liquidity'), 0.0)
+        self.end_date = data.get('endDate') or data.get('endDateIso') or ''
+        self.active = data.get('active', True)
+
+
+class Event:
+    """An event and its markets, parsed once, with an outcome-name index."""
+    __slots__ = (
+        'id', 'slug', 'title', 'description', 'end_date', 'end', 'volume',
+        'volume24hr', 'liquidity', 'tags', 'markets', 'outcome_index', 'raw',
+    )
+
+    def __init__(self, data: dict):
+        self.raw = data
+        self.id = str(data.get('id', ''))
+        self.slug = data.get('slug') or ''
+        self.title = data.get('title') or ''
+        self.description = data.get('description') or ''
+        self.end_date = data.get('endDate') or ''
+        self.end = parse_iso(self.end_date)
+        self.volume = _float(data.get('volume'), 0.0)
+        self.volume24hr = _float(data.get('volume24hr'), 0.0)
+        self.liquidity = _float(data.get('liquidity'), 0.0)
+        self.tags = [(t.get('label') or '').lower() for t in data.get('tags') or []]
+        self.markets = [Market(m) for m in data.get('markets') or []]
+        # Lowercase outcome name -> market (first market wins on duplicates)
+        self.outcome_index = {}
+        for m in self.markets:
+            if m.name:
+                self.outcome_index.setdefault(m.name.lower(), m)
+
+    def find_outcome(self, outcome: str):
+        """Market for an outcome name: exact (case-insensitive), else substring."""
+        key = outcome.lower()
+        market = self.outcome_index.get(key)
+        if market is None:
+            market = next((m for name, m in self.outcome_index.items() if key in name), None)
+        return market
+
+    def lead_market(self):
+        """Market with the highest Yes price."""
+        return max(self.markets, key=lambda m: m.price, default=None)
+
+
+def parse_events(data) -> list:
+    """Event models for an /events response (a list or a single event)."""
+    if not data:
+        return []
+    return [Event(e) for e in (data if isinstance(data, list) else [data]) if e]
+
+
+def format_market(market: Market, verbose: bool = False) -> str:
     """Format a single market for display."""
     lines = []
     
-    question = market.get('question') or market.get('title', 'Unknown')
+    question = market.question or 'Unknown'
     lines.append(f"📊 **{question}**")
     
-    prices = market.get('outcomePrices')
-    if prices:
-        if isinstance(prices, str):
-            try:
-                prices = json.loads(prices)
-            except:
-                prices = None
+    prices = market.prices
+    if len(prices) >= 2:
+        yes_price = format_price(prices[0])
+        no_price = format_price(prices[1])
         
-        if prices and len(prices) >= 2:
-            yes_price = format_price(prices[0])
-            no_price = format_price(prices[1])
-            
-            day_change = format_change(market.get('oneDayPriceChange'))
-            change_str = f" ({day_change})" if day_change else ""
-            
-            lines.append(f"   Yes: {yes_price}{change_str} | No: {no_price}")
+        day_change = format_change(market.day_change)
+        change_str = f" ({day_change})" if day_change else ""
+        
+        lines.append(f"   Yes: {yes_price}{change_str} | No: {no_price}")
     
-    bid = market.get('bestBid')
-    ask = market.get('bestAsk')
+    bid = market.best_bid
+    ask = market.best_ask
     if bid is not None and ask is not None:
-        spread = float(ask) - float(bid)
+        spread = ask - bid
         if spread > 0:
             lines.append(f"   Spread: {spread*100:.1f}% (Bid: {format_price(bid)} / Ask: {format_price(ask)})")
     
-    volume = market.get('volume') or market.get('volumeNum')
-    if volume:
-        vol_str = f"   Volume: {format_volume(volume)}"
-        vol_24h = market.get('volume24hr')
-        if vol_24h and float(vol_24h) > 0:
-            vol_str += f" (24h: {format_volume(vol_24h)})"
+    if market.volume:
+        vol_str = f"   Volume: {format_volume(market.volume)}"
+        if market.volume24hr > 0:
+            vol_str += f" (24h: {format_volume(market.volume24hr)})"
         lines.append(vol_str)
     
-    end_date = market.get('endDate') or market.get('endDateIso')
-    time_left = format_time_remaining(end_date)
+    time_left = format_time_remaining(market.end_date)
     if time_left:
         lines.append(f"   ⏰ {time_left}")
     
     if verbose:
-        week_change = format_change(market.get('oneWeekPriceChange'))
-        month_change = format_change(market.get('oneMonthPriceChange'))
+        week_change = format_change(market.week_change)
+        month_change = format_change(market.month_change)
         if week_change or month_change:
             lines.append(f"   📈 1w: {week_change or 'N/A'} | 1m: {month_change or 'N/A'}")
         
-        liquidity = market.get('liquidityNum') or market.get('liquidity')
-        if liquidity:
-            lines.append(f"   💧 Liquidity: {format_volume(liquidity)}")
+        if market.liquidity:
+            lines.append(f"   💧 Liquidity: {format_volume(market.liquidity)}")
     
-    slug = market.get('slug') or market.get('market_slug')
-    if slug:
-        lines.append(f"   🔗 polymarket.com/event/{slug}")
+    if market.slug:
+        lines.append(f"   🔗 polymarket.com/event/{market.slug}")
     
     return '\n'.join(lines)
 
 
-def format_event(event: dict, show_all_markets: bool = False) -> str:
+def format_event(event: Event, show_all_markets: bool = False) -> str:
     """Format an event with its markets."""
     lines = []
     
-    title = event.get('title', 'Unknown Event')
+    title = event.title or 'Unknown Event'
     lines.append(f"🎯 **{title}**")
     
-    volume = event.get('volume')
-    if volume:
-        vol_str = f"   Volume: {format_volume(volume)}"
-        vol_24h = event.get('volume24hr')
-        if vol_24h and float(vol_24h) > 0:
-            vol_str += f" (24h: {format_volume(vol_24h)})"
+    if event.volume:
+        vol_str = f"   Volume: {format_volume(event.volume)}"
+        if event.volume24hr > 0:
+            vol_str += f" (24h: {format_volume(event.volume24hr)})"
         lines.append(vol_str)
     
-    end_date = event.get('endDate')
-    time_left = format_time_remaining(end_date)
+    time_left = format_time_remaining(event.end_date)
     if time_left:
         lines.append(f"   ⏰ {time_left}")
     
-    markets = event.get('markets', [])
-    if markets:
-        market_prices = []
-        for m in markets:
-            yes_price = get_market_price(m)
-            if not m.get('active', True) and m.get('volumeNum', 0) == 0:
-                continue
-            market_prices.append((m, yes_price))
-        
-        market_prices.sort(key=lambda x: x[1], reverse=True)
+    if event.markets:
+        shown = [m for m in event.markets if m.active or m.volume]
+        shown.sort(key=lambda m: m.price, reverse=True)
         
-        lines.append(f"   Markets: {len(market_prices)}")
+        lines.append(f"   Markets: {len(shown)}")
         
-        display_count = len(market_prices) if show_all_markets else min(10, len(market_prices))
-        for m, price in market_prices[:display_count]:
-            name = m.get('groupItemTitle') or m.get('question', '')[:40]
-            vol = m.get('volumeNum', 0)
-            day_change = format_change(m.get('oneDayPriceChange'))
+        display_count = len(shown) if show_all_markets else min(10, len(shown))
+        for m in shown[:display_count]:
+            name = m.name or m.question[:40]
+            day_change = format_change(m.day_change)
             change_str = f" {day_change}" if day_change else ""
             
-            if price > 0:
-                lines.append(f"   • {name}: {format_price(price)}{change_str} ({format_volume(vol)})")
+            if m.price > 0:
+                lines.append(f"   • {name}: {format_price(m.price)}{change_str} ({format_volume(m.volume)})")
             else:
                 lines.append(f"   • {name}")
         
-        if len(market_prices) > display_count:
-            lines.append(f"   ... and {len(market_prices) - display_count} more")
+        if len(shown) > display_count:
+            lines.append(f"   ... and {len(shown) - display_count} more")
     
-    slug = event.get('slug')
+    slug = event.slug
     if slug:
         lines.append(f"   🔗 polymarket.com/event/{slug}")
     
     return '\n'.join(lines)
 
 
+# ==================== CATALOG ====================
+
+CATALOG_FILE = DATA_DIR / "catalog.db"
+CATALOG_TTL = 300  # Seconds before search triggers an incremental sync
+CATALOG_FULL_SYNC = 24 * 3600  # Full resync (drops events that vanished) at least this often
+SYNC_PAGE_SIZE = 500
+SYNC_OVERLAP = 600  # Seconds re-read before the last watermark
+CATALOG_SCHEMA = 1  # Bump to rebuild the local catalog on the next sync
+
+# Index fields: slug, title, market questions/outcomes/tags, description,
+# and broader terms added by synonym expansion
+FIELD_SLUG, FIELD_TITLE, FIELD_QUESTION, FIELD_DESCRIPTION, FIELD_EXPANDED = range(5)
+FIELD_WEIGHTS = {FIELD_SLUG: 3.0, FIELD_TITLE: 3.0, FIELD_QUESTION: 1.5, FIELD_DESCRIPTION: 0.4, FIELD_EXPANDED: 0.6}
+
+# Ranking: BM25F over the fields above, then blended with volume
+BM25_K1 = 1.2
+BM25_B = 0.75
+VOLUME_BLEND = 0.3  # Score multiplier of 1 + VOLUME_BLEND * log10(1 + volume) / 7 ($10M -> x1.3)
+FUZZY_MIN_SIMILARITY = 0.4  # Trigram Jaccard similarity for typo matches
+FUZZY_MAX_TERMS = 3  # Vocabulary terms tried per unknown query term
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or the to will with "
+    "what who which before after this that than".split()
+)
+
+# Phrases and spellings folded into one term, for documents and queries alike
+SEARCH_PHRASES = {
+    'federal reserve': 'fed',
+    'interest rate': 'fed',
+    'interest rates': 'fed',
+    'next team': 'trade',
+}
+SEARCH_SYNONYMS = {
+    'btc': 'bitcoin', 'eth': 'ethereum', 'fomc': 'fed',
+    'won': 'win', 'wins': 'win', 'winner': 'win', 'winners': 'win', 'winning': 'win',
+    'champion': 'championship', 'champions': 'championship', 'finals': 'championship',
+    'traded': 'trade', 'trades': 'trade', 'destination': 'trade',
+    'presidential': 'president', 'elections': 'election',
+}
+# Broader terms indexed alongside a term (a Bitcoin market is also a crypto market)
+SEARCH_BROADER = {
+    'bitcoin': ['crypto'], 'ethereum': ['crypto'], 'solana': ['crypto'],
+    'president': ['election'], 'vote': ['election'],
+    'nba': ['basketball'], 'nfl': ['football'], 'mlb': ['baseball'],
+    'nhl': ['hockey'], 'ncaa': ['college', 'tournament'],
+}
+
+_PHRASE_RE = re.compile(r"\b(" + "|".join(re.escape(p) for p in SEARCH_PHRASES) + r")\b")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    """Lowercase terms with phrases, spellings and synonyms folded together."""
+    text = _PHRASE_RE.sub(lambda m: SEARCH_PHRASES[m.group(1)], (text or '').lower())
+    return [SEARCH_SYNONYMS.get(t, t) for t in _TOKEN_RE.findall(text) if t not in STOPWORDS]
+
+
+def index_terms(event: dict) -> dict:
+    """(term, field) -> term frequency for one event."""
+    fields = {
+        FIELD_SLUG: (event.get('slug') or '').replace('-', ' '),
+        FIELD_TITLE: event.get('title') or '',
+        FIELD_QUESTION: ' '.join(
+            [m.get('question') or '' for m in event.get('markets', [])]
+            + [m.get('groupItemTitle') or '' for m in event.get('markets', [])]
+            + [t.get('label') or '' for t in event.get('tags') or []]
+        ),
+        FIELD_DESCRIPTION: event.get('description') or '',
+    }
+    counts = {}
+    expanded = {}
+    for field, text in fields.items():
+        for term in tokenize(text):
+            counts[(term, field)] = counts.get((term, field), 0) + 1
+            for broader in SEARCH_BROADER.get(term, ()):
+                expanded[broader] = expanded.get(broader, 0) + 1
+    for term, tf in expanded.items():
+        counts[(term, FIELD_EXPANDED)] = tf
+    return counts
+
+
+# Category -> keywords, matched as whole words (plural 's' allowed) in an
+# event's title and tag labels when the event is synced
+CATEGORIES = {
+    'politics': ['politics', 'election', 'trump', 'biden', 'congress', 'senate'],
+    'crypto': ['crypto', 'bitcoin', 'ethereum', 'btc', 'eth', 'solana'],
+    'sports': ['sports', 'nba', 'nfl', 'mlb', 'soccer', 'ufc', 'ncaa'],
+    'tech': ['tech', 'ai', 'apple', 'google', 'microsoft', 'openai'],
+    'entertainment': ['entertainment', 'movie', 'oscar', 'grammy'],
+    'science': ['science', 'space', 'nasa', 'climate'],
+    'business': ['business', 'fed', 'interest', 'stock', 'market', 'economy', 'recession'],
+}
+
+
+def category_pattern(categories: dict) -> re.Pattern:
+    """One regex for all categories; each match's group name is its category."""
+    return re.compile('|'.join(
+        rf"(?P<{name}>\b(?:{'|'.join(re.escape(k) for k in keywords)})s?\b)"
+        for name, keywords in categories.items()
+    ))
+
+
+_CATEGORY_RE = category_pattern(CATEGORIES)
+
+
+def categorize(event: dict, pattern: re.Pattern = _CATEGORY_RE) -> set:
+    """Categories an event belongs to, from its title and tag labels."""
+    text = ' '.join([event.get('title') or ''] + [t.get('label') or '' for t in event.get('tags') or []])
+    return {match.lastgroup for match in pattern.finditer(text.lower())}
+
+
+def trigrams(term: str) -> set:
+    """Padded character trigrams ('btc' -> '  b', ' bt', 'btc', 'tc ')."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Catalog:
+    """
+    Local copy of every open event with an inverted index over its text.
+
+    Synced from /events with paginated requests: the first sync (and one a
+    day after that) reads every open event; in between, only events updated
+    since the last sync are read, newest first, until the pages get older
+    than the watermark. Search runs against the index, without the network.
+
+    Term statistics for ranking are kept up to date on every write: document
+    frequency per term, token count per (event, field), and a trigram index
+    over the vocabulary for typo-tolerant lookups. Events are also indexed by
+    end time, so the resolution calendar is a range scan, and by category.
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = path or CATALOG_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                id TEXT PRIMARY KEY,
+                slug TEXT NOT NULL,
+                title TEXT,
+                end_date TEXT,
+                end_ts REAL,  -- end_date as Unix time
+                volume REAL,
+                volume24hr REAL,
+                updated_at TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS events_slug ON events (slug);
+            CREATE INDEX IF NOT EXISTS events_end ON events (end_ts);
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                event_id TEXT NOT NULL,
+                field INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, event_id, field)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_event ON postings (event_id);
+            CREATE TABLE IF NOT EXISTS field_lengths (
+                event_id TEXT NOT NULL,
+                field INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (event_id, field)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS terms (
+                term TEXT PRIMARY KEY,
+                df INTEGER NOT NULL  -- Events containing the term
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS trigrams (
+                gram TEXT NOT NULL,
+                term TEXT NOT NULL,
+                PRIMARY KEY (gram, term)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS categories (
+                category TEXT NOT NULL,
+                event_id TEXT NOT NULL,
+                PRIMARY KEY (category, event_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS categories_event ON categories (event_id);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        if int(self._meta('schema', 0)) < CATALOG_SCHEMA:
+            self._reset()
+
+    def _reset(self):
+        """Drop the local copy (rebuilt by the next, full, sync)."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        for table in ("events", "postings", "field_lengths", "terms", "trigrams", "categories", "meta"):
+            self.conn.execute(f"DELETE FROM {table}")
+        self._set_meta('schema', CATALOG_SCHEMA)
+        self.conn.execute("COMMIT")
+
+    # ---- meta ----
+
+    def _meta(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+    def last_sync(self) -> float:
+        return float(self._meta('last_sync', 0))
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    # ---- writes ----
+
+    def _upsert(self, event: dict):
+        event_id = str(event['id'])
+        end = parse_iso(event.get('endDate'))
+        self.conn.execute(
+            """
+            INSERT INTO events (id, slug, title, end_date, end_ts, volume, volume24hr, updated_at, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                slug = excluded.slug, title = excluded.title, end_date = excluded.end_date,
+                end_ts = excluded.end_ts, volume = excluded.volume, volume24hr = excluded.volume24hr,
+                updated_at = excluded.updated_at, data = excluded.data
+            """,
+            (
+                event_id, event.get('slug') or '', event.get('title'), event.get('endDate'),
+                end.timestamp() if end else None,
+                float(event.get('volume') or 0), float(event.get('volume24hr') or 0),
+                event.get('updatedAt'), json.dumps(event),
+            ),
+        )
+        self.conn.execute("DELETE FROM categories WHERE event_id = ?", (event_id,))
+        self.conn.executemany(
+            "INSERT INTO categories (category, event_id) VALUES (?, ?)",
+            [(category, event_id) for category in categorize(event)],
+        )
+        counts = index_terms(event)
+        old_terms = {row[0] for row in self.conn.execute(
+            "SELECT DISTINCT term FROM postings WHERE event_id = ?", (event_id,))}
+        new_terms = {term for term, _ in counts}
+        self._adjust_df({t: -1 for t in old_terms - new_terms})
+        self._adjust_df({t: 1 for t in new_terms - old_terms})
+
+        lengths = {}
+        for (_, field), tf in counts.items():
+            lengths[field] = lengths.get(field, 0) + tf
+        self.conn.execute("DELETE FROM postings WHERE event_id = ?", (event_id,))
+        self.conn.execute("DELETE FROM field_lengths WHERE event_id = ?", (event_id,))
+        self.conn.executemany(
+            "INSERT INTO postings (term, event_id, field, tf) VALUES (?, ?, ?, ?)",
+            [(term, event_id, field, tf) for (term, field), tf in counts.items()],
+        )
+        self.conn.executemany(
+            "INSERT INTO field_lengths (event_id, field, length) VALUES (?, ?, ?)",
+            [(event_id, field, length) for field, length in lengths.items()],
+        )
+
+    def _adjust_df(self, deltas: dict):
+        """Apply document-frequency changes; new terms enter the trigram index."""
+        if not deltas:
+            return
+        added = [t for t, d in deltas.items() if d > 0]
+        known = set()
+        for start in range(0, len(added), 500):
+            chunk = added[start:start + 500]
+            known.update(row[0] for row in self.conn.execute(
+                f"SELECT term FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk))
+        self.conn.executemany(
+            "INSERT INTO terms (term, df) VALUES (?, ?) ON CONFLICT (term) DO UPDATE SET df = df + excluded.df",
+            list(deltas.items()),
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO trigrams (gram, term) VALUES (?, ?)",
+            [(gram, term) for term in added if term not in known for gram in trigrams(term)],
+        )
+
+    def _delete(self, event_ids: list):
+        for start in range(0, len(event_ids), 500):
+            chunk = event_ids[start:start + 500]
+            marks = ','.join('?' * len(chunk))
+            self._adjust_df({
+                term: -count for term, count in self.conn.execute(
+                    f"SELECT term, COUNT(DISTINCT event_id) FROM postings WHERE event_id IN ({marks}) GROUP BY term",
+                    chunk,
+                )
+            })
+            self.conn.execute(f"DELETE FROM postings WHERE event_id IN ({marks})", chunk)
+            self.conn.execute(f"DELETE FROM field_lengths WHERE event_id IN ({marks})", chunk)
+            self.conn.execute(f"DELETE FROM categories WHERE event_id IN ({marks})", chunk)
+            self.conn.execute(f"DELETE FROM events WHERE id IN ({marks})", chunk)
+
+    def _update_stats(self, vacuum: bool = False):
+        """Average field lengths for BM25; `vacuum` drops retired terms."""
+        averages = dict(self.conn.execute("SELECT field, AVG(length) FROM field_lengths GROUP BY field"))
+        self._set_meta('avg_lengths', json.dumps(averages))
+        if vacuum:
+            self.conn.execute("DELETE FROM terms WHERE df <= 0")
+            self.conn.execute("DELETE FROM trigrams WHERE term NOT IN (SELECT term FROM terms)")
+
+    def apply(self, events: list, full: bool = False) -> tuple:
+        """
+        Store a batch of fetched events in one transaction: open ones are
+        upserted, closed ones removed. `full` also removes every event that
+        wasn't in the batch. Returns (upserted, removed).
+        """
+        open_events = [e for e in events if e.get('id') is not None and not e.get('closed') and not e.get('archived')]
+        gone = [str(e['id']) for e in events if e.get('id') is not None and (e.get('closed') or e.get('archived'))]
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if full:
+                seen = {str(e['id']) for e in open_events}
+                gone = [row[0] for row in self.conn.execute("SELECT id FROM events") if row[0] not in seen]
+            for event in open_events:
+                self._upsert(event)
+            self._delete(gone)
+            self._update_stats(vacuum=full)
+            watermark = max((e.get('updatedAt') or '' for e in events), default='')
+            if watermark > self._meta('watermark', ''):
+                self._set_meta('watermark', watermark)
+            now = time.time()
+            self._set_meta('last_sync', now)
+            if full:
+                self._set_meta('last_full_sync', now)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return len(open_events), len(gone)
+
+    def sync(self, full: bool = None) -> tuple:
+        """
+        Bring the catalog up to date. Full when asked, when empty, or when the
+        last full sync is older than CATALOG_FULL_SYNC; incremental otherwise.
+        Returns (upserted, removed).
+        """
+        if full is None:
+            full = self.count() == 0 or time.time() - float(self._meta('last_full_sync', 0)) > CATALOG_FULL_SYNC
+        if full:
+            events = fetch_all_pages({'closed': 'false', 'order': 'id', 'ascending': 'true'})
+            return self.apply(events, full=True)
+
+        watermark = self._meta('watermark', '')
+        since = _shift_iso(watermark, -SYNC_OVERLAP) if watermark else ''
+        events = fetch_all_pages(
+            {'order': 'updatedAt', 'ascending': 'false'},
+            stop=lambda page: bool(since) and all((e.get('updatedAt') or '') < since for e in page),
+            concurrency=1,  # Usually a single page
+        )
+        return self.apply([e for e in events if (e.get('updatedAt') or '') >= since], full=False)
+
+    def ensure_fresh(self, max_age: float = CATALOG_TTL):
+        """Sync if the last sync is older than `max_age` seconds."""
+        if time.time() - self.last_sync() >= max_age:
+            self.sync()
+
+    # ---- reads ----
+
+    def get_events(self, event_ids: list) -> list:
+        """Events by id, in the given order."""
+        found = {}
+        for start in range(0, len(event_ids), 500):
+            chunk = event_ids[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT id, data FROM events WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            found.update((event_id, json.loads(data)) for event_id, data in rows)
+        return [found[i] for i in event_ids if i in found]
+
+    def get_by_slug(self, slug: str):
+        row = self.conn.execute("SELECT data FROM events WHERE slug = ?", (slug,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def in_category(self, category: str, limit: int = None):
+        """
+        Events in a category, by 24h volume. Known categories come from the
+        index; any other name is matched as a keyword over the catalog.
+        """
+        if category in CATEGORIES:
+            cursor = self.conn.execute(
+                """
+                SELECT e.data FROM categories c JOIN events e ON e.id = c.event_id
+                WHERE c.category = ? ORDER BY e.volume24hr DESC LIMIT ?
+                """,
+                (category, -1 if limit is None else limit),
+            )
+            for (data,) in cursor:
+                yield json.loads(data)
+            return
+        
+        pattern = category_pattern({'custom': [category]})
+        found = 0
+        for (data,) in self.conn.execute("SELECT data FROM events ORDER BY volume24hr DESC"):
+            event = json.loads(data)
+            if categorize(event, pattern):
+                yield event
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+    def categorized(self):
+        """(category, event) for every categorized event, by 24h volume: one pass for all digests."""
+        cursor = self.conn.execute(
+            "SELECT c.category, e.id, e.data FROM categories c JOIN events e ON e.id = c.event_id "
+            "ORDER BY e.volume24hr DESC, e.id"
+        )
+        parsed_id, parsed = None, None
+        for category, event_id, data in cursor:
+            if event_id != parsed_id:  # An event's categories come together
+                parsed_id, parsed = event_id, json.loads(data)
+            yield category, parsed
+
+    def count_ending(self, start: float, end: float) -> int:
+        """Number of events ending between two Unix times."""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM events WHERE end_ts BETWEEN ? AND ?", (start, end)
+        ).fetchone()[0]
+
+    def ending(self, start: float, end: float, limit: int = None):
+        """Events ending between two Unix times, soonest first, yielded as they're read."""
+        cursor = self.conn.execute(
+            "SELECT data FROM events WHERE end_ts BETWEEN ? AND ? ORDER BY end_ts, id LIMIT ?",
+            (start, end, -1 if limit is None else limit),
+        )
+        for (data,) in cursor:
+            yield json.loads(data)
+
+    def _query_terms(self, query: str) -> dict:
+        """
+        Query term -> weight (1.0). Terms not in the vocabulary are swapped
+        for up to FUZZY_MAX_TERMS similar ones, weighted by trigram similarity.
+        """
+        weights = {}
+        for term in dict.fromkeys(tokenize(query)):
+            if self.conn.execute("SELECT 1 FROM terms WHERE term = ? AND df > 0", (term,)).fetchone():
+                weights[term] = 1.0
+                continue
+            grams = trigrams(term)
+            rows = self.conn.execute(
+                f"""
+                SELECT g.term, COUNT(*) FROM trigrams g JOIN terms t ON t.term = g.term AND t.df > 0
+                WHERE g.gram IN ({','.join('?' * len(grams))}) GROUP BY g.term
+                """,
+                list(grams),
+            ).fetchall()
+            # Jaccard over trigram sets; a term of length n has n + 1 padded trigrams
+            similar = sorted(
+                ((shared / (len(grams) + len(candidate) + 1 - shared), candidate) for candidate, shared in rows),
+                reverse=True,
+            )
+            for similarity, candidate in similar[:FUZZY_MAX_TERMS]:
+                if similarity >= FUZZY_MIN_SIMILARITY:
+                    weights[candidate] = max(weights.get(candidate, 0), similarity)
+        return weights
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """
+        Events ranked by BM25F over slug, title, questions and description
+        (slug/title boosted), with typo-tolerant term matching, blended with
+        volume. All statistics come from the prebuilt index.
+        """
+        weights = self._query_terms(query)
+        if not weights:
+            return []
+
+        total = max(self.count(), 1)
+        dfs = dict(self.conn.execute(
+            f"SELECT term, df FROM terms WHERE term IN ({','.join('?' * len(weights))})", list(weights)))
+        averages = {int(f): v for f, v in json.loads(self._meta('avg_lengths', '{}')).items()}
+        # Query term weight = idf x fuzzy similarity
+        query_rows = [
+            (term, weight * math.log(1 + (total - dfs[term] + 0.5) / (dfs[term] + 0.5)))
+            for term, weight in weights.items() if dfs.get(term, 0) > 0
+        ]
+        if not query_rows:
+            return []
+
+        field_weight = ' '.join(f"WHEN {f} THEN {w}" for f, w in FIELD_WEIGHTS.items())
+        field_avg = ' '.join(f"WHEN {f} THEN {max(averages.get(f, 1.0), 1.0)}" for f in FIELD_WEIGHTS)
+        rows = self.conn.execute(
+            f"""
+            WITH q(term, weight) AS (VALUES {','.join('(?, ?)' for _ in query_rows)}),
+            per_term AS (
+                SELECT p.event_id, q.weight,
+                       SUM((CASE p.field {field_weight} END) * p.tf
+                           / (1 - {BM25_B} + {BM25_B} * l.length / (CASE p.field {field_avg} END))) AS tf
+                FROM q
+                JOIN postings p ON p.term = q.term
+                JOIN field_lengths l ON l.event_id = p.event_id AND l.field = p.field
+                GROUP BY p.event_id, q.term
+            )
+            SELECT t.event_id, SUM(t.weight * t.tf * ({BM25_K1} + 1) / ({BM25_K1} + t.tf)) AS score, e.volume
+            FROM per_term t JOIN events e ON e.id = t.event_id
+            GROUP BY t.event_id
+            """,
+            [value for row in query_rows for value in row],
+        ).fetchall()
+
+        ranked = sorted(
+            rows,
+            key=lambda r: r[1] * (1 + VOLUME_BLEND * math.log10(1 + max(r[2] or 0, 0)) / 7),
+            reverse=True,
+        )
+        return self.get_events([r[0] for r in ranked[:limit]])
+
+
+def _shift_iso(timestamp: str, seconds: float) -> str:
+    """Shift an ISO timestamp, keeping the API's format (UTC, Z suffix)."""
+    try:
+        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00')) + timedelta(seconds=seconds)
+    except ValueError:
+        return ''
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
+
+
+def fetch_all_pages(
+    params: dict,
+    stop=None,
+    page_size: int = SYNC_PAGE_SIZE,
+    concurrency: int = MAX_CONCURRENT_FETCHES,
+    endpoint: str = '/events',
+) -> list:
+    """
+    Every page of `endpoint` for `params`, fetched `concurrency` pages at a
+    time until a short page (or one for which `stop(page)` is true).
+    """
+    events = []
+    offset = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            offsets = [offset + i * page_size for i in range(concurrency)]
+            pages = pool.map(
+                lambda o: fetch(endpoint, {**params, 'limit': page_size, 'offset': o}, ttl=0),
+                offsets,
+            )
+            for page in pages:
+                events.extend(page)
+                if len(page) < page_size or (stop and stop(page)):
+                    return events
+            offset = offsets[-1] + page_size
+
+
 # ==================== ORIGINAL COMMANDS ====================
 
 def cmd_trending(args):
@@ -294,7 +1030,7 @@ def cmd_trending(args):
     
     print(f"🔥 **Trending on Polymarket**\n")
     
-    for event in data:
+    for event in parse_events(data):
         print(format_event(event))
         print()
 
@@ -321,115 +1057,57 @@ def cmd_featured(args):
         data = fetch('/events', params)
         print("(Showing highest volume markets)\n")
     
-    for event in data:
+    for event in parse_events(data):
         print(format_event(event))
         print()
 
 
-def expand_query(query: str) -> list:
-    """Expand query with synonyms and variations."""
-    query = query.lower().strip()
-    expansions = set([query])
-    words = query.split()
-    
-    # Synonym mappings
-    synonyms = {
-        'championship': ['champion', 'winner', 'tournament', 'title', 'finals'],
-        'trade': ['traded', 'next team', 'destination', 'move'],
-        'win': ['winner', 'won', 'wins', 'winning'],
-        'election': ['president', 'presidential', 'vote'],
-        'fed': ['federal reserve', 'interest rate', 'fomc'],
-        'bitcoin': ['btc', 'crypto'],
-        'btc': ['bitcoin', 'crypto'],
-        'ethereum': ['eth', 'crypto'],
-        'eth': ['ethereum', 'crypto'],
-    }
-    
-    sport_leagues = {
-        'nba': ['basketball'], 'nfl': ['football'], 'mlb': ['baseball'],
-        'nhl': ['hockey'], 'ncaa': ['college', 'tournament'],
-    }
-    
-    for key, values in synonyms.items():
-        if key in query:
-            for v in values:
-                expansions.add(query.replace(key, v))
-                expansions.add(v)
+def open_catalog(sync: bool = True) -> Catalog:
+    """Catalog, synced if stale; falls back to the local copy when offline."""
+    catalog = Catalog()
+    if sync:
+        try:
+            catalog.ensure_fresh()
+        except requests.RequestException as e:
+            if not catalog.count():
+                raise
+            print(f"⚠️ Catalog sync failed, using local copy: {e}", file=sys.stderr)
+    return catalog
+
+
+def cmd_search(args):
+    """Search the local market catalog."""
+    catalog = open_catalog()
+    
+    slug_guess = extract_slug_from_url(args.query.lower().strip()).replace(' ', '-')
+    exact = catalog.get_by_slug(slug_guess)
+    if exact:
+        print(f"🔍 **Found: '{args.query}'**\n")
+        print(format_event(Event(exact), show_all_markets=args.all))
+        print()
+        return
     
-    for league, sports in sport_leagues.items():
-        if league in query:
-            for s in sports:
-                expansions.add(query.replace(league, s))
+    matches = catalog.search(args.query, limit=args.limit)
     
-    if len(words) >= 2:
-        for word in words:
-            if len(word) >= 3:
-                expansions.add(word)
+    print(f"🔍 **Search: '{args.query}'**\n")
     
-    expansions.add(query.replace(' ', '-'))
+    if not matches:
+        print("No markets found.")
+        return
     
-    return list(expansions)
+    for event in parse_events(matches):
+        print(format_event(event, show_all_markets=args.all))
+        print()
 
 
-def cmd_search(args):
-    """Search markets with fuzzy matching."""
-    query = args.query.lower()
-    queries = expand_query(query)
-    
-    slug_guess = query.replace(' ', '-')
-    try:
-        data = fetch('/events', {'slug': slug_guess, 'closed': 'false'})
-        if data:
-            print(f"🔍 **Found: '{args.query}'**\n")
-            for event in data[:args.limit]:
-                print(format_event(event, show_all_markets=args.all))
-                print()
-            return
-    except:
-        pass
-    
-    try:
-        data = fetch('/events', {'closed': 'false', 'limit': 500})
-        matches = []
-        
-        for event in data:
-            slug = event.get('slug', '').lower()
-            title = event.get('title', '').lower()
-            desc = event.get('description', '').lower()
-            
-            found = False
-            for q in queries:
-                if q in slug or q in title or q in desc:
-                    matches.append(event)
-                    found = True
-                    break
-            
-            if found:
-                continue
-            
-            for m in event.get('markets', []):
-                mq = m.get('question', '').lower()
-                item = m.get('groupItemTitle', '').lower()
-                for q in queries:
-                    if q in mq or q in item:
-                        matches.append(event)
-                        found = True
-                        break
-                if found:
-                    break
-        
-        print(f"🔍 **Search: '{args.query}'**\n")
-        
-        if not matches:
-            print("No markets found.")
-            return
-        
-        for event in matches[:args.limit]:
-            print(format_event(event, show_all_markets=args.all))
-            print()
-            
-    except Exception as e:
-        print(f"Search error: {e}")
+def cmd_sync(args):
+    """Sync the local market catalog."""
+    catalog = Catalog()
+    full = args.full or None
+    started = time.time()
+    upserted, removed = catalog.sync(full=full)
+    print(f"✅ Catalog synced: {upserted} updated, {removed} removed, "
+          f"{catalog.count()} open events ({time.time() - started:.1f}s)")
 
 
 def cmd_event(args):
@@ -450,7 +1128,7 @@ def cmd_event(args):
                 print(f"❌ Event not found: {slug}")
                 return
         
-        event = data[0] if isinstance(data, list) and data else data
+        event = parse_events(data)[0]
         print(format_event(event, show_all_markets=True))
         
     except requests.HTTPError as e:
@@ -472,27 +1150,27 @@ def cmd_market(args):
             print(f"❌ Event not found: {slug}")
             return
         
-        event = data[0] if isinstance(data, list) else data
-        markets = event.get('markets', [])
+        event = parse_events(data)[0]
+        markets = event.markets
         
         if not outcome:
-            print(f"🎯 **{event.get('title')}**\n")
+            print(f"🎯 **{event.title}**\n")
             for m in markets:
                 print(format_market(m, verbose=True))
                 print()
             return
         
-        for m in markets:
-            name = m.get('groupItemTitle', '').lower()
-            question = m.get('question', '').lower()
-            if outcome in name or outcome in question:
-                print(format_market(m, verbose=True))
-                return
+        match = event.find_outcome(outcome)
+        if match is None:
+            match = next((m for m in markets if outcome in m.question.lower()), None)
+        if match:
+            print(format_market(match, verbose=True))
+            return
         
         print(f"❌ Outcome '{args.outcome}' not found")
         print(f"\nAvailable outcomes:")
         for m in markets[:15]:
-            name = m.get('groupItemTitle') or m.get('question', '')[:40]
+            name = m.name or m.question[:40]
             print(f"  • {name}")
                 
     except requests.HTTPError as e:
@@ -503,35 +1181,9 @@ def cmd_market(args):
 
 
 def cmd_category(args):
-    """Get markets by category."""
-    categories = {
-        'politics': ['politics', 'election', 'trump', 'biden', 'congress'],
-        'crypto': ['crypto', 'bitcoin', 'ethereum', 'btc', 'eth'],
-        'sports': ['sports', 'nba', 'nfl', 'mlb', 'soccer'],
-        'tech': ['tech', 'ai', 'apple', 'google', 'microsoft'],
-        'entertainment': ['entertainment', 'movie', 'oscar', 'grammy'],
-        'science': ['science', 'space', 'nasa', 'climate'],
-        'business': ['business', 'fed', 'interest', 'stock', 'market']
-    }
-    
-    tags = categories.get(args.category.lower(), [args.category.lower()])
-    
-    data = fetch('/events', {
-        'closed': 'false',
-        'limit': 100,
-        'order': 'volume24hr',
-        'ascending': 'false'
-    })
-    
-    matches = []
-    for event in data:
-        title = event.get('title', '').lower()
-        event_tags = [t.get('label', '').lower() for t in event.get('tags', [])]
-        
-        for tag in tags:
-            if tag in title or tag in ' '.join(event_tags):
-                matches.append(event)
-                break
+    """Get markets by category (from the local catalog's category index)."""
+    catalog = open_catalog()
+    matches = parse_events(list(catalog.in_category(args.category.lower(), limit=args.limit)))
     
     print(f"📁 **Category: {args.category.title()}**\n")
     
@@ -546,6 +1198,40 @@ def cmd_category(args):
 
 # ==================== NEW: WATCHLIST ====================
 
+def watched_market(w: dict, event: Event):
+    """The market a watchlist entry (or position) tracks: its outcome, else the first market."""
+    if w.get('outcome') and event.markets:
+        return event.find_outcome(w['outcome'])
+    return event.markets[0] if event.markets else None
+
+
+def watched_price(w: dict, event: Event) -> float:
+    """Current Yes price of the market a watchlist entry tracks (0 if not found)."""
+    market = watched_market(w, event)
+    return market.price if market else 0
+
+
+def check_alerts(w: dict, current_price: float) -> list:
+    """Triggered thresholds of a watchlist entry as [(kind, reason)]."""
+    triggered = []
+    added_price = w.get('added_price', 0)
+    change = current_price - added_price
+    
+    # Check alert_at threshold
+    if w.get('alert_at'):
+        if current_price >= w['alert_at']:
+            triggered.append(('alert_at', f"reached {format_price(current_price)} (threshold: {w['alert_at']*100:.0f}%)"))
+    
+    # Check alert_change threshold
+    if w.get('alert_change') and added_price > 0:
+        pct_change = abs(change) / added_price
+        if pct_change >= w['alert_change']:
+            direction = "up" if change > 0 else "down"
+            triggered.append(('alert_change', f"moved {direction} {format_change(change)} (threshold: ±{w['alert_change']*100:.0f}%)"))
+    
+    return triggered
+
+
 def cmd_watch(args):
     """Add/remove markets from watchlist."""
     watchlist = load_json('watchlist.json', {'markets': []})
@@ -559,27 +1245,25 @@ def cmd_watch(args):
             if not data:
                 print(f"❌ Event not found: {slug}")
                 return
-            event = data[0] if isinstance(data, list) else data
+            event = parse_events(data)[0]
         except:
             print(f"❌ Could not fetch event: {slug}")
             return
         
         # Get price from first market or specified outcome
         price = 0
-        market_name = event.get('title', slug)
-        markets = event.get('markets', [])
+        market_name = event.title or slug
+        markets = event.markets
         
         if args.outcome and markets:
-            for m in markets:
-                name = m.get('groupItemTitle', '').lower()
-                if args.outcome.lower() in name:
-                    price = get_market_price(m)
-                    market_name = m.get('groupItemTitle', market_name)
-                    break
+            m = event.find_outcome(args.outcome)
+            if m:
+                price = m.price
+                market_name = m.name
         elif markets:
-            price = get_market_price(markets[0])
+            price = markets[0].price
             if len(markets) == 1:
-                market_name = markets[0].get('question', market_name)
+                market_name = markets[0].question or market_name
         
         entry = {
             'slug': slug,
@@ -628,21 +1312,12 @@ def cmd_watch(args):
         
         print(f"👁️ **Watchlist** ({len(watchlist['markets'])} markets)\n")
         
+        events = fetch_events_by_slug([w['slug'] for w in watchlist['markets']])
         for w in watchlist['markets']:
             try:
-                data = fetch('/events', {'slug': w['slug']})
-                if data:
-                    event = data[0] if isinstance(data, list) else data
-                    markets = event.get('markets', [])
-                    
-                    current_price = 0
-                    if w.get('outcome') and markets:
-                        for m in markets:
-                            if w['outcome'].lower() in m.get('groupItemTitle', '').lower():
-                                current_price = get_market_price(m)
-                                break
-                    elif markets:
-                        current_price = get_market_price(markets[0])
+                event = events.get(w['slug'])
+                if event:
+                    current_price = watched_price(w, event)
                     
                     added_price = w.get('added_price', 0)
                     change = current_price - added_price
@@ -662,6 +1337,9 @@ def cmd_watch(args):
 
 def cmd_alerts(args):
     """Check watchlist for alerts (for cron jobs)."""
+    if args.daemon:
+        return cmd_alerts_daemon(args)
+    
     watchlist = load_json('watchlist.json', {'markets': []})
     
     if not watchlist['markets']:
@@ -670,51 +1348,23 @@ def cmd_alerts(args):
         return
     
     alerts = []
+    events = fetch_events_by_slug([w['slug'] for w in watchlist['markets']])
     
     for w in watchlist['markets']:
         try:
-            data = fetch('/events', {'slug': w['slug']})
-            if not data:
+            event = events.get(w['slug'])
+            if not event:
                 continue
             
-            event = data[0] if isinstance(data, list) else data
-            markets = event.get('markets', [])
-            
-            current_price = 0
-            if w.get('outcome') and markets:
-                for m in markets:
-                    if w['outcome'].lower() in m.get('groupItemTitle', '').lower():
-                        current_price = get_market_price(m)
-                        break
-            elif markets:
-                current_price = get_market_price(markets[0])
-            
-            added_price = w.get('added_price', 0)
-            change = current_price - added_price
-            
-            triggered = False
-            reason = ""
-            
-            # Check alert_at threshold
-            if w.get('alert_at'):
-                if current_price >= w['alert_at']:
-                    triggered = True
-                    reason = f"reached {format_price(current_price)} (threshold: {w['alert_at']*100:.0f}%)"
-            
-            # Check alert_change threshold
-            if w.get('alert_change') and added_price > 0:
-                pct_change = abs(change) / added_price
-                if pct_change >= w['alert_change']:
-                    triggered = True
-                    direction = "up" if change > 0 else "down"
-                    reason = f"moved {direction} {format_change(change)} (threshold: ±{w['alert_change']*100:.0f}%)"
+            current_price = watched_price(w, event)
+            triggered = check_alerts(w, current_price)
             
             if triggered:
                 alerts.append({
                     'name': w['name'],
                     'slug': w['slug'],
                     'price': current_price,
-                    'reason': reason,
+                    'reason': triggered[-1][1],
                 })
                 
         except Exception as e:
@@ -731,72 +1381,173 @@ def cmd_alerts(args):
         print("✅ No alerts triggered")
 
 
+ALERT_STATE_FILE = 'alert_state.json'
+DAEMON_INTERVAL = 60  # Seconds between polls of a quiet market
+DAEMON_FAST_INTERVAL = 10  # Seconds between polls of a market near an alert
+ALERT_COOLDOWN = 3600  # Min seconds between two firings of the same alert
+NEAR_ALERT_AT = 0.05  # Price points below alert_at that count as near
+NEAR_ALERT_CHANGE = 0.75  # Fraction of alert_change already moved that counts as near
+NEAR_RESOLUTION = 86400  # Seconds before endDate that count as near
+
+
+def watch_key(w: dict) -> str:
+    """Stable id of a watchlist entry (slug + outcome)."""
+    return f"{w['slug']}|{w.get('outcome') or ''}"
+
+
+def emit_event(name: str, **fields):
+    """Write one NDJSON event to stdout."""
+    record = {'event': name, 'time': datetime.now(timezone.utc).isoformat(timespec='seconds'), **fields}
+    print(json.dumps(record, default=str), flush=True)
+
+
+def is_near_alert(w: dict, price: float, end_date, now: float) -> bool:
+    """Whether a watched market deserves fast polling."""
+    if w.get('alert_at') and w['alert_at'] - NEAR_ALERT_AT <= price:
+        return True
+    added_price = w.get('added_price', 0)
+    if w.get('alert_change') and added_price > 0:
+        if abs(price - added_price) / added_price >= w['alert_change'] * NEAR_ALERT_CHANGE:
+            return True
+    # Only upcoming resolutions; an end date already passed stays on the normal interval
+    return end_date is not None and 0 <= end_date.timestamp() - now <= NEAR_RESOLUTION
+
+
+def cmd_alerts_daemon(args):
+    """
+    Watch the watchlist continuously and emit NDJSON alert events.
+    
+    Markets are polled in batches, every --fast-interval when near a threshold
+    or resolution and every --interval otherwise. Thresholds are only
+    re-evaluated when a price changes. An alert fires once when it triggers
+    (a `cleared` event follows when it stops holding) and not again within
+    --cooldown; fired state survives restarts in alert_state.json.
+    """
+    watchlist_path = DATA_DIR / 'watchlist.json'
+    state = load_json(ALERT_STATE_FILE, {})
+    watches = {}
+    watch_mtime = None
+    last_price = {}
+    next_poll = {}
+    pending = set()  # Triggered but held back by the cooldown
+    
+    while True:
+        try:
+            mtime = watchlist_path.stat().st_mtime if watchlist_path.exists() else None
+            if mtime != watch_mtime:
+                watch_mtime = mtime
+                entries = load_json('watchlist.json', {'markets': []})['markets']
+                watches = {watch_key(w): w for w in entries}
+                # Re-evaluate everything after an edit (fired state stays)
+                last_price.clear()
+                next_poll = {key: 0 for key in watches}
+                pending &= set(watches)
+                emit_event('watching', markets=len(watches))
+            
+            now = time.time()
+            # Poll everything due within half a fast tick together, in one batch
+            due = [k for k, t in next_poll.items() if t <= now + args.fast_interval / 2]
+            if due:
+                events = fetch_events_by_slug([watches[k]['slug'] for k in due], ttl=0)
+                state_changed = False
+                for key in due:
+                    w = watches[key]
+                    event = events.get(w['slug'])
+                    next_poll[key] = now + args.interval
+                    if not event:
+                        continue
+                    
+                    price = watched_price(w, event)
+                    if is_near_alert(w, price, event.end, now):
+                        next_poll[key] = now + args.fast_interval
+                    
+                    if price == last_price.get(key) and key not in pending:
+                        continue
+                    last_price[key] = price
+                    
+                    triggered = check_alerts(w, price)
+                    fired = state.get(key)
+                    if triggered:
+                        if fired and fired.get('active'):
+                            continue
+                        if fired and now - fired['fired_at'] < args.cooldown:
+                            pending.add(key)
+                            continue
+                        pending.discard(key)
+                        kind, reason = triggered[-1]
+                        state[key] = {'active': True, 'fired_at': now, 'price': price, 'reason': reason}
+                        state_changed = True
+                        emit_event('alert', slug=w['slug'], outcome=w.get('outcome'), market=w['name'],
+                                   kind=kind, price=price, reason=reason,
+                                   url=f"https://polymarket.com/event/{w['slug']}")
+                    else:
+                        pending.discard(key)
+                        if fired and fired.get('active'):
+                            fired['active'] = False
+                            state_changed = True
+                            emit_event('cleared', slug=w['slug'], outcome=w.get('outcome'), market=w['name'],
+                                       price=price)
+                
+                if state_changed:
+                    save_json(ALERT_STATE_FILE, {k: v for k, v in state.items() if k in watches})
+            
+            wake = min(next_poll.values(), default=time.time() + args.interval)
+            time.sleep(max(1.0, wake - time.time()))
+        except KeyboardInterrupt:
+            return
+
+
 # ==================== NEW: CALENDAR ====================
 
 def cmd_calendar(args):
-    """Show markets resolving soon."""
+    """Show markets resolving soon (from the local catalog's end-date index)."""
     days = args.days
-    
-    data = fetch('/events', {
-        'closed': 'false',
-        'limit': 200,
-        'order': 'endDate',
-        'ascending': 'true'
-    })
+    catalog = open_catalog()
     
     now = datetime.now(timezone.utc)
     cutoff = now + timedelta(days=days)
+    total = catalog.count_ending(now.timestamp(), cutoff.timestamp())
     
-    upcoming = []
-    for event in data:
-        end_date = event.get('endDate')
-        if not end_date:
-            continue
-        
-        try:
-            dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            if now <= dt <= cutoff:
-                upcoming.append((dt, event))
-        except:
-            continue
-    
-    upcoming.sort(key=lambda x: x[0])
+    print(f"📅 **Resolving in {days} days** ({total} markets)\n")
     
-    print(f"📅 **Resolving in {days} days** ({len(upcoming)} markets)\n")
-    
-    if not upcoming:
+    if not total:
         print("No markets resolving in this timeframe.")
         return
     
+    limit = None if args.all else args.limit
     current_date = None
-    for dt, event in upcoming[:args.limit]:
+    for data in catalog.ending(now.timestamp(), cutoff.timestamp(), limit=limit):
+        event = Event(data)
+        dt = event.end
         date_str = dt.strftime('%a %b %d')
         if date_str != current_date:
             current_date = date_str
             print(f"\n**{date_str}**")
         
-        title = event.get('title', 'Unknown')[:60]
-        vol = format_volume(event.get('volume', 0))
+        title = (event.title or 'Unknown')[:60]
+        vol = format_volume(event.volume)
         time_str = dt.strftime('%I:%M %p')
         
         # Get lead outcome
-        markets = event.get('markets', [])
+        top = event.lead_market()
         lead = ""
-        if markets:
-            sorted_markets = sorted(markets, key=lambda m: get_market_price(m), reverse=True)
-            if sorted_markets:
-                top = sorted_markets[0]
-                top_name = top.get('groupItemTitle', 'Yes')[:20]
-                top_price = get_market_price(top)
-                lead = f" → {top_name} {format_price(top_price)}"
+        if top:
+            top_name = (top.name or 'Yes')[:20]
+            lead = f" → {top_name} {format_price(top.price)}"
         
-        print(f"  {time_str} | {title}{lead} ({vol})")
+        print(f"  {time_str} | {title}{lead} ({vol})", flush=True)
+    
+    if limit is not None and total > limit:
+        print(f"\n... and {total - limit} more (--limit N or --all to see them)")
 
 
 # ==================== NEW: MOVERS ====================
 
 def cmd_movers(args):
     """Find biggest price movers."""
+    if args.window:
+        return cmd_movers_window(args)
+    
     timeframe = args.timeframe
     min_volume = args.min_volume * 1000 if args.min_volume else 10000
     
@@ -805,40 +1556,24 @@ def cmd_movers(args):
         'limit': 300,
     })
     
+    change_attr = {'1w': 'week_change', '1m': 'month_change'}.get(timeframe, 'day_change')
     movers = []
     
-    for event in data:
-        vol = float(event.get('volume24hr', 0) or 0)
+    for event in parse_events(data):
+        vol = event.volume24hr
         if vol < min_volume:
             continue
         
-        markets = event.get('markets', [])
-        for m in markets:
-            if timeframe == '24h':
-                change = m.get('oneDayPriceChange')
-            elif timeframe == '1w':
-                change = m.get('oneWeekPriceChange')
-            elif timeframe == '1m':
-                change = m.get('oneMonthPriceChange')
-            else:
-                change = m.get('oneDayPriceChange')
-            
-            if change is None:
-                continue
-            
-            try:
-                change_val = abs(float(change))
-            except:
-                continue
-            
-            if change_val > 0.01:  # At least 1% move
+        for m in event.markets:
+            change = getattr(m, change_attr)
+            if change is not None and abs(change) > 0.01:  # At least 1% move
                 movers.append({
-                    'event': event.get('title', ''),
-                    'market': m.get('groupItemTitle') or m.get('question', ''),
-                    'change': float(change),
-                    'price': get_market_price(m),
+                    'event': event.title,
+                    'market': m.name or m.question,
+                    'change': change,
+                    'price': m.price,
                     'volume': vol,
-                    'slug': event.get('slug', ''),
+                    'slug': event.slug,
                 })
     
     # Sort by absolute change
@@ -863,327 +1598,999 @@ def cmd_movers(args):
         print()
 
 
-# ==================== NEW: DIGEST ====================
+# ==================== NEW: RECORDER ====================
 
-def cmd_digest(args):
-    """Category digest with summary."""
-    category = args.category.lower()
-    
-    categories = {
-        'politics': ['politics', 'election', 'trump', 'biden', 'congress', 'senate'],
-        'crypto': ['crypto', 'bitcoin', 'ethereum', 'btc', 'eth', 'solana'],
-        'sports': ['sports', 'nba', 'nfl', 'mlb', 'soccer', 'ufc', 'ncaa'],
-        'tech': ['tech', 'ai', 'apple', 'google', 'microsoft', 'openai'],
-        'business': ['business', 'fed', 'interest', 'stock', 'economy', 'recession'],
-    }
+SERIES_DIR = DATA_DIR / "series"
+SERIES_REGISTRY = "markets.json"  # Market index -> id, slug, names
+SERIES_TICKS = "ticks.bin"  # Fixed-width rows, appended in time order
+RECORD_INTERVAL = 300  # Seconds
+# One row per market per snapshot in which anything changed (28 bytes):
+# the latest row at or before a time is the market's state at that time
+TICK_FIELDS = [
+    ('ts', '<u4'),          # Unix seconds
+    ('market', '<u4'),      # Index into the registry
+    ('price', '<f4'),       # Yes price
+    ('volume', '<f8'),      # Lifetime volume (differences give volume traded)
+    ('volume24hr', '<f4'),
+    ('liquidity', '<f4'),
+]
+
+_DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_duration(text: str) -> int:
+    """'15m', '4h', '2d', '90s' (or plain seconds) -> seconds."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*", text.lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid duration: {text!r} (use e.g. 15m, 4h, 2d)")
+    return int(float(match.group(1)) * _DURATION_UNITS.get(match.group(2) or 's'))
+
+
+def _numpy():
+    """numpy, needed only for recorded series."""
+    try:
+        import numpy
+    except ImportError:
+        print("❌ Recorded series need numpy: pip install numpy", file=sys.stderr)
+        sys.exit(1)
+    return numpy
+
+
+class SeriesStore:
+    """Append-only price/volume/liquidity history for every open market."""
+
+    def __init__(self, path: Path = None):
+        self.path = path or SERIES_DIR
+        self.np = _numpy()
+        self.dtype = self.np.dtype(TICK_FIELDS)
+        self.registry = []
+        self.index = {}
+        try:
+            self.registry = json.loads((self.path / SERIES_REGISTRY).read_text())
+        except (OSError, ValueError):
+            pass
+        self.index = {m['id']: i for i, m in enumerate(self.registry)}
+
+    def load(self):
+        """All rows as a structured array (memory-mapped, read-only)."""
+        ticks = self.path / SERIES_TICKS
+        if not ticks.exists() or ticks.stat().st_size < self.dtype.itemsize:
+            return self.np.zeros(0, dtype=self.dtype)
+        # A partially written last row (interrupted append) is ignored
+        count = ticks.stat().st_size // self.dtype.itemsize
+        return self.np.memmap(ticks, dtype=self.dtype, mode='r', shape=(count,))
+
+    def latest(self, rows, at: float = None):
+        """Last row per market at or before `at` (default: all rows)."""
+        np = self.np
+        if at is not None:
+            rows = rows[:np.searchsorted(rows['ts'], at, side='right')]
+        if len(rows) == 0:
+            return rows
+        reversed_markets = rows['market'][::-1]
+        _, first = np.unique(reversed_markets, return_index=True)
+        return rows[len(rows) - 1 - first]
+
+    def append(self, markets: list, now: float = None, previous=None):
+        """
+        Record one snapshot of `markets` (Gamma /markets objects), writing
+        rows only for markets whose price, volume or liquidity changed since
+        `previous` (the latest() rows). Returns the rows written.
+        """
+        np = self.np
+        now = int(now or time.time())
+        registry_changed = False
+        rows = []
+        for data in markets:
+            m = Market(data)
+            if m.id not in self.index:
+                events = data.get('events') or [{}]
+                self.index[m.id] = len(self.registry)
+                self.registry.append({
+                    'id': m.id,
+                    'slug': events[0].get('slug') or m.slug,
+                    'event': events[0].get('title') or '',
+                    'name': m.name or m.question,
+                })
+                registry_changed = True
+            rows.append((now, self.index[m.id], m.price, m.volume, m.volume24hr, m.liquidity))
+        if not rows:
+            return np.zeros(0, dtype=self.dtype)
+
+        snapshot = np.array(rows, dtype=self.dtype)
+        if previous is not None and len(previous):
+            last = np.full(len(self.registry), -1.0)
+            last_volume = np.full(len(self.registry), -1.0)
+            last_liquidity = np.full(len(self.registry), -1.0)
+            last[previous['market']] = previous['price']
+            last_volume[previous['market']] = previous['volume']
+            last_liquidity[previous['market']] = previous['liquidity']
+            idx = snapshot['market']
+            changed = (
+                (snapshot['price'] != last[idx].astype('<f4'))
+                | (snapshot['volume'] != last_volume[idx])
+                | (snapshot['liquidity'] != last_liquidity[idx].astype('<f4'))
+            )
+            snapshot = snapshot[changed]
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        if registry_changed:
+            tmp = self.path / f"{SERIES_REGISTRY}.tmp"
+            tmp.write_text(json.dumps(self.registry))
+            tmp.replace(self.path / SERIES_REGISTRY)
+        ticks = self.path / SERIES_TICKS
+        with open(ticks, 'ab') as f:
+            # Drop a torn row from an interrupted append so rows stay aligned
+            size = f.tell()
+            if size % self.dtype.itemsize:
+                f.truncate(size - size % self.dtype.itemsize)
+            snapshot.tofile(f)
+        return snapshot
+
+    def merge_latest(self, previous, written):
+        """latest() after appending `written`, without rereading the history."""
+        if previous is None or len(previous) == 0:
+            return self.latest(written)
+        return self.latest(self.np.concatenate([previous, written]))
+
+    def window(self, seconds: float, now: float = None):
+        """
+        Per-market state at the start and end of the last `seconds`, plus
+        realized volatility (root sum of squared price changes) in between.
+        Markets first recorded inside the window start from their first row.
+        Returns a dict of arrays indexed by market, or None without data.
+        """
+        np = self.np
+        rows = self.load()
+        if len(rows) == 0:
+            return None
+        now = now or float(rows['ts'][-1])
+        start = now - seconds
+        end_rows = self.latest(rows, now)
+        start_rows = self.latest(rows, start)
+
+        n = len(self.registry)
+        result = {name: np.full(n, np.nan) for name in ('price', 'start_price', 'volume', 'start_volume',
+                                                        'volume24hr', 'liquidity')}
+        result['price'][end_rows['market']] = end_rows['price']
+        result['volume'][end_rows['market']] = end_rows['volume']
+        result['volume24hr'][end_rows['market']] = end_rows['volume24hr']
+        result['liquidity'][end_rows['market']] = end_rows['liquidity']
+        _, first = np.unique(rows['market'], return_index=True)
+        for start_state in (rows[first], start_rows):
+            result['start_price'][start_state['market']] = start_state['price']
+            result['start_volume'][start_state['market']] = start_state['volume']
+
+        # Squared changes between consecutive rows of the same market inside
+        # the window (starting from the state at the window's start)
+        inside = rows[np.searchsorted(rows['ts'], start, side='right'):np.searchsorted(rows['ts'], now, side='right')]
+        variance = np.zeros(n)
+        if len(inside):
+            markets = np.concatenate([start_rows['market'], inside['market']])
+            prices = np.concatenate([start_rows['price'], inside['price']]).astype(float)
+            order = np.argsort(markets, kind='stable')
+            markets, prices = markets[order], prices[order]
+            same = markets[1:] == markets[:-1]
+            np.add.at(variance, markets[1:][same], np.diff(prices)[same] ** 2)
+        result['volatility'] = np.sqrt(variance)
+        result['first_ts'] = float(rows['ts'][0])
+        result['last_ts'] = now
+        result['covered'] = now - max(start, result['first_ts'])
+        return result
+
+
+def fetch_open_markets() -> list:
+    """Every open market, paginated concurrently."""
+    return fetch_all_pages({'closed': 'false', 'order': 'id', 'ascending': 'true'}, endpoint='/markets')
+
+
+def cmd_record(args):
+    """Snapshot every open market at a fixed interval."""
+    store = SeriesStore()
+    previous = store.latest(store.load())
+    interval = args.interval
+    
+    while True:
+        started = time.time()
+        try:
+            markets = fetch_open_markets()
+            written = store.append(markets, now=started, previous=previous)
+            previous = store.merge_latest(previous, written)
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] {len(markets)} markets, {len(written)} changed",
+                  file=sys.stderr, flush=True)
+        except requests.RequestException as e:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️ Snapshot failed: {e}", file=sys.stderr, flush=True)
+        
+        if args.once:
+            return
+        try:
+            time.sleep(max(0, interval - (time.time() - started)))
+        except KeyboardInterrupt:
+            return
+
+
+def _series_window(args):
+    """Window stats from the recorder, or None (with a hint) if there is no history."""
+    store = SeriesStore()
+    stats = store.window(args.window)
+    if stats is None:
+        print("No recorded history yet. Start the recorder with:")
+        print("  polymarket record --interval 5m")
+        return None, None
+    covered = stats['last_ts'] - stats['first_ts']
+    if covered < args.window:
+        print(f"⚠️ Only {covered / 3600:.1f}h recorded; window starts at the first snapshot\n")
+    return store, stats
+
+
+def _series_label(store, i: int) -> tuple:
+    """(display name, event slug) for market index i."""
+    m = store.registry[i]
+    name = m['name'] or m['event']
+    if len(name) > 50:
+        name = name[:47] + "..."
+    return name, m['slug']
+
+
+def cmd_movers_window(args):
+    """Biggest price moves over a recorded window."""
+    store, stats = _series_window(args)
+    if stats is None:
+        return
+    np = store.np
+    min_volume = args.min_volume * 1000 if args.min_volume else 10000
     
-    tags = categories.get(category, [category])
+    change = stats['price'] - stats['start_price']
+    eligible = ~np.isnan(change) & (np.abs(change) > 0.01) & (stats['volume24hr'] >= min_volume)
+    idx = np.flatnonzero(eligible)
+    idx = idx[np.argsort(-np.abs(change[idx]))][:args.limit]
     
-    data = fetch('/events', {
-        'closed': 'false',
-        'limit': 200,
-        'order': 'volume24hr',
-        'ascending': 'false'
-    })
+    print(f"📈 **Biggest Movers ({format_duration(args.window)}, recorded)**\n")
     
-    matches = []
-    for event in data:
-        title = event.get('title', '').lower()
-        desc = event.get('description', '').lower()
-        
-        for tag in tags:
-            if tag in title or tag in desc:
-                matches.append(event)
-                break
+    if len(idx) == 0:
+        print("No significant movers found.")
+        return
     
-    if not matches:
-        print(f"No markets found for '{category}'")
+    for i in idx:
+        name, slug = _series_label(store, i)
+        direction = "🟢" if change[i] > 0 else "🔴"
+        print(f"{direction} **{name}**")
+        print(f"   {change[i] * 100:+.1f}% → Now {format_price(stats['price'][i])} "
+              f"(Vol 24h: {format_volume(stats['volume24hr'][i])})")
+        print()
+
+
+def cmd_volatility(args):
+    """Most volatile markets over a recorded window."""
+    store, stats = _series_window(args)
+    if stats is None:
         return
+    np = store.np
+    min_volume = args.min_volume * 1000 if args.min_volume else 10000
     
-    # Calculate stats
-    total_volume = sum(float(e.get('volume', 0) or 0) for e in matches)
-    total_24h = sum(float(e.get('volume24hr', 0) or 0) for e in matches)
+    vol = stats['volatility']
+    eligible = (vol > 0) & (stats['volume24hr'] >= min_volume)
+    idx = np.flatnonzero(eligible)
+    idx = idx[np.argsort(-vol[idx])][:args.limit]
     
-    # Find biggest movers in category
-    movers = []
-    for event in matches:
-        for m in event.get('markets', []):
-            change = m.get('oneDayPriceChange')
-            if change:
-                try:
-                    movers.append({
-                        'name': m.get('groupItemTitle') or event.get('title', ''),
-                        'change': float(change),
-                        'price': get_market_price(m),
-                    })
-                except:
-                    pass
+    print(f"🌪️ **Most Volatile ({format_duration(args.window)}, recorded)**\n")
     
-    movers.sort(key=lambda x: abs(x['change']), reverse=True)
+    if len(idx) == 0:
+        print("No price activity in this window.")
+        return
     
-    # Find upcoming resolutions
-    now = datetime.now(timezone.utc)
-    week_out = now + timedelta(days=7)
-    upcoming = []
-    for event in matches:
-        end = event.get('endDate')
-        if end:
-            try:
-                dt = datetime.fromisoformat(end.replace('Z', '+00:00'))
-                if now <= dt <= week_out:
-                    upcoming.append((dt, event))
-            except:
-                pass
-    upcoming.sort(key=lambda x: x[0])
-    
-    # Print digest
+    for i in idx:
+        name, slug = _series_label(store, i)
+        net = stats['price'][i] - stats['start_price'][i]
+        net_str = f", net {net * 100:+.1f}%" if not np.isnan(net) else ""
+        print(f"• **{name}**")
+        print(f"   Volatility: {vol[i] * 100:.1f}%{net_str} → Now {format_price(stats['price'][i])}")
+        print()
+
+
+def cmd_spikes(args):
+    """Markets trading far above their usual volume."""
+    store, stats = _series_window(args)
+    if stats is None:
+        return
+    np = store.np
+    baseline_stats = store.window(args.baseline, now=stats['last_ts'])
+    
+    traded = stats['volume'] - stats['start_volume']
+    # Average volume per window-length over the (recorded part of the) baseline
+    usual = (baseline_stats['volume'] - baseline_stats['start_volume']) * stats['covered'] / max(baseline_stats['covered'], 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(usual > 0, traded / usual, np.inf)
+    min_traded = args.min_volume * 1000 if args.min_volume else 1000
+    eligible = ~np.isnan(traded) & (traded >= min_traded) & (ratio >= args.ratio)
+    idx = np.flatnonzero(eligible)
+    idx = idx[np.lexsort((-traded[idx], -np.nan_to_num(ratio[idx], posinf=1e12)))][:args.limit]
+    
+    print(f"🚀 **Volume Spikes ({format_duration(args.window)} vs {format_duration(args.baseline)} average)**\n")
+    
+    if len(idx) == 0:
+        print("No volume spikes found.")
+        return
+    
+    for i in idx:
+        name, slug = _series_label(store, i)
+        ratio_str = f"{ratio[i]:.1f}x usual" if np.isfinite(ratio[i]) else "new activity"
+        print(f"• **{name}**")
+        print(f"   Traded {format_volume(traded[i])} ({ratio_str}) → Now {format_price(stats['price'][i])}")
+        print(f"   🔗 polymarket.com/event/{slug}")
+        print()
+
+
+def format_duration(seconds: float) -> str:
+    """3600 -> '1h', 900 -> '15m', 172800 -> '2d'."""
+    for unit, size in (('w', 604800), ('d', 86400), ('h', 3600), ('m', 60)):
+        if seconds >= size and seconds % size == 0:
+            return f"{int(seconds // size)}{unit}"
+    return f"{int(seconds)}s"
+
+
+# ==================== NEW: DIGEST ====================
+
+DIGEST_TOP = 5  # Entries per digest list
+
+
+class DigestStats:
+    """Running totals and top lists for one category's digest."""
+    __slots__ = ('count', 'volume', 'volume24hr', 'top', 'movers', 'upcoming')
+
+    def __init__(self):
+        self.count = 0
+        self.volume = 0.0
+        self.volume24hr = 0.0
+        self.top = []  # Events arrive by 24h volume, so the first ones
+        self.movers = []  # Min-heap of (|change|, seq, name, change)
+        self.upcoming = []  # Max-heap of (-end, seq, title, end)
+
+    def add(self, event: Event, now: datetime, week_out: datetime):
+        self.count += 1
+        self.volume += event.volume
+        self.volume24hr += event.volume24hr
+        if len(self.top) < DIGEST_TOP:
+            self.top.append(event)
+        for m in event.markets:
+            if m.day_change:
+                item = (abs(m.day_change), -self.count, m.name or event.title, m.day_change)
+                if len(self.movers) < DIGEST_TOP:
+                    heapq.heappush(self.movers, item)
+                elif item > self.movers[0]:
+                    heapq.heapreplace(self.movers, item)
+        if event.end and now <= event.end <= week_out:
+            item = (-event.end.timestamp(), -self.count, event.title, event.end)
+            if len(self.upcoming) < DIGEST_TOP:
+                heapq.heappush(self.upcoming, item)
+            elif item > self.upcoming[0]:
+                heapq.heapreplace(self.upcoming, item)
+
+
+def print_digest(category: str, stats: DigestStats):
+    """Print one category's digest."""
     print(f"📊 **{category.title()} Digest**\n")
-    print(f"Markets: {len(matches)} | Volume: {format_volume(total_volume)} | 24h: {format_volume(total_24h)}")
+    print(f"Markets: {stats.count} | Volume: {format_volume(stats.volume)} | 24h: {format_volume(stats.volume24hr)}")
     print()
     
-    if movers:
+    if stats.movers:
         print("**🔥 Biggest Movers (24h)**")
-        for m in movers[:5]:
-            direction = "↑" if m['change'] > 0 else "↓"
-            print(f"  {direction} {m['name'][:40]}: {m['change']*100:+.1f}%")
+        for _, _, name, change in sorted(stats.movers, reverse=True):
+            direction = "↑" if change > 0 else "↓"
+            print(f"  {direction} {name[:40]}: {change*100:+.1f}%")
         print()
     
-    if upcoming:
+    if stats.upcoming:
         print("**⏰ Resolving This Week**")
-        for dt, event in upcoming[:5]:
-            print(f"  {dt.strftime('%a %b %d')}: {event.get('title', '')[:40]}")
+        for _, _, title, end in sorted(stats.upcoming, reverse=True):
+            print(f"  {end.strftime('%a %b %d')}: {title[:40]}")
         print()
     
     print("**📈 Top by Volume**")
-    for event in matches[:5]:
+    for event in stats.top:
         print(format_event(event))
         print()
 
 
+def cmd_digest(args):
+    """Category digest with summary; `all` digests every category in one pass."""
+    category = args.category.lower()
+    catalog = open_catalog()
+    now = datetime.now(timezone.utc)
+    week_out = now + timedelta(days=7)
+    
+    if category == 'all':
+        stats = {name: DigestStats() for name in CATEGORIES}
+        parsed_data, parsed = None, None
+        for name, data in catalog.categorized():
+            if data is not parsed_data:
+                parsed_data, parsed = data, Event(data)
+            stats[name].add(parsed, now, week_out)
+        for name, category_stats in stats.items():
+            if category_stats.count:
+                print_digest(name, category_stats)
+        return
+    
+    stats = DigestStats()
+    for data in catalog.in_category(category):
+        stats.add(Event(data), now, week_out)
+    
+    if not stats.count:
+        print(f"No markets found for '{category}'")
+        return
+    print_digest(category, stats)
+
+
 # ==================== NEW: PORTFOLIO ====================
 
+LEDGER_FILE = DATA_DIR / "ledger.db"
+STARTING_CASH = 10000
+DEFAULT_ACCOUNT = 'default'
+BOOK_SHARE = 0.5  # Fraction of a market's liquidity resting on each side of the book
+
+
+def fill_buy(ask: float, liquidity: float, amount: float):
+    """
+    Simulated fill for spending `amount` dollars: (shares, average price), or
+    None when the book is too thin. The ask side is modeled as liquidity *
+    BOOK_SHARE dollars spread evenly between the best ask and 1, so larger
+    orders walk the price up.
+    """
+    if not ask or ask >= 1:
+        return None
+    depth = liquidity * BOOK_SHARE
+    if depth <= 0:
+        return amount / ask, ask
+    if amount >= depth:
+        return None
+    density = depth / (1 - ask)  # Dollars per unit of price
+    worst = ask + amount / density
+    shares = density * math.log(worst / ask)
+    return shares, amount / shares
+
+
+def fill_sell(bid: float, liquidity: float, shares: float):
+    """
+    Simulated fill for selling `shares`: (proceeds, average price), or None
+    without a bid. The bid side is modeled as liquidity * BOOK_SHARE dollars
+    spread evenly between 0 and the best bid.
+    """
+    if not bid or bid <= 0:
+        return None
+    depth = liquidity * BOOK_SHARE
+    if depth <= 0:
+        return shares * bid, bid
+    density = depth / bid
+    worst = bid * math.exp(-shares / density)
+    proceeds = density * (bid - worst)
+    return proceeds, proceeds / shares
+
+
+def market_quotes(market: Market) -> tuple:
+    """(bid, ask) of a market, falling back to its last price."""
+    bid = market.best_bid if market.best_bid else market.price
+    ask = market.best_ask if market.best_ask else market.price
+    return bid, ask
+
+
+class Ledger:
+    """
+    Paper-trading accounts, positions and trades in SQLite. Every trade is
+    one transaction, so cash, positions and history can't drift apart.
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = path or LEDGER_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS accounts (
+                name TEXT PRIMARY KEY,
+                cash REAL NOT NULL,
+                starting_cash REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS positions (
+                account TEXT NOT NULL,
+                slug TEXT NOT NULL,
+                outcome TEXT NOT NULL DEFAULT '',
+                market_id TEXT,
+                name TEXT,
+                shares REAL NOT NULL,
+                cost_basis REAL NOT NULL,
+                opened_at TEXT,
+                PRIMARY KEY (account, slug, outcome)
+            );
+            CREATE TABLE IF NOT EXISTS trades (
+                id INTEGER PRIMARY KEY,
+                account TEXT NOT NULL,
+                at TEXT NOT NULL,
+                action TEXT NOT NULL,
+                slug TEXT NOT NULL,
+                outcome TEXT NOT NULL DEFAULT '',
+                shares REAL NOT NULL,
+                price REAL NOT NULL,  -- Average fill price
+                quote REAL,  -- Best ask (buys) or bid (sells) at the time
+                amount REAL NOT NULL,  -- Cash paid or received
+                pnl REAL
+            );
+            CREATE INDEX IF NOT EXISTS trades_account ON trades (account, id);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        if not self.conn.execute("SELECT 1 FROM meta WHERE key = 'imported_json'").fetchone():
+            self._import_json()
+
+    @contextmanager
+    def transaction(self):
+        """One write transaction; nested uses join the outer one."""
+        if self.conn.in_transaction:
+            yield
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _import_json(self):
+        """One-time import of the old portfolio.json into the default account."""
+        legacy = load_json('portfolio.json', None)
+        with self.transaction():
+            if legacy:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO accounts (name, cash, starting_cash) VALUES (?, ?, ?)",
+                    (DEFAULT_ACCOUNT, legacy.get('cash', STARTING_CASH), STARTING_CASH),
+                )
+                for pos in legacy.get('positions', []):
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO positions (account, slug, outcome, name, shares, cost_basis, opened_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (DEFAULT_ACCOUNT, pos['slug'], pos.get('outcome') or '', pos.get('name'),
+                         pos['shares'], pos['cost_basis'], pos.get('bought_at')),
+                    )
+                for h in legacy.get('history', []):
+                    self.conn.execute(
+                        "INSERT INTO trades (account, at, action, slug, outcome, shares, price, amount, pnl) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (DEFAULT_ACCOUNT, h.get('at', ''), h['action'], h['slug'], h.get('outcome') or '',
+                         h['shares'], h['price'], h.get('amount', h.get('proceeds', 0)), h.get('pnl')),
+                    )
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('imported_json', '1')")
+
+    def account(self, name: str = DEFAULT_ACCOUNT) -> sqlite3.Row:
+        """An account (created with STARTING_CASH on first use)."""
+        self.conn.execute(
+            "INSERT OR IGNORE INTO accounts (name, cash, starting_cash) VALUES (?, ?, ?)",
+            (name, STARTING_CASH, STARTING_CASH),
+        )
+        return self.conn.execute("SELECT * FROM accounts WHERE name = ?", (name,)).fetchone()
+
+    def reset_account(self, name: str, cash: float = STARTING_CASH):
+        """Empty an account and start it over with `cash`."""
+        with self.transaction():
+            self.conn.execute("DELETE FROM positions WHERE account = ?", (name,))
+            self.conn.execute("DELETE FROM trades WHERE account = ?", (name,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO accounts (name, cash, starting_cash) VALUES (?, ?, ?)",
+                (name, cash, cash),
+            )
+
+    def positions(self, account: str = DEFAULT_ACCOUNT) -> list:
+        return self.conn.execute(
+            "SELECT * FROM positions WHERE account = ? ORDER BY opened_at, slug", (account,)
+        ).fetchall()
+
+    def find_position(self, account: str, slug: str, outcome: str = None, market_id: str = None):
+        """
+        Position in an event: the one holding `market_id`, else the outcome
+        name (case-insensitive), else the first one held.
+        """
+        if market_id is not None:
+            row = self.conn.execute(
+                "SELECT * FROM positions WHERE account = ? AND slug = ? AND market_id = ?",
+                (account, slug, market_id),
+            ).fetchone()
+            if row or outcome is None:
+                return row
+        if outcome is not None:
+            return self.conn.execute(
+                "SELECT * FROM positions WHERE account = ? AND slug = ? AND outcome = ? COLLATE NOCASE",
+                (account, slug, outcome),
+            ).fetchone()
+        return self.conn.execute(
+            "SELECT * FROM positions WHERE account = ? AND slug = ? ORDER BY opened_at LIMIT 1",
+            (account, slug),
+        ).fetchone()
+
+    def buy(self, account: str, slug: str, outcome: str, market_id: str, name: str,
+            shares: float, price: float, quote: float, amount: float, at: str = None):
+        """Pay `amount` for `shares`, averaging into an existing position."""
+        at = at or datetime.now(timezone.utc).isoformat()
+        with self.transaction():
+            cash = self.account(account)['cash']
+            if amount > cash + 1e-9:
+                raise ValueError(f"Insufficient cash. Have: ${cash:,.2f}, Need: ${amount:,.2f}")
+            # Average into the position already holding this market, however its outcome was spelled
+            held = self.find_position(account, slug, outcome or '', market_id)
+            if held is not None:
+                outcome = held['outcome']
+            self.conn.execute(
+                """
+                INSERT INTO positions (account, slug, outcome, market_id, name, shares, cost_basis, opened_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (account, slug, outcome) DO UPDATE SET
+                    shares = shares + excluded.shares, cost_basis = cost_basis + excluded.cost_basis,
+                    market_id = COALESCE(excluded.market_id, market_id)
+                """,
+                (account, slug, outcome or '', market_id, name, shares, amount, at),
+            )
+            self.conn.execute("UPDATE accounts SET cash = cash - ? WHERE name = ?", (amount, account))
+            self.conn.execute(
+                "INSERT INTO trades (account, at, action, slug, outcome, shares, price, quote, amount) "
+                "VALUES (?, ?, 'buy', ?, ?, ?, ?, ?, ?)",
+                (account, at, slug, outcome or '', shares, price, quote, amount),
+            )
+
+    def sell(self, account: str, position: sqlite3.Row, proceeds: float, price: float,
+             quote: float, at: str = None) -> float:
+        """Close a position for `proceeds`; returns the realized P&L."""
+        at = at or datetime.now(timezone.utc).isoformat()
+        pnl = proceeds - position['cost_basis']
+        with self.transaction():
+            deleted = self.conn.execute(
+                "DELETE FROM positions WHERE account = ? AND slug = ? AND outcome = ?",
+                (account, position['slug'], position['outcome']),
+            ).rowcount
+            if not deleted:
+                raise ValueError(f"No position in {position['slug']}")
+            self.conn.execute("UPDATE accounts SET cash = cash + ? WHERE name = ?", (proceeds, account))
+            self.conn.execute(
+                "INSERT INTO trades (account, at, action, slug, outcome, shares, price, quote, amount, pnl) "
+                "VALUES (?, ?, 'sell', ?, ?, ?, ?, ?, ?, ?)",
+                (account, at, position['slug'], position['outcome'], position['shares'], price, quote,
+                 proceeds, pnl),
+            )
+        return pnl
+
+
+def position_market(pos, event: Event):
+    """The market a position holds: by market id when known, else by outcome name."""
+    if pos['market_id']:
+        for m in event.markets:
+            if m.id == pos['market_id']:
+                return m
+    return watched_market({'outcome': pos['outcome']}, event)
+
+
+def select_market(event: Event, outcome: str = None):
+    """(market, display name) to trade: the named outcome, else the first market."""
+    if outcome:
+        m = event.find_outcome(outcome) if event.markets else None
+        return m, (m.name if m else None)
+    if not event.markets:
+        return None, None
+    m = event.markets[0]
+    return m, (m.question if len(event.markets) == 1 and m.question else event.title)
+
+
+def fetch_trade_event(slug: str):
+    """Live (uncached) event for a trade, or None with the error printed."""
+    try:
+        events = parse_events(fetch('/events', {'slug': slug}, ttl=0))
+    except requests.RequestException as e:
+        print(f"❌ Could not fetch event: {e}")
+        return None
+    if not events:
+        print(f"❌ Event not found: {slug}")
+        return None
+    return events[0]
+
+
 def cmd_portfolio(args):
     """Show paper trading portfolio."""
-    portfolio = load_json('portfolio.json', {'positions': [], 'history': [], 'cash': 10000})
-    
-    if not portfolio['positions']:
-        print("📈 **Paper Portfolio**\n")
-        print(f"Cash: ${portfolio['cash']:,.2f}")
+    ledger = Ledger()
+    account = ledger.account(args.account)
+    positions = ledger.positions(args.account)
+    title = "Paper Portfolio" if args.account == DEFAULT_ACCOUNT else f"Paper Portfolio: {args.account}"
+    
+    if not positions:
+        print(f"📈 **{title}**\n")
+        print(f"Cash: ${account['cash']:,.2f}")
         print("\nNo positions. Start with:")
         print("  polymarket buy <slug> <amount>")
         return
     
-    print("📈 **Paper Portfolio**\n")
+    print(f"📈 **{title}**\n")
     
-    total_value = portfolio['cash']
-    total_cost = 0
+    # One batched refresh for every position's event
+    events = fetch_events_by_slug([pos['slug'] for pos in positions])
     
-    for pos in portfolio['positions']:
-        try:
-            data = fetch('/events', {'slug': pos['slug']})
-            if data:
-                event = data[0] if isinstance(data, list) else data
-                markets = event.get('markets', [])
-                
-                current_price = 0
-                if pos.get('outcome') and markets:
-                    for m in markets:
-                        if pos['outcome'].lower() in m.get('groupItemTitle', '').lower():
-                            current_price = get_market_price(m)
-                            break
-                elif markets:
-                    current_price = get_market_price(markets[0])
-                
-                shares = pos['shares']
-                cost_basis = pos['cost_basis']
-                current_value = shares * current_price
-                pnl = current_value - cost_basis
-                pnl_pct = (pnl / cost_basis * 100) if cost_basis > 0 else 0
-                
-                total_value += current_value
-                total_cost += cost_basis
-                
-                direction = "🟢" if pnl >= 0 else "🔴"
-                print(f"{direction} **{pos['name'][:40]}**")
-                print(f"   {shares:.0f} shares @ {format_price(pos['entry_price'])} → {format_price(current_price)}")
-                print(f"   Value: ${current_value:,.2f} | P&L: ${pnl:+,.2f} ({pnl_pct:+.1f}%)")
-                print()
-        except Exception as e:
-            print(f"• {pos['name']} (error: {e})")
+    total_value = account['cash']
+    liquidation = account['cash']
+    for pos in positions:
+        event = events.get(pos['slug'])
+        market = position_market(pos, event) if event else None
+        if market is None:
+            print(f"• {pos['name']} (price unavailable)")
             print()
+            continue
+        
+        shares = pos['shares']
+        cost_basis = pos['cost_basis']
+        entry_price = cost_basis / shares if shares else 0
+        current_price = market.price
+        current_value = shares * current_price
+        pnl = current_value - cost_basis
+        pnl_pct = (pnl / cost_basis * 100) if cost_basis > 0 else 0
+        
+        total_value += current_value
+        bid, _ = market_quotes(market)
+        fill = fill_sell(bid, market.liquidity, shares)
+        liquidation += fill[0] if fill else 0
+        
+        direction = "🟢" if pnl >= 0 else "🔴"
+        print(f"{direction} **{(pos['name'] or pos['slug'])[:40]}**")
+        print(f"   {shares:.0f} shares @ {format_price(entry_price)} → {format_price(current_price)}")
+        print(f"   Value: ${current_value:,.2f} | P&L: ${pnl:+,.2f} ({pnl_pct:+.1f}%)")
+        print()
     
-    total_pnl = total_value - 10000  # Starting cash
+    total_pnl = total_value - account['starting_cash']
     print(f"**Summary**")
-    print(f"Cash: ${portfolio['cash']:,.2f}")
-    print(f"Positions: ${total_value - portfolio['cash']:,.2f}")
+    print(f"Cash: ${account['cash']:,.2f}")
+    print(f"Positions: ${total_value - account['cash']:,.2f}")
     print(f"Total: ${total_value:,.2f} (P&L: ${total_pnl:+,.2f})")
+    print(f"If sold now: ${liquidation:,.2f} (after bid/ask spread and slippage)")
 
 
 def cmd_buy(args):
-    """Paper buy a position."""
-    portfolio = load_json('portfolio.json', {'positions': [], 'history': [], 'cash': 10000})
-    
+    """Paper buy a position, filled against the ask and the book's depth."""
+    ledger = Ledger()
     slug = extract_slug_from_url(args.slug)
     amount = args.amount
     
-    if amount > portfolio['cash']:
-        print(f"❌ Insufficient cash. Have: ${portfolio['cash']:,.2f}, Need: ${amount:,.2f}")
+    cash = ledger.account(args.account)['cash']
+    if amount > cash:
+        print(f"❌ Insufficient cash. Have: ${cash:,.2f}, Need: ${amount:,.2f}")
+        return
+    
+    event = fetch_trade_event(slug)
+    if event is None:
+        return
+    
+    market, market_name = select_market(event, args.outcome)
+    if args.outcome and market is None:
+        print(f"❌ Outcome '{args.outcome}' not found")
+        return
+    if market is None or market.price <= 0:
+        print("❌ Could not get price")
+        return
+    
+    _, ask = market_quotes(market)
+    fill = fill_buy(ask, market.liquidity, amount)
+    if fill is None:
+        print(f"❌ Not enough liquidity to fill ${amount:,.2f} "
+              f"(book depth ~{format_volume(market.liquidity * BOOK_SHARE)})")
         return
+    shares, price = fill
     
     try:
-        data = fetch('/events', {'slug': slug})
-        if not data:
-            print(f"❌ Event not found: {slug}")
-            return
-        
-        event = data[0] if isinstance(data, list) else data
-        markets = event.get('markets', [])
-        
-        price = 0
-        market_name = event.get('title', slug)
-        outcome = args.outcome
-        
-        if outcome and markets:
-            for m in markets:
-                name = m.get('groupItemTitle', '').lower()
-                if outcome.lower() in name:
-                    price = get_market_price(m)
-                    market_name = m.get('groupItemTitle', market_name)
-                    break
-            if price == 0:
-                print(f"❌ Outcome '{outcome}' not found")
-                return
-        elif markets:
-            price = get_market_price(markets[0])
-            if len(markets) == 1:
-                market_name = markets[0].get('question', market_name)
-        
-        if price <= 0:
-            print("❌ Could not get price")
-            return
-        
-        shares = amount / price
-        
-        # Check if already have position
-        existing = None
-        for p in portfolio['positions']:
-            if p['slug'] == slug and p.get('outcome') == outcome:
-                existing = p
-                break
-        
-        if existing:
-            # Average in
-            total_shares = existing['shares'] + shares
-            total_cost = existing['cost_basis'] + amount
-            existing['shares'] = total_shares
-            existing['cost_basis'] = total_cost
-            existing['entry_price'] = total_cost / total_shares
-        else:
-            portfolio['positions'].append({
-                'slug': slug,
-                'outcome': outcome,
-                'name': market_name,
-                'shares': shares,
-                'entry_price': price,
-                'cost_basis': amount,
-                'bought_at': datetime.now(timezone.utc).isoformat(),
-            })
-        
-        portfolio['cash'] -= amount
-        portfolio['history'].append({
-            'action': 'buy',
-            'slug': slug,
-            'outcome': outcome,
-            'shares': shares,
-            'price': price,
-            'amount': amount,
-            'at': datetime.now(timezone.utc).isoformat(),
-        })
-        
-        save_json('portfolio.json', portfolio)
-        
-        print(f"✅ Bought {shares:.1f} shares of **{market_name}**")
-        print(f"   Price: {format_price(price)} | Cost: ${amount:,.2f}")
-        print(f"   Cash remaining: ${portfolio['cash']:,.2f}")
-        
-    except Exception as e:
-        print(f"❌ Error: {e}")
+        ledger.buy(args.account, slug, args.outcome, market.id, market_name, shares, price, ask, amount)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    
+    slippage = (price / ask - 1) * 100
+    print(f"✅ Bought {shares:.1f} shares of **{market_name}**")
+    print(f"   Price: {format_price(price)} (ask {format_price(ask)}, slippage {slippage:.2f}%) | Cost: ${amount:,.2f}")
+    print(f"   Cash remaining: ${ledger.account(args.account)['cash']:,.2f}")
 
 
 def cmd_sell(args):
-    """Paper sell a position."""
-    portfolio = load_json('portfolio.json', {'positions': [], 'history': [], 'cash': 10000})
-    
+    """Paper sell a position, filled against the bid and the book's depth."""
+    ledger = Ledger()
     slug = extract_slug_from_url(args.slug)
     
-    # Find position
-    pos = None
-    for p in portfolio['positions']:
-        if p['slug'] == slug:
-            pos = p
-            break
+    event = fetch_trade_event(slug)
+    if event is None:
+        return
     
+    # Resolve --outcome to the market it names, so any spelling finds the position
+    named = event.find_outcome(args.outcome) if args.outcome else None
+    pos = ledger.find_position(args.account, slug, args.outcome, named.id if named else None)
     if not pos:
-        print(f"❌ No position in {slug}")
+        print(f"❌ No position in {slug}" + (f" for '{args.outcome}'" if args.outcome else ""))
         return
+    market = position_market(pos, event)
+    if market is None or market.price <= 0:
+        print("❌ Could not get price")
+        return
+    
+    bid, _ = market_quotes(market)
+    fill = fill_sell(bid, market.liquidity, pos['shares'])
+    if fill is None:
+        print("❌ Could not get price")
+        return
+    proceeds, price = fill
     
     try:
-        data = fetch('/events', {'slug': slug})
-        if not data:
-            print(f"❌ Event not found: {slug}")
-            return
-        
-        event = data[0] if isinstance(data, list) else data
-        markets = event.get('markets', [])
-        
-        price = 0
-        if pos.get('outcome') and markets:
-            for m in markets:
-                if pos['outcome'].lower() in m.get('groupItemTitle', '').lower():
-                    price = get_market_price(m)
-                    break
-        elif markets:
-            price = get_market_price(markets[0])
-        
-        if price <= 0:
-            print("❌ Could not get price")
-            return
-        
-        shares = pos['shares']
-        proceeds = shares * price
-        pnl = proceeds - pos['cost_basis']
-        
-        portfolio['cash'] += proceeds
-        portfolio['positions'] = [p for p in portfolio['positions'] if p['slug'] != slug]
-        portfolio['history'].append({
-            'action': 'sell',
-            'slug': slug,
-            'shares': shares,
-            'price': price,
-            'proceeds': proceeds,
-            'pnl': pnl,
-            'at': datetime.now(timezone.utc).isoformat(),
-        })
-        
-        save_json('portfolio.json', portfolio)
-        
-        direction = "🟢" if pnl >= 0 else "🔴"
-        print(f"{direction} Sold {shares:.1f} shares of **{pos['name']}**")
-        print(f"   Price: {format_price(price)} | Proceeds: ${proceeds:,.2f}")
-        print(f"   P&L: ${pnl:+,.2f}")
-        print(f"   Cash: ${portfolio['cash']:,.2f}")
+        pnl = ledger.sell(args.account, pos, proceeds, price, bid)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    
+    direction = "🟢" if pnl >= 0 else "🔴"
+    print(f"{direction} Sold {pos['shares']:.1f} shares of **{pos['name']}**")
+    print(f"   Price: {format_price(price)} (bid {format_price(bid)}) | Proceeds: ${proceeds:,.2f}")
+    print(f"   P&L: ${pnl:+,.2f}")
+    print(f"   Cash: ${ledger.account(args.account)['cash']:,.2f}")
+
+
+# ==================== NEW: STRATEGY RUNNER ====================
+
+STRATEGIES = ('momentum', 'reversion')
+
+
+def run_strategy(store: SeriesStore, strategy: str, lookback: int, threshold: float, hold: int,
+                 take_profit: float, stop_loss: float, stake: float, cash: float, step: int,
+                 min_volume: float) -> dict:
+    """
+    Replay recorded prices on a `step` grid and trade them: `momentum` buys
+    markets up at least `threshold` over `lookback`, `reversion` buys those
+    down at least that much. Positions close after `hold`, or at
+    `take_profit` / `stop_loss` (fractions of the entry price). Fills use the
+    recorded price and liquidity with the same slippage model as buy/sell.
+    """
+    np = store.np
+    rows = store.load()
+    if len(rows) == 0:
+        return None
+    
+    # Markets liquid enough at the end of the recording
+    final = store.latest(rows)
+    markets = np.sort(final['market'][final['volume24hr'] >= min_volume])
+    rows = rows[np.isin(rows['market'], markets)]
+    if len(rows) == 0:
+        return {'trades': [], 'open': [], 'cash': cash, 'times': np.zeros(0)}
+    first, last = float(rows['ts'][0]), float(rows['ts'][-1])
+    times = first + step * np.arange(int(math.ceil((last - first) / step)) + 1)
+    lag = max(1, int(lookback // step))
+    if len(times) <= lag:
+        return {'trades': [], 'open': [], 'cash': cash, 'times': times}
+    
+    # Dense (time x market) price and liquidity, forward-filled from the rows
+    col = np.searchsorted(markets, rows['market'])
+    k = np.searchsorted(times, rows['ts'], side='left')
+    _, last_seen = np.unique((k * len(markets) + col)[::-1], return_index=True)
+    latest = len(rows) - 1 - last_seen
+    shape = (len(times), len(markets))
+    price = np.full(shape, np.nan)
+    liquidity = np.zeros(shape)
+    price[k[latest], col[latest]] = rows['price'][latest]
+    liquidity[k[latest], col[latest]] = rows['liquidity'][latest]
+    filled = np.where(~np.isnan(price), np.arange(len(times))[:, None], 0)
+    np.maximum.accumulate(filled, axis=0, out=filled)
+    price = price[filled, np.arange(len(markets))]
+    liquidity = liquidity[filled, np.arange(len(markets))]
+    
+    change = np.full(shape, np.nan)
+    change[lag:] = price[lag:] - price[:-lag]
+    signal = change if strategy == 'momentum' else -change
+    hold_steps = max(1, int(hold // step))
+    
+    entry_step = np.full(len(markets), -1)
+    entry_price = np.zeros(len(markets))
+    shares = np.zeros(len(markets))
+    cost = np.zeros(len(markets))
+    trades = []
+    
+    for t in range(lag, len(times)):
+        p = price[t]
+        held = entry_step >= 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ret = np.where(held, p / entry_price - 1, 0)
+        exits = np.flatnonzero(held & ((t - entry_step >= hold_steps) | (ret >= take_profit) | (ret <= -stop_loss)))
+        for i in exits:
+            fill = fill_sell(p[i], liquidity[t, i], shares[i])
+            proceeds, avg = fill if fill else (0.0, 0.0)
+            cash += proceeds
+            trades.append({'action': 'sell', 'market': int(markets[i]), 'step': t, 'shares': shares[i],
+                           'price': avg, 'quote': p[i], 'amount': proceeds, 'pnl': proceeds - cost[i]})
+            entry_step[i] = -1
         
-    except Exception as e:
-        print(f"❌ Error: {e}")
+        with np.errstate(invalid='ignore'):
+            candidates = np.flatnonzero((entry_step < 0) & (signal[t] >= threshold) & (p > 0.02) & (p < 0.98))
+        for i in candidates[np.argsort(-signal[t][candidates])]:
+            if cash < stake:
+                break
+            fill = fill_buy(p[i], liquidity[t, i], stake)
+            if fill is None:
+                continue
+            shares[i], avg = fill
+            cash -= stake
+            entry_step[i], entry_price[i], cost[i] = t, avg, stake
+            trades.append({'action': 'buy', 'market': int(markets[i]), 'step': t, 'shares': shares[i],
+                           'price': avg, 'quote': p[i], 'amount': stake, 'pnl': None})
+    
+    held = np.flatnonzero(entry_step >= 0)
+    open_positions = [{'market': int(markets[i]), 'shares': shares[i], 'cost': cost[i], 'price': price[-1, i]}
+                      for i in held]
+    return {'trades': trades, 'open': open_positions, 'cash': cash, 'times': times}
+
+
+def cmd_strategy(args):
+    """Backtest a trading strategy on recorded prices into a paper account."""
+    store = SeriesStore()
+    result = run_strategy(
+        store, args.strategy, args.lookback, args.threshold / 100, args.hold,
+        args.take_profit / 100, args.stop_loss / 100, args.stake, args.cash, args.step,
+        args.min_volume * 1000,
+    )
+    if result is None:
+        print("No recorded history yet. Start the recorder with:")
+        print("  polymarket record --interval 5m")
+        return
+    
+    account = f"strategy:{args.strategy}"
+    ledger = Ledger()
+    ledger.reset_account(account, args.cash)
+    times = result['times']
+    
+    def stamp(step):
+        return datetime.fromtimestamp(float(times[step]), timezone.utc).isoformat()
+    
+    with ledger.transaction():
+        for trade in result['trades']:
+            info = store.registry[trade['market']]
+            if trade['action'] == 'buy':
+                ledger.buy(account, info['slug'], info['name'], info['id'], info['name'],
+                           trade['shares'], trade['price'], trade['quote'], trade['amount'], at=stamp(trade['step']))
+            else:
+                pos = ledger.find_position(account, info['slug'], info['name'], info['id'])
+                ledger.sell(account, pos, trade['amount'], trade['price'], trade['quote'], at=stamp(trade['step']))
+    
+    sells = [t for t in result['trades'] if t['action'] == 'sell']
+    realized = sum(t['pnl'] for t in sells)
+    wins = sum(1 for t in sells if t['pnl'] > 0)
+    open_value = sum(p['shares'] * p['price'] for p in result['open'])
+    open_cost = sum(p['cost'] for p in result['open'])
+    equity = result['cash'] + open_value
+    span = float(times[-1] - times[0]) if len(times) else 0
+    
+    print(f"🤖 **Strategy: {args.strategy}** ({format_duration(args.lookback)} lookback, "
+          f"{args.threshold:g}pt threshold, {span / 3600:.1f}h of history)\n")
+    print(f"Trades: {len(result['trades'])} ({len(sells)} closed, {len(result['open'])} open)")
+    if sells:
+        print(f"Win rate: {wins / len(sells) * 100:.0f}% | Realized P&L: ${realized:+,.2f}")
+    if result['open']:
+        print(f"Open positions: ${open_value:,.2f} (cost ${open_cost:,.2f})")
+    print(f"Equity: ${equity:,.2f} (P&L: ${equity - args.cash:+,.2f})")
+    
+    best = sorted(sells, key=lambda t: t['pnl'], reverse=True)
+    if best:
+        print("\n**Best / worst trades**")
+        for t in best[:3] + best[-3:] if len(best) > 6 else best:
+            name, _ = _series_label(store, t['market'])
+            print(f"  {'🟢' if t['pnl'] >= 0 else '🔴'} {name}: ${t['pnl']:+,.2f}")
+    
+    print(f"\nTrades saved to the '{account}' paper account:")
+    print(f"  polymarket portfolio --account {account}")
 
 
 # ==================== MAIN ====================
 
 def main():
+    global HTTP_CACHE_TTL
     parser = argparse.ArgumentParser(description="Polymarket prediction markets")
     parser.add_argument("--limit", "-l", type=int, default=5, help="Number of results")
     parser.add_argument("--json", "-j", action="store_true", help="Output raw JSON")
     parser.add_argument("--all", "-a", action="store_true", help="Show all markets in event")
+    parser.add_argument("--no-cache", action="store_true", help=f"Skip the {HTTP_CACHE_TTL}s response cache")
     
     subparsers = parser.add_subparsers(dest="command", required=True)
     
@@ -1195,6 +2602,9 @@ def main():
     search_parser.add_argument("query", help="Search query")
     search_parser.add_argument("--all", "-a", action="store_true", help="Show all outcomes")
     
+    sync_parser = subparsers.add_parser("sync", help="Sync the local market catalog")
+    sync_parser.add_argument("--full", action="store_true", help="Refetch every open event")
+    
     event_parser = subparsers.add_parser("event", help="Get event by slug or URL")
     event_parser.add_argument("slug", help="Event slug or polymarket.com URL")
     
@@ -1216,6 +2626,14 @@ def main():
     # NEW: Alerts (for cron)
     alerts_parser = subparsers.add_parser("alerts", help="Check watchlist for alerts")
     alerts_parser.add_argument("--quiet", "-q", action="store_true", help="Only output if alerts triggered")
+    alerts_parser.add_argument("--daemon", "-d", action="store_true",
+                               help="Keep watching and emit alerts as NDJSON (one JSON object per line)")
+    alerts_parser.add_argument("--interval", type=parse_duration, default=DAEMON_INTERVAL,
+                               help="Daemon: poll interval for quiet markets (default: 60s)")
+    alerts_parser.add_argument("--fast-interval", type=parse_duration, default=DAEMON_FAST_INTERVAL,
+                               help="Daemon: poll interval near a threshold or resolution (default: 10s)")
+    alerts_parser.add_argument("--cooldown", type=parse_duration, default=ALERT_COOLDOWN,
+                               help="Daemon: min time before the same alert fires again (default: 1h)")
     
     # NEW: Calendar
     calendar_parser = subparsers.add_parser("calendar", help="Markets resolving soon")
@@ -1225,30 +2643,76 @@ def main():
     movers_parser = subparsers.add_parser("movers", help="Biggest price movers")
     movers_parser.add_argument("--timeframe", "-t", default="24h", choices=["24h", "1w", "1m"], help="Timeframe")
     movers_parser.add_argument("--min-volume", type=float, default=10, help="Min 24h volume in $K")
+    movers_parser.add_argument("--window", "-w", type=parse_duration,
+                               help="Any window from recorded history, e.g. 15m, 4h, 3d (see: record)")
+    
+    # NEW: Recorder + series queries
+    record_parser = subparsers.add_parser("record", help="Record prices of every open market")
+    record_parser.add_argument("--interval", "-i", type=parse_duration, default=RECORD_INTERVAL,
+                               help="Snapshot interval (default: 5m)")
+    record_parser.add_argument("--once", action="store_true", help="Take one snapshot and exit")
+    
+    volatility_parser = subparsers.add_parser("volatility", help="Most volatile markets (recorded)")
+    volatility_parser.add_argument("--window", "-w", type=parse_duration, default=parse_duration("4h"),
+                                   help="Window, e.g. 15m, 4h, 3d (default: 4h)")
+    volatility_parser.add_argument("--min-volume", type=float, default=10, help="Min 24h volume in $K")
+    
+    spikes_parser = subparsers.add_parser("spikes", help="Volume spikes (recorded)")
+    spikes_parser.add_argument("--window", "-w", type=parse_duration, default=parse_duration("1h"),
+                               help="Window, e.g. 15m, 1h (default: 1h)")
+    spikes_parser.add_argument("--baseline", "-b", type=parse_duration, default=parse_duration("24h"),
+                               help="Period the usual volume is averaged over (default: 24h)")
+    spikes_parser.add_argument("--ratio", type=float, default=3.0, help="Min multiple of usual volume")
+    spikes_parser.add_argument("--min-volume", type=float, default=1, help="Min volume traded in window, $K")
     
     # NEW: Digest
     digest_parser = subparsers.add_parser("digest", help="Category digest summary")
-    digest_parser.add_argument("category", help="Category: politics, crypto, sports, tech, business")
+    digest_parser.add_argument("category", help="Category: politics, crypto, sports, tech, entertainment, "
+                                                "science, business, or all")
     
     # NEW: Portfolio
-    subparsers.add_parser("portfolio", help="Show paper portfolio")
+    portfolio_parser = subparsers.add_parser("portfolio", help="Show paper portfolio")
+    portfolio_parser.add_argument("--account", "-a", default=DEFAULT_ACCOUNT, help="Paper account")
     
     # NEW: Buy
     buy_parser = subparsers.add_parser("buy", help="Paper buy position")
     buy_parser.add_argument("slug", help="Event slug")
     buy_parser.add_argument("amount", type=float, help="Amount in dollars")
     buy_parser.add_argument("--outcome", "-o", help="Specific outcome")
+    buy_parser.add_argument("--account", "-a", default=DEFAULT_ACCOUNT, help="Paper account")
     
     # NEW: Sell
     sell_parser = subparsers.add_parser("sell", help="Paper sell position")
     sell_parser.add_argument("slug", help="Event slug")
+    sell_parser.add_argument("--outcome", "-o", help="Specific outcome (default: first one held)")
+    sell_parser.add_argument("--account", "-a", default=DEFAULT_ACCOUNT, help="Paper account")
+    
+    # NEW: Strategy backtests on recorded prices
+    strategy_parser = subparsers.add_parser("strategy", help="Backtest a strategy on recorded prices")
+    strategy_parser.add_argument("strategy", choices=STRATEGIES, help="momentum: buy risers; reversion: buy fallers")
+    strategy_parser.add_argument("--lookback", type=parse_duration, default=parse_duration("1h"),
+                                 help="Window the move is measured over (default: 1h)")
+    strategy_parser.add_argument("--threshold", type=float, default=5, help="Min move to trade, in points (default: 5)")
+    strategy_parser.add_argument("--hold", type=parse_duration, default=parse_duration("4h"),
+                                 help="Max holding time (default: 4h)")
+    strategy_parser.add_argument("--take-profit", type=float, default=20, help="Close at +X%% (default: 20)")
+    strategy_parser.add_argument("--stop-loss", type=float, default=10, help="Close at -X%% (default: 10)")
+    strategy_parser.add_argument("--stake", type=float, default=100, help="Dollars per trade (default: 100)")
+    strategy_parser.add_argument("--cash", type=float, default=STARTING_CASH, help="Starting cash (default: 10000)")
+    strategy_parser.add_argument("--step", type=parse_duration, default=RECORD_INTERVAL,
+                                 help="Decision interval (default: 5m)")
+    strategy_parser.add_argument("--min-volume", type=float, default=10, help="Min 24h volume in $K")
     
     args = parser.parse_args()
     
+    if args.no_cache:
+        HTTP_CACHE_TTL = 0
+    
     commands = {
         "trending": cmd_trending,
         "featured": cmd_featured,
         "search": cmd_search,
+        "sync": cmd_sync,
         "event": cmd_event,
         "market": cmd_market,
         "category": cmd_category,
@@ -1256,10 +2720,14 @@ def main():
         "alerts": cmd_alerts,
         "calendar": cmd_calendar,
         "movers": cmd_movers,
+        "record": cmd_record,
+        "volatility": cmd_volatility,
+        "spikes": cmd_spikes,
         "digest": cmd_digest,
         "portfolio": cmd_portfolio,
         "buy": cmd_buy,
         "sell": cmd_sell,
+        "strategy": cmd_strategy,
     }
     
     try:
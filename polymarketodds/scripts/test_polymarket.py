@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#     "pytest>=8.0.0",
+#     "requests>=2.28.0",
+#     "numpy>=1.24",
+# ]
+# ///
+"""
+Tests for the Polymarket skill's offline pieces (recorder, fills, ledger).
+
+Run with: uv run pytest test_polymarket.py -v
+"""
+
+import math
+
+import pytest
+
+import polymarket as pm
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Keep every test's state out of ~/.polymarket."""
+    monkeypatch.setattr(pm, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+def _market(market_id: str, price: float, volume: float = 1000.0, liquidity: float = 500.0) -> dict:
+    """A Gamma /markets object."""
+    return {
+        "id": market_id,
+        "question": f"Question {market_id}?",
+        "outcomes": '["Yes", "No"]',
+        "outcomePrices": f'["{price}", "{round(1 - price, 4)}"]',
+        "volumeNum": volume,
+        "volume24hr": volume / 10,
+        "liquidityNum": liquidity,
+        "events": [{"slug": f"event-{market_id}", "title": f"Event {market_id}"}],
+    }
+
+
+class TestSeriesStore:
+    """Test the recorder's append-only tick file and window queries."""
+
+    def _record(self, store, snapshots):
+        """Append (ts, markets) snapshots the way cmd_record does."""
+        previous = store.latest(store.load())
+        for ts, markets in snapshots:
+            written = store.append(markets, now=ts, previous=previous)
+            previous = store.merge_latest(previous, written)
+        return previous
+
+    def test_append_writes_only_changes(self, tmp_path):
+        store = pm.SeriesStore(tmp_path / "series")
+        first = store.append([_market("a", 0.5), _market("b", 0.2)], now=1000)
+        assert len(first) == 2
+
+        previous = store.merge_latest(None, first)
+        written = store.append([_market("a", 0.5), _market("b", 0.25)], now=1100, previous=previous)
+
+        assert written["market"].tolist() == [store.index["b"]]
+        assert len(store.load()) == 3
+        # The registry survives a reopen
+        assert [m["slug"] for m in pm.SeriesStore(tmp_path / "series").registry] == ["event-a", "event-b"]
+
+    def test_torn_row_is_ignored_then_truncated(self, tmp_path):
+        store = pm.SeriesStore(tmp_path / "series")
+        store.append([_market("a", 0.5)], now=1000)
+        ticks = tmp_path / "series" / pm.SERIES_TICKS
+        with open(ticks, "ab") as f:
+            f.write(b"\x01" * 10)  # An append interrupted mid-row
+
+        assert len(store.load()) == 1
+        store.append([_market("a", 0.6)], now=1100, previous=store.latest(store.load()))
+
+        rows = store.load()
+        assert ticks.stat().st_size == 2 * store.dtype.itemsize
+        assert rows["ts"].tolist() == [1000, 1100]
+        assert rows["price"].tolist() == pytest.approx([0.5, 0.6])
+
+    def test_window_start_end_and_volatility(self, tmp_path):
+        store = pm.SeriesStore(tmp_path / "series")
+        self._record(store, [
+            (1000, [_market("a", 0.5, volume=100.0)]),
+            (1100, [_market("a", 0.6, volume=200.0)]),
+            (1200, [_market("a", 0.4, volume=300.0), _market("b", 0.3)]),  # b is new inside the window
+            (1300, [_market("a", 0.4, volume=300.0), _market("b", 0.3)]),  # Unchanged: no rows
+        ])
+        a, b = store.index["a"], store.index["b"]
+
+        stats = store.window(150, now=1300)
+
+        assert stats["start_price"][[a, b]].tolist() == pytest.approx([0.6, 0.3])
+        assert stats["price"][[a, b]].tolist() == pytest.approx([0.4, 0.3])
+        assert stats["start_volume"][a] == 200.0 and stats["volume"][a] == 300.0
+        assert stats["volatility"][[a, b]].tolist() == pytest.approx([0.2, 0.0], abs=1e-6)
+        assert (stats["first_ts"], stats["last_ts"], stats["covered"]) == (1000.0, 1300, 150)
+
+        # A window longer than the history starts at each market's first row
+        stats = store.window(10_000, now=1300)
+        assert stats["start_price"][a] == pytest.approx(0.5)
+        assert stats["volatility"][a] == pytest.approx((0.1 ** 2 + 0.2 ** 2) ** 0.5, abs=1e-6)
+        assert stats["covered"] == 300
+
+    def test_merge_latest_matches_reread(self, tmp_path):
+        store = pm.SeriesStore(tmp_path / "series")
+        previous = self._record(store, [
+            (1000, [_market("a", 0.5), _market("b", 0.2)]),
+            (1100, [_market("a", 0.55), _market("b", 0.2), _market("c", 0.9)]),
+        ])
+
+        reread = store.latest(store.load())
+        assert previous.tolist() == reread.tolist()
+
+
+class TestFills:
+    """Test the simulated order-book fills against their closed forms."""
+
+    def test_buy_walks_up_the_ask(self):
+        # depth $1000 over [0.5, 1] -> $2000 per unit of price; $100 moves the ask to 0.55
+        shares, price = pm.fill_buy(0.5, 2000, 100)
+
+        assert shares == pytest.approx(2000 * math.log(0.55 / 0.5))
+        assert price == pytest.approx(100 / shares)
+        assert 0.5 < price < 0.55
+
+    def test_sell_walks_down_the_bid(self):
+        # depth $1000 over [0, 0.5] -> $2000 per unit of price
+        proceeds, price = pm.fill_sell(0.5, 2000, 200)
+
+        assert proceeds == pytest.approx(2000 * 0.5 * (1 - math.exp(-0.1)))
+        assert price == pytest.approx(proceeds / 200)
+        assert 0.5 * math.exp(-0.1) < price < 0.5
+
+    def test_edge_cases(self):
+        assert pm.fill_buy(0.4, 0, 100) == (250.0, 0.4)  # No liquidity info: fill at the quote
+        assert pm.fill_sell(0.4, 0, 250) == (100.0, 0.4)
+        assert pm.fill_buy(0.5, 100, 50) is None  # Order as large as the book
+        assert pm.fill_buy(1.0, 2000, 10) is None
+        assert pm.fill_sell(0, 2000, 10) is None
+
+    def test_round_trip_loses_to_slippage(self):
+        shares, _ = pm.fill_buy(0.5, 2000, 100)
+        proceeds, _ = pm.fill_sell(0.5, 2000, shares)
+        assert proceeds < 100
+
+
+class TestLedger:
+    """Test paper-trading cash, positions and trade history."""
+
+    def test_buy_then_sell_round_trip(self, tmp_path):
+        ledger = pm.Ledger(tmp_path / "ledger.db")
+        shares, price = pm.fill_buy(0.5, 2000, 100)
+        ledger.buy("default", "warriors-win", "Warriors", "m1", "Warriors", shares, price, 0.5, 100)
+        # Same market under a different spelling averages into the same position
+        ledger.buy("default", "warriors-win", "warriors", "m1", "Warriors", 100, 0.5, 0.5, 50)
+
+        [position] = ledger.positions()
+        assert position["shares"] == pytest.approx(shares + 100)
+        assert position["cost_basis"] == pytest.approx(150)
+        assert ledger.account()["cash"] == pytest.approx(pm.STARTING_CASH - 150)
+
+        position = ledger.find_position("default", "warriors-win", "WARRIORS")
+        proceeds, price = pm.fill_sell(0.55, 2000, position["shares"])
+        pnl = ledger.sell("default", position, proceeds, price, 0.55)
+
+        assert pnl == pytest.approx(proceeds - 150)
+        assert ledger.positions() == []
+        assert ledger.account()["cash"] == pytest.approx(pm.STARTING_CASH - 150 + proceeds)
+        trades = ledger.conn.execute("SELECT action, amount, pnl FROM trades ORDER BY id").fetchall()
+        assert [t["action"] for t in trades] == ["buy", "buy", "sell"]
+        assert trades[-1]["pnl"] == pytest.approx(pnl)
+
+        with pytest.raises(ValueError, match="No position"):
+            ledger.sell("default", position, proceeds, price, 0.55)
+
+    def test_insufficient_cash_changes_nothing(self, tmp_path):
+        ledger = pm.Ledger(tmp_path / "ledger.db")
+        ledger.reset_account("small", 50)
+
+        with pytest.raises(ValueError, match="Insufficient cash"):
+            ledger.buy("small", "slug", None, "m1", "Name", 200, 0.5, 0.5, 100)
+
+        assert ledger.account("small")["cash"] == 50
+        assert ledger.positions("small") == []
+        assert ledger.conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 0
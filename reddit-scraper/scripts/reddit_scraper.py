@@ -5,8 +5,12 @@ Reddit Scraper - Read and search Reddit posts via Reddit's public JSON API (no A
 
 import argparse
 import json
+import sqlite3
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 import time
 
 try:
@@ -17,17 +21,70 @@ except ImportError:
     sys.exit(1)
 
 
+class RateLimiter:
+    """Thread-safe token bucket that adapts to Reddit's x-ratelimit-* headers"""
+
+    def __init__(self, rate=1.0, burst=5):
+        self.rate = rate  # tokens per second
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def update(self, headers):
+        """Spread the remaining request budget evenly over the time until reset"""
+        try:
+            remaining = float(headers['x-ratelimit-remaining'])
+            reset = max(float(headers['x-ratelimit-reset']), 1.0)
+        except (KeyError, TypeError, ValueError):
+            return
+        with self.lock:
+            self._refill(time.monotonic())
+            # With nothing left, the next token arrives when the window resets
+            self.rate = remaining / reset if remaining >= 1 else 1 / reset
+            self.tokens = min(self.tokens, max(remaining - 1, 0))
+
+    def backoff(self, seconds):
+        """Hold all requests for `seconds` after a 429"""
+        with self.lock:
+            self.tokens = 0.0
+            self.rate = 1 / max(seconds, 1.0)
+            self.updated = time.monotonic()
+
+
 class RedditScraper:
     BASE_URL = "https://www.reddit.com"
+    PAGE_SIZE = 100  # Reddit's maximum per listing request
+    MAX_RETRIES = 3
 
-    def __init__(self):
+    def __init__(self, workers=4):
+        self.workers = workers
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Clawdbot/1.0 (Reddit Reader; +https://github.com/clawdbot)'
         })
+        # Size the connection pool so concurrent fetches reuse connections
+        adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.limiter = RateLimiter(burst=workers)
 
     def get_subreddit_posts(self, subreddit, sort='top', limit=25, time_filter='day'):
-        """Fetch posts from a subreddit using JSON API"""
+        """Fetch posts from a subreddit using JSON API, following pagination up to limit"""
         sort_map = {
             'hot': 'hot',
             'new': 'new',
@@ -40,20 +97,19 @@ class RedditScraper:
         sort_param = sort_map.get(sort, 'top')
         url = f"{self.BASE_URL}/r/{subreddit}/{sort_param}.json"
         
-        params = {'limit': limit}
+        params = {}
         if sort_param == 'top':
             params['t'] = time_filter  # hour, day, week, month, year, all
             
-        return self._fetch_json(url, params)
+        return self._fetch_listing(url, params, limit)
 
     def search_posts(self, query, subreddit=None, limit=25, sort='relevance', time_filter='all'):
-        """Search for posts using JSON API"""
+        """Search for posts using JSON API, following pagination up to limit"""
         if subreddit:
             url = f"{self.BASE_URL}/r/{subreddit}/search.json"
             params = {
                 'q': query,
                 'restrict_sr': 'on',
-                'limit': limit,
                 'sort': sort,
                 't': time_filter
             }
@@ -61,20 +117,74 @@ class RedditScraper:
             url = f"{self.BASE_URL}/search.json"
             params = {
                 'q': query,
-                'limit': limit,
                 'sort': sort,
                 't': time_filter
             }
             
-        return self._fetch_json(url, params)
+        return self._fetch_listing(url, params, limit)
+
+    def get_many_subreddits(self, subreddits, sort='top', limit=25, time_filter='day'):
+        """Fetch several subreddits concurrently; limit applies per subreddit"""
+        return self._fan_out(subreddits, lambda sub: self.get_subreddit_posts(sub, sort, limit, time_filter))
+
+    def search_many_subreddits(self, query, subreddits, limit=25, sort='relevance', time_filter='all'):
+        """Search within several subreddits concurrently; limit applies per subreddit"""
+        return self._fan_out(subreddits, lambda sub: self.search_posts(query, sub, limit, sort, time_filter))
+
+    def _fan_out(self, subreddits, fetch):
+        """Run fetch for each subreddit on a thread pool, keeping input order"""
+        if len(subreddits) == 1:
+            return fetch(subreddits[0])
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(subreddits))) as pool:
+            results = list(pool.map(fetch, subreddits))
+        return [post for posts in results for post in posts]
 
-    def _fetch_json(self, url, params=None):
-        """Fetch and parse posts from Reddit JSON API"""
+    def _fetch_listing(self, url, params, limit):
+        """Follow the `after` cursor until limit posts are collected or the listing ends"""
         all_posts = []
+        seen = set()
+        after = None
 
-        try:
+        while len(all_posts) < limit:
+            page_params = dict(params, limit=min(self.PAGE_SIZE, limit - len(all_posts)))
+            if after:
+                page_params['after'] = after
+                page_params['count'] = len(seen)
+            posts, after = self._fetch_page(url, page_params)
+
+            # Listings shift while paging (e.g. /new), so skip posts already returned
+            new_posts = [p for p in posts if p['id'] not in seen]
+            seen.update(p['id'] for p in new_posts)
+            all_posts.extend(new_posts)
+            if not after or not posts:
+                break
+
+        return all_posts[:limit]
+
+    def _get(self, url, params):
+        """GET through the rate limiter, retrying after 429 responses"""
+        for _ in range(self.MAX_RETRIES + 1):
+            self.limiter.acquire()
             response = self.session.get(url, params=params, timeout=15)
-            response.raise_for_status()
+            self.limiter.update(response.headers)
+            if response.status_code != 429:
+                break
+            retry_after = response.headers.get('retry-after') or response.headers.get('x-ratelimit-reset') or 5
+            try:
+                retry_after = float(retry_after)
+            except ValueError:
+                retry_after = 5.0
+            print(f"Rate limited, waiting {retry_after:.0f}s", file=sys.stderr)
+            self.limiter.backoff(retry_after)
+        response.raise_for_status()
+        return response
+
+    def _fetch_page(self, url, params=None):
+        """Fetch and parse one page of posts, returning (posts, after cursor)"""
+        all_posts = []
+
+        try:
+            response = self._get(url, params)
             
             data = response.json()
             
@@ -82,7 +192,7 @@ class RedditScraper:
             if 'data' in data and 'children' in data['data']:
                 children = data['data']['children']
             else:
-                return all_posts
+                return all_posts, None
                 
             for child in children:
                 if child.get('kind') == 't3':  # t3 = link/post
@@ -91,12 +201,14 @@ class RedditScraper:
                     if post:
                         all_posts.append(post)
 
+            return all_posts, data['data'].get('after')
+
         except requests.RequestException as e:
             print(f"Error fetching {url}: {e}", file=sys.stderr)
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON: {e}", file=sys.stderr)
 
-        return all_posts
+        return all_posts, None
 
     def _parse_post(self, data):
         """Extract relevant fields from post data"""
@@ -113,6 +225,7 @@ class RedditScraper:
             short_url = f"https://redd.it/{post_id}" if post_id else f"https://reddit.com{data.get('permalink', '')}"
             
             return {
+                'id': post_id,
                 'title': data.get('title', ''),
                 'author': data.get('author', '[deleted]'),
                 'score': data.get('score', 0),
@@ -130,6 +243,117 @@ class RedditScraper:
             return None
 
 
+class RedditArchive:
+    """Local SQLite store of parsed posts, keyed by post id, with an FTS5 index"""
+
+    DEFAULT_PATH = Path.home() / '.cache' / 'reddit-scraper' / 'archive.db'
+    FIELDS = ('id', 'title', 'author', 'score', 'num_comments', 'url', 'subreddit',
+              'created_utc', 'flair', 'selftext', 'is_self', 'upvote_ratio')
+    TIME_WINDOWS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400,
+                    'month': 30 * 86400, 'year': 365 * 86400}
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS posts (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            author TEXT,
+            score INTEGER,
+            num_comments INTEGER,
+            url TEXT,
+            subreddit TEXT,
+            created_utc INTEGER,
+            flair TEXT,
+            selftext TEXT,
+            is_self INTEGER,
+            upvote_ratio REAL,
+            archived_at INTEGER
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+            title, selftext, flair,
+            content='posts', content_rowid='rowid', tokenize='porter unicode61'
+        );
+        CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+            INSERT INTO posts_fts(rowid, title, selftext, flair)
+            VALUES (new.rowid, new.title, new.selftext, new.flair);
+        END;
+        CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, selftext, flair)
+            VALUES ('delete', old.rowid, old.title, old.selftext, old.flair);
+        END;
+        -- Score and comment refreshes leave the text index untouched
+        CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE OF title, selftext, flair ON posts
+        WHEN old.title IS NOT new.title OR old.selftext IS NOT new.selftext OR old.flair IS NOT new.flair
+        BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, selftext, flair)
+            VALUES ('delete', old.rowid, old.title, old.selftext, old.flair);
+            INSERT INTO posts_fts(rowid, title, selftext, flair)
+            VALUES (new.rowid, new.title, new.selftext, new.flair);
+        END;
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else self.DEFAULT_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(self.SCHEMA)
+
+    def upsert(self, posts):
+        """Insert new posts and refresh stored ones; returns the number written"""
+        now = int(time.time())
+        rows = [tuple(post.get(f) for f in self.FIELDS) + (now,) for post in posts if post.get('id')]
+        columns = ', '.join(self.FIELDS)
+        updates = ', '.join(f"{f} = excluded.{f}" for f in self.FIELDS[1:])
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO posts ({columns}, archived_at) VALUES ({', '.join('?' * (len(self.FIELDS) + 1))}) "
+                f"ON CONFLICT(id) DO UPDATE SET {updates}, archived_at = excluded.archived_at",
+                rows,
+            )
+        return len(rows)
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM posts').fetchone()[0]
+
+    def search(self, query, limit=25, time_filter=None, min_score=None, subreddits=None):
+        """Full-text search ranked by bm25 (title weighted highest), newest first on ties"""
+        where = ['posts_fts MATCH ?']
+        params = []
+        if time_filter in self.TIME_WINDOWS:
+            where.append('p.created_utc >= ?')
+            params.append(int(time.time()) - self.TIME_WINDOWS[time_filter])
+        if min_score is not None:
+            where.append('p.score >= ?')
+            params.append(min_score)
+        if subreddits:
+            where.append(f"p.subreddit COLLATE NOCASE IN ({', '.join('?' * len(subreddits))})")
+            params.extend(subreddits)
+        sql = (
+            f"SELECT {', '.join('p.' + f for f in self.FIELDS)} "
+            "FROM posts_fts JOIN posts p ON p.rowid = posts_fts.rowid "
+            f"WHERE {' AND '.join(where)} "
+            "ORDER BY bm25(posts_fts, 10.0, 1.0, 3.0), p.created_utc DESC LIMIT ?"
+        )
+
+        try:
+            rows = self.conn.execute(sql, [query, *params, limit]).fetchall()
+        except sqlite3.OperationalError:
+            # Not valid FTS5 syntax (e.g. "gpt-4" or a stray quote): match the words literally
+            quoted = ' '.join('"' + word.replace('"', '""') + '"' for word in query.split())
+            rows = self.conn.execute(sql, [quoted, *params, limit]).fetchall() if quoted else []
+
+        posts = []
+        for row in rows:
+            post = dict(row)
+            post['is_self'] = bool(post['is_self'])
+            posts.append(post)
+        return posts
+
+    def close(self):
+        self.conn.close()
+
+
 def format_posts(posts, as_json=False, verbose=False):
     """Format and display posts"""
     if not posts:
@@ -169,14 +393,23 @@ def format_posts(posts, as_json=False, verbose=False):
 
 def main():
     parser = argparse.ArgumentParser(description='Reddit Scraper - Read and search Reddit posts (JSON API)')
-    parser.add_argument('--subreddit', '-s', help='Subreddit name (without r/)')
+    parser.add_argument('--subreddit', '-s', help='Subreddit name (without r/), comma-separate several to fetch concurrently')
     parser.add_argument('--search', '-q', help='Search query')
     parser.add_argument('--sort', choices=['hot', 'new', 'top', 'populares', 'nuevos', 'rising'], default='top',
                     help='Sort order (default: top)')
-    parser.add_argument('--time', '-t', choices=['hour', 'day', 'week', 'month', 'year', 'all'], default='day',
-                    help='Time filter for top/search (default: day)')
+    parser.add_argument('--time', '-t', choices=['hour', 'day', 'week', 'month', 'year', 'all'],
+                    help='Time filter for top/search (default: day; all for --local-search)')
     parser.add_argument('--limit', '-n', type=int, default=25,
-                    help='Number of posts to fetch (default: 25)')
+                    help='Number of posts to fetch per subreddit, paging past 100 (default: 25)')
+    parser.add_argument('--workers', '-w', type=int, default=4,
+                    help='Concurrent requests for multiple subreddits (default: 4)')
+    parser.add_argument('--archive', '-a', action='store_true',
+                    help='Save fetched posts to the local archive')
+    parser.add_argument('--local-search', '-l', metavar='QUERY',
+                    help='Full-text search the local archive instead of reddit.com')
+    parser.add_argument('--min-score', type=int,
+                    help='Minimum score for --local-search results')
+    parser.add_argument('--db', help=f'Archive database path (default: {RedditArchive.DEFAULT_PATH})')
     parser.add_argument('--json', '-j', action='store_true',
                     help='Output as JSON')
     parser.add_argument('--verbose', '-v', action='store_true',
@@ -184,18 +417,38 @@ def main():
 
     args = parser.parse_args()
 
-    scraper = RedditScraper()
+    subreddits = [s.strip() for s in (args.subreddit or '').split(',') if s.strip()]
 
-    if args.search:
-        posts = scraper.search_posts(args.search, args.subreddit, args.limit, 
-                                     sort='relevance' if args.sort == 'top' else args.sort,
-                                     time_filter=args.time)
-        format_posts(posts, args.json, args.verbose)
-    elif args.subreddit:
-        posts = scraper.get_subreddit_posts(args.subreddit, args.sort, args.limit, args.time)
+    if args.local_search:
+        archive = RedditArchive(args.db)
+        posts = archive.search(args.local_search, args.limit, args.time, args.min_score, subreddits)
+        archive.close()
         format_posts(posts, args.json, args.verbose)
+        return
+
+    scraper = RedditScraper(workers=max(args.workers, 1))
+    time_filter = args.time or 'day'
+
+    if args.search:
+        sort = 'relevance' if args.sort == 'top' else args.sort
+        if subreddits:
+            posts = scraper.search_many_subreddits(args.search, subreddits, args.limit,
+                                                   sort=sort, time_filter=time_filter)
+        else:
+            posts = scraper.search_posts(args.search, None, args.limit,
+                                         sort=sort, time_filter=time_filter)
+    elif subreddits:
+        posts = scraper.get_many_subreddits(subreddits, args.sort, args.limit, time_filter)
     else:
         parser.print_help()
+        return
+
+    if args.archive:
+        archive = RedditArchive(args.db)
+        saved = archive.upsert(posts)
+        print(f"📦 Archived {saved} posts ({archive.count()} total in {archive.path})", file=sys.stderr)
+        archive.close()
+    format_posts(posts, args.json, args.verbose)
 
 
 if __name__ == '__main__':
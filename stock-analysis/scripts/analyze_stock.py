@@ -16,17 +16,57 @@ Usage:
     uv run analyze_stock.py TICKER [TICKER2 ...] [--output text|json] [--verbose]
 """
 
+from __future__ import annotations
+
 import argparse
-import asyncio
+import importlib
 import json
 import sys
+import threading
 import time
+from collections import Counter
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from pathlib import Path
 from typing import Literal
 
-import pandas as pd
-import yfinance as yf
+from profiling import (
+    CACHE_DIR,
+    TRACER,
+    current_span,
+    format_profile_table,
+    record_stage_history,
+    span,
+    timed_fetch,
+    traced,
+    write_chrome_trace,
+)
+
+
+class _LazyModule:
+    """
+    Stand-in for a heavy module that imports it on first attribute access.
+    pandas + yfinance take ~0.5s to import (asyncio another ~30ms); --help and
+    early exits skip that.
+    edgar, feedparser and fear_and_greed are imported inside the stages that
+    use them, so --fast / --no-insider never load them.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            with span(f"import {self._name}", "import"):
+                self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+asyncio = _LazyModule("asyncio")
+np = _LazyModule("numpy")
+pd = _LazyModule("pandas")
+yf = _LazyModule("yfinance")
 
 
 # Top 20 supported cryptocurrencies
@@ -227,16 +267,109 @@ class Signal:
     components: dict
 
 
-def fetch_stock_data(ticker: str, verbose: bool = False) -> StockData | None:
+# ============================================================================
+# Market Snapshot (one fetch per symbol per run)
+# ============================================================================
+
+# Every history fetch pulls at least this much, so later (shorter) requests
+# for the same symbol are sliced locally instead of hitting Yahoo again.
+SNAPSHOT_HISTORY_PERIOD = "1y"
+
+
+def period_to_days(period: str) -> int:
+    """Approximate calendar days covered by a yfinance period ("5d", "1mo", "1y")."""
+    if period.endswith("mo"):
+        return int(period[:-2]) * 31
+    if period.endswith("y"):
+        return int(period[:-1]) * 366
+    if period.endswith("d"):
+        return int(period[:-1])
+    raise ValueError(f"Unsupported period: {period}")
+
+
+SNAPSHOT_HISTORY_DAYS = period_to_days(SNAPSHOT_HISTORY_PERIOD)
+
+
+class MarketSnapshot:
+    """
+    Quotes and price histories fetched during one run, keyed by symbol.
+
+    main() builds one and passes it to every analyzer, so shared symbols
+    (^VIX, SPY, QQQ, BTC-USD, sector ETFs) and the analyzed tickers themselves
+    hit Yahoo at most once for .info and once for .history. Thread-safe: the
+    sentiment helpers read it from worker threads. Failed fetches are not
+    cached, so callers' retries still go to the network.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._symbol_locks: dict[str, threading.Lock] = {}
+        self._tickers: dict[str, object] = {}
+        self._info: dict[str, dict] = {}
+        self._history: dict[str, tuple[int, pd.DataFrame]] = {}  # symbol -> (days covered, frame)
+        self.stock_data: dict[str, StockData] = {}
+        self.fetch_counts: Counter = Counter()  # (symbol, "info" | "history") -> network calls
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def ticker(self, symbol: str):
+        """Shared yf.Ticker for a symbol (for endpoints the snapshot doesn't memoize)."""
+        with self._lock:
+            if symbol not in self._tickers:
+                self._tickers[symbol] = yf.Ticker(symbol)
+            return self._tickers[symbol]
+
+    def info(self, symbol: str) -> dict:
+        """Quote/profile dict (yf.Ticker.info), fetched once."""
+        with self._symbol_lock(symbol):
+            if symbol not in self._info:
+                stock = self.ticker(symbol)
+                self.fetch_counts[(symbol, "info")] += 1
+                self._info[symbol] = timed_fetch("yf.info", lambda: stock.info, ticker=symbol)
+            return self._info[symbol]
+
+    def history(self, symbol: str, period: str = SNAPSHOT_HISTORY_PERIOD) -> pd.DataFrame:
+        """Daily price history for the last `period`, sliced from one fetch of at least 1y."""
+        days = period_to_days(period)
+        with self._symbol_lock(symbol):
+            cached = self._history.get(symbol)
+            if cached is None or cached[0] < days:
+                fetch_period = period if days > SNAPSHOT_HISTORY_DAYS else SNAPSHOT_HISTORY_PERIOD
+                stock = self.ticker(symbol)
+                self.fetch_counts[(symbol, "history")] += 1
+                hist = timed_fetch("yf.history", lambda: stock.history(period=fetch_period), ticker=symbol, period=fetch_period)
+                cached = (max(days, SNAPSHOT_HISTORY_DAYS), hist)
+                self._history[symbol] = cached
+
+        covered, hist = cached
+        if days >= covered or hist.empty:
+            return hist
+        return hist[hist.index >= hist.index[-1] - pd.Timedelta(days=days)]
+
+    def last_close(self, symbol: str) -> float | None:
+        hist = self.history(symbol)
+        if hist.empty:
+            return None
+        return float(hist["Close"].iloc[-1])
+
+
+@traced()
+def fetch_stock_data(ticker: str, verbose: bool = False, snapshot: MarketSnapshot | None = None) -> StockData | None:
     """Fetch stock data from Yahoo Finance with retry logic."""
+    snapshot = snapshot or MarketSnapshot()
+    if ticker in snapshot.stock_data:
+        return snapshot.stock_data[ticker]
+
     max_retries = 3
     for attempt in range(max_retries):
         try:
             if verbose:
                 print(f"Fetching data for {ticker}... (attempt {attempt + 1}/{max_retries})", file=sys.stderr)
 
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            stock = snapshot.ticker(ticker)
+            info = snapshot.info(ticker)
 
             # Validate ticker
             if not info or "regularMarketPrice" not in info:
@@ -244,26 +377,26 @@ def fetch_stock_data(ticker: str, verbose: bool = False) -> StockData | None:
 
             # Fetch earnings history
             try:
-                earnings_history = stock.earnings_dates
+                earnings_history = timed_fetch("yf.earnings_dates", lambda: stock.earnings_dates, ticker=ticker)
             except Exception:
                 earnings_history = None
 
             # Fetch analyst info
             try:
                 analyst_info = {
-                    "recommendations": stock.recommendations,
-                    "analyst_price_targets": stock.analyst_price_targets,
+                    "recommendations": timed_fetch("yf.recommendations", lambda: stock.recommendations, ticker=ticker),
+                    "analyst_price_targets": timed_fetch("yf.analyst_price_targets", lambda: stock.analyst_price_targets, ticker=ticker),
                 }
             except Exception:
                 analyst_info = None
 
             # Fetch price history (1 year for historical patterns)
             try:
-                price_history = stock.history(period="1y")
+                price_history = snapshot.history(ticker, "1y")
             except Exception:
                 price_history = None
 
-            return StockData(
+            data = StockData(
                 ticker=ticker,
                 info=info,
                 earnings_history=earnings_history,
@@ -271,6 +404,8 @@ def fetch_stock_data(ticker: str, verbose: bool = False) -> StockData | None:
                 price_history=price_history,
                 asset_type=detect_asset_type(ticker),
             )
+            snapshot.stock_data[ticker] = data
+            return data
 
         except Exception as e:
             if attempt < max_retries - 1:
@@ -286,6 +421,7 @@ def fetch_stock_data(ticker: str, verbose: bool = False) -> StockData | None:
     return None
 
 
+@traced()
 def analyze_earnings_surprise(data: StockData) -> EarningsSurprise | None:
     """Analyze earnings surprise from most recent quarter."""
     if data.earnings_history is None or data.earnings_history.empty:
@@ -335,6 +471,7 @@ def analyze_earnings_surprise(data: StockData) -> EarningsSurprise | None:
         return None
 
 
+@traced()
 def analyze_fundamentals(data: StockData) -> Fundamentals | None:
     """Analyze fundamental metrics."""
     info = data.info
@@ -409,10 +546,16 @@ def analyze_fundamentals(data: StockData) -> Fundamentals | None:
         return None
 
 
-def analyze_crypto_fundamentals(data: StockData, verbose: bool = False) -> CryptoFundamentals | None:
+@traced()
+def analyze_crypto_fundamentals(
+    data: StockData,
+    verbose: bool = False,
+    snapshot: MarketSnapshot | None = None,
+) -> CryptoFundamentals | None:
     """Analyze crypto-specific fundamentals (market cap, supply, category)."""
     if data.asset_type != "crypto":
         return None
+    snapshot = snapshot or MarketSnapshot()
 
     info = data.info
     ticker = data.ticker.upper()
@@ -454,8 +597,7 @@ def analyze_crypto_fundamentals(data: StockData, verbose: bool = False) -> Crypt
         btc_correlation = None
         try:
             if ticker != "BTC-USD" and data.price_history is not None:
-                btc = yf.Ticker("BTC-USD")
-                btc_hist = btc.history(period="1mo")
+                btc_hist = snapshot.history("BTC-USD", "1mo")
                 if not btc_hist.empty and len(data.price_history) > 5:
                     # Align dates and calculate correlation
                     crypto_returns = data.price_history["Close"].pct_change().dropna()
@@ -503,6 +645,7 @@ def analyze_crypto_fundamentals(data: StockData, verbose: bool = False) -> Crypt
         return None
 
 
+@traced()
 def analyze_analyst_sentiment(data: StockData) -> AnalystSentiment | None:
     """Analyze analyst sentiment and price targets."""
     info = data.info
@@ -576,6 +719,7 @@ def analyze_analyst_sentiment(data: StockData) -> AnalystSentiment | None:
         )
 
 
+@traced()
 def analyze_historical_patterns(data: StockData) -> HistoricalPatterns | None:
     """Analyze historical earnings patterns."""
     if data.earnings_history is None or data.price_history is None:
@@ -650,7 +794,8 @@ def analyze_historical_patterns(data: StockData) -> HistoricalPatterns | None:
         return None
 
 
-def analyze_market_context(verbose: bool = False) -> MarketContext | None:
+@traced()
+def analyze_market_context(verbose: bool = False, snapshot: MarketSnapshot | None = None) -> MarketContext | None:
     """Analyze overall market conditions using VIX, SPY, QQQ, and safe-havens with 1h cache."""
     # Check cache first
     cached = _get_cached("market_context")
@@ -659,18 +804,14 @@ def analyze_market_context(verbose: bool = False) -> MarketContext | None:
             print("Using cached market context (< 1h old)", file=sys.stderr)
         return cached
 
+    snapshot = snapshot or MarketSnapshot()
+
     try:
         if verbose:
             print("Fetching market indicators (VIX, SPY, QQQ)...", file=sys.stderr)
 
-        # Fetch market indicators
-        vix = yf.Ticker("^VIX")
-        spy = yf.Ticker("SPY")
-        qqq = yf.Ticker("QQQ")
-
-        # Get current VIX level
-        vix_info = vix.info
-        vix_level = vix_info.get("regularMarketPrice") or vix_info.get("currentPrice")
+        # Current VIX level (last close; same history get_vix_term_structure reads)
+        vix_level = snapshot.last_close("^VIX")
 
         if not vix_level:
             return None
@@ -687,8 +828,8 @@ def analyze_market_context(verbose: bool = False) -> MarketContext | None:
             vix_score = -0.5
 
         # Get SPY and QQQ 10-day trends
-        spy_hist = spy.history(period="1mo")
-        qqq_hist = qqq.history(period="1mo")
+        spy_hist = snapshot.history("SPY", "1mo")
+        qqq_hist = snapshot.history("QQQ", "1mo")
 
         if spy_hist.empty or qqq_hist.empty:
             return None
@@ -729,13 +870,9 @@ def analyze_market_context(verbose: bool = False) -> MarketContext | None:
                 print("Fetching safe-haven indicators (GLD, TLT, UUP)...", file=sys.stderr)
 
             # Fetch safe-haven ETFs
-            gld = yf.Ticker("GLD")  # Gold
-            tlt = yf.Ticker("TLT")  # 20+ Year Treasury
-            uup = yf.Ticker("UUP")  # USD Index
-
-            gld_hist = gld.history(period="10d")
-            tlt_hist = tlt.history(period="10d")
-            uup_hist = uup.history(period="10d")
+            gld_hist = snapshot.history("GLD", "10d")  # Gold
+            tlt_hist = snapshot.history("TLT", "10d")  # 20+ Year Treasury
+            uup_hist = snapshot.history("UUP", "10d")  # USD Index
 
             # Calculate 5-day changes
             if not gld_hist.empty and len(gld_hist) >= 5:
@@ -868,6 +1005,7 @@ GEOPOLITICAL_RISK_MAP = {
 }
 
 
+@traced()
 def check_breaking_news(verbose: bool = False) -> list[str] | None:
     """
     Check Google News RSS for breaking market/economic crisis events (last 24h).
@@ -899,7 +1037,7 @@ def check_breaking_news(verbose: bool = False) -> list[str] | None:
 
         for url in rss_urls:
             try:
-                feed = feedparser.parse(url)
+                feed = timed_fetch("feedparser.parse", lambda: feedparser.parse(url), url=url)
 
                 for entry in feed.entries[:20]:  # Check top 20 headlines
                     # Parse publication date
@@ -1014,8 +1152,14 @@ def check_sector_geopolitical_risk(
     return None, 0.0
 
 
-def analyze_sector_performance(data: StockData, verbose: bool = False) -> SectorComparison | None:
+@traced()
+def analyze_sector_performance(
+    data: StockData,
+    verbose: bool = False,
+    snapshot: MarketSnapshot | None = None,
+) -> SectorComparison | None:
     """Compare stock performance to its sector."""
+    snapshot = snapshot or MarketSnapshot()
     try:
         sector = data.info.get("sector")
         industry = data.info.get("industry")
@@ -1034,8 +1178,7 @@ def analyze_sector_performance(data: StockData, verbose: bool = False) -> Sector
             print(f"Comparing to sector ETF: {sector_etf_ticker}", file=sys.stderr)
 
         # Fetch sector ETF data
-        sector_etf = yf.Ticker(sector_etf_ticker)
-        sector_hist = sector_etf.history(period="3mo")
+        sector_hist = snapshot.history(sector_etf_ticker, "3mo")
 
         if sector_hist.empty or data.price_history is None or data.price_history.empty:
             return None
@@ -1101,6 +1244,7 @@ def analyze_sector_performance(data: StockData, verbose: bool = False) -> Sector
         return None
 
 
+@traced()
 def analyze_earnings_timing(data: StockData) -> EarningsTiming | None:
     """Check earnings timing and flag pre/post-earnings periods."""
     try:
@@ -1204,6 +1348,7 @@ def calculate_rsi(prices: pd.Series, period: int = 14) -> float | None:
         return None
 
 
+@traced()
 def analyze_momentum(data: StockData) -> MomentumAnalysis | None:
     """Analyze momentum indicators (RSI, 52w range, volume, relative strength)."""
     try:
@@ -1305,7 +1450,9 @@ def _get_cached(key: str):
     if key in _SENTIMENT_CACHE:
         value, timestamp = _SENTIMENT_CACHE[key]
         if time.time() - timestamp < _CACHE_TTL_SECONDS:
+            current_span().mark_cache(True)
             return value
+    current_span().mark_cache(False)
     return None
 
 
@@ -1314,6 +1461,7 @@ def _set_cache(key: str, value):
     _SENTIMENT_CACHE[key] = (value, time.time())
 
 
+@traced(category="sentiment")
 async def get_fear_greed_index() -> tuple[float, int | None, str | None] | None:
     """
     Fetch CNN Fear & Greed Index (contrarian indicator) with 1h cache.
@@ -1327,7 +1475,7 @@ async def get_fear_greed_index() -> tuple[float, int | None, str | None] | None:
     def _fetch():
         try:
             from fear_and_greed import get as get_fear_greed
-            result = get_fear_greed()
+            result = timed_fetch("fear_and_greed.get", get_fear_greed)
             return result
         except Exception:
             return None
@@ -1359,6 +1507,7 @@ async def get_fear_greed_index() -> tuple[float, int | None, str | None] | None:
         return None
 
 
+@traced(category="sentiment")
 async def get_short_interest(data: StockData) -> tuple[float, float | None, float | None] | None:
     """
     Analyze short interest (from yfinance).
@@ -1392,7 +1541,8 @@ async def get_short_interest(data: StockData) -> tuple[float, float | None, floa
         return None
 
 
-async def get_vix_term_structure() -> tuple[float, str | None, float | None] | None:
+@traced(category="sentiment")
+async def get_vix_term_structure(snapshot: MarketSnapshot | None = None) -> tuple[float, str | None, float | None] | None:
     """
     Analyze VIX futures term structure (contango vs backwardation) with 1h cache.
     Returns: (score, structure, slope) or None.
@@ -1402,14 +1552,11 @@ async def get_vix_term_structure() -> tuple[float, str | None, float | None] | N
     if cached is not None:
         return cached
 
+    snapshot = snapshot or MarketSnapshot()
+
     def _fetch():
         try:
-            import yfinance as yf
-            vix = yf.Ticker("^VIX")
-            vix_data = vix.history(period="5d")
-            if vix_data.empty:
-                return None
-            return vix_data["Close"].iloc[-1]
+            return snapshot.last_close("^VIX")
         except Exception:
             return None
 
@@ -1443,6 +1590,7 @@ async def get_vix_term_structure() -> tuple[float, str | None, float | None] | N
         return None
 
 
+@traced(category="sentiment")
 async def get_insider_activity(ticker: str, period_days: int = 90) -> tuple[float, int | None, float | None] | None:
     """
     Analyze insider trading from SEC Form 4 filings using edgartools.
@@ -1467,7 +1615,7 @@ async def get_insider_activity(ticker: str, period_days: int = 90) -> tuple[floa
 
             # Get company and Form 4 filings
             company = Company(ticker)
-            filings = company.get_filings(form="4")
+            filings = timed_fetch("edgar.get_filings", lambda: company.get_filings(form="4"), ticker=ticker)
 
             if filings is None or len(filings) == 0:
                 return None
@@ -1504,7 +1652,7 @@ async def get_insider_activity(ticker: str, period_days: int = 90) -> tuple[floa
                         continue
 
                     # Get Form 4 object
-                    form4 = filing.obj()
+                    form4 = timed_fetch("edgar.form4", filing.obj, ticker=ticker)
                     if form4 is None:
                         continue
 
@@ -1560,6 +1708,7 @@ async def get_insider_activity(ticker: str, period_days: int = 90) -> tuple[floa
         return None
 
 
+@traced(category="sentiment")
 async def get_put_call_ratio(data: StockData) -> tuple[float, float | None, int | None, int | None] | None:
     """
     Calculate put/call ratio from options chain (contrarian indicator).
@@ -1571,12 +1720,12 @@ async def get_put_call_ratio(data: StockData) -> tuple[float, float | None, int
                 return None
 
             # Get options chain for nearest expiration
-            expirations = data.ticker_obj.options
+            expirations = timed_fetch("yf.options", lambda: data.ticker_obj.options, ticker=data.ticker)
             if not expirations or len(expirations) == 0:
                 return None
 
             nearest_exp = expirations[0]
-            opt_chain = data.ticker_obj.option_chain(nearest_exp)
+            opt_chain = timed_fetch("yf.option_chain", lambda: data.ticker_obj.option_chain(nearest_exp), ticker=data.ticker)
 
             # Calculate total put and call volume
             put_volume = opt_chain.puts["volume"].sum() if "volume" in opt_chain.puts.columns else 0
@@ -1612,7 +1761,13 @@ async def get_put_call_ratio(data: StockData) -> tuple[float, float | None, int
         return None
 
 
-async def analyze_sentiment(data: StockData, verbose: bool = False, skip_insider: bool = False) -> SentimentAnalysis | None:
+@traced()
+async def analyze_sentiment(
+    data: StockData,
+    verbose: bool = False,
+    skip_insider: bool = False,
+    snapshot: MarketSnapshot | None = None,
+) -> SentimentAnalysis | None:
     """
     Analyze market sentiment using 5 sub-indicators in parallel.
     Requires at least 2 of 5 indicators for valid sentiment.
@@ -1650,7 +1805,7 @@ async def analyze_sentiment(data: StockData, verbose: bool = False, skip_insider
         tasks = [
             asyncio.wait_for(get_fear_greed_index(), timeout=10),
             asyncio.wait_for(get_short_interest(data), timeout=10),
-            asyncio.wait_for(get_vix_term_structure(), timeout=10),
+            asyncio.wait_for(get_vix_term_structure(snapshot), timeout=10),
         ]
         
         if skip_insider:
@@ -1765,6 +1920,7 @@ async def analyze_sentiment(data: StockData, verbose: bool = False, skip_insider
     )
 
 
+@traced()
 def synthesize_signal(
     ticker: str,
     company_name: str,
@@ -2153,6 +2309,18 @@ def main():
         action="store_true",
         help="Fast mode: skip slow analyses (insider, breaking news)"
     )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="table",
+        choices=["table", "trace"],
+        help="Profile the run: per-stage timing table (default) or Chrome-trace JSON"
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=str,
+        help="Chrome-trace output path (default: cache/profile-<timestamp>.json)"
+    )
 
     args = parser.parse_args()
     
@@ -2160,6 +2328,9 @@ def main():
     if args.fast:
         args.no_insider = True
 
+    if args.profile:
+        TRACER.enable()
+
     # Handle portfolio mode
     portfolio_assets = []
     portfolio_name = None
@@ -2214,6 +2385,7 @@ def main():
         print(f"  Found {len(breaking_news)} breaking news alert(s)\n", file=sys.stderr)
 
     results = []
+    snapshot = MarketSnapshot()
 
     for ticker in args.tickers:
         ticker = ticker.upper()
@@ -2222,7 +2394,7 @@ def main():
             print(f"\n=== Analyzing {ticker} ===\n", file=sys.stderr)
 
         # Fetch data
-        data = fetch_stock_data(ticker, verbose=args.verbose)
+        data = fetch_stock_data(ticker, verbose=args.verbose, snapshot=snapshot)
 
         if data is None:
             print(f"Error: Invalid ticker '{ticker}' or data unavailable", file=sys.stderr)
@@ -2250,7 +2422,7 @@ def main():
             # Crypto fundamentals (market cap, category, BTC correlation)
             if args.verbose:
                 print(f"Analyzing crypto fundamentals...", file=sys.stderr)
-            crypto_fundamentals = analyze_crypto_fundamentals(data, verbose=args.verbose)
+            crypto_fundamentals = analyze_crypto_fundamentals(data, verbose=args.verbose, snapshot=snapshot)
 
             # Convert crypto fundamentals to regular Fundamentals for synthesize_signal
             if crypto_fundamentals:
@@ -2279,12 +2451,12 @@ def main():
             # Analyze sector performance (stocks only)
             if args.verbose:
                 print(f"Analyzing sector performance...", file=sys.stderr)
-            sector = analyze_sector_performance(data, verbose=args.verbose)
+            sector = analyze_sector_performance(data, verbose=args.verbose, snapshot=snapshot)
 
         # Market context (both crypto and stock)
         if args.verbose:
             print(f"Analyzing market context...", file=sys.stderr)
-        market_context = analyze_market_context(verbose=args.verbose)
+        market_context = analyze_market_context(verbose=args.verbose, snapshot=snapshot)
 
         # Momentum (both crypto and stock)
         if args.verbose:
@@ -2298,7 +2470,9 @@ def main():
             # Skip insider trading and put/call for crypto
             sentiment = None
         else:
-            sentiment = asyncio.run(analyze_sentiment(data, verbose=args.verbose, skip_insider=args.no_insider))
+            sentiment = asyncio.run(analyze_sentiment(
+                data, verbose=args.verbose, skip_insider=args.no_insider, snapshot=snapshot
+            ))
 
         # Geopolitical risks (stocks only)
         if is_crypto:
@@ -2351,6 +2525,13 @@ def main():
 
         results.append(signal)
 
+    # Portfolio summary (computed once from the data fetched above)
+    portfolio_summary = None
+    if portfolio_assets:
+        portfolio_summary = generate_portfolio_summary(
+            results, portfolio_assets, portfolio_name, args.period, snapshot=snapshot
+        )
+
     # Output results
     if args.output == "json":
         if len(results) == 1:
@@ -2358,10 +2539,7 @@ def main():
         else:
             output_data = [asdict(r) for r in results]
             # Add portfolio summary if in portfolio mode
-            if portfolio_assets:
-                portfolio_summary = generate_portfolio_summary(
-                    results, portfolio_assets, portfolio_name, args.period
-                )
+            if portfolio_summary:
                 output_data = {
                     "portfolio": portfolio_name,
                     "assets": output_data,
@@ -2375,60 +2553,69 @@ def main():
             print(format_output_text(signal))
 
         # Print portfolio summary if in portfolio mode
-        if portfolio_assets:
-            print_portfolio_summary(results, portfolio_assets, portfolio_name, args.period)
+        if portfolio_summary:
+            print_portfolio_summary(portfolio_summary, results)
+
+    if args.profile:
+        emit_profile(args.profile, args.profile_output)
+
+
+def emit_profile(mode: str, output_path: str | None = None) -> None:
+    """Report collected spans to stderr and append them to the cross-run history."""
+    history = record_stage_history(TRACER.spans)
+
+    if mode == "trace":
+        path = Path(output_path) if output_path else CACHE_DIR / f"profile-{datetime.now():%Y%m%d-%H%M%S}.json"
+        write_chrome_trace(TRACER.spans, path)
+        print(f"Chrome trace written to {path} (open in chrome://tracing or ui.perfetto.dev)", file=sys.stderr)
+    else:
+        print(format_profile_table(TRACER.spans, history), file=sys.stderr)
+
+
+PORTFOLIO_PERIOD_DAYS = {
+    "daily": 1,
+    "weekly": 7,
+    "monthly": 30,
+    "quarterly": 90,
+    "yearly": 365,
+}
 
 
+@traced()
 def generate_portfolio_summary(
     results: list,
     portfolio_assets: list[tuple[str, float, float, str]],
     portfolio_name: str,
     period: str | None = None,
+    snapshot: MarketSnapshot | None = None,
 ) -> dict:
-    """Generate portfolio summary data."""
-    # Map results by ticker
-    result_map = {r.ticker: r for r in results}
-
-    # Calculate portfolio metrics
-    total_cost = 0.0
-    total_value = 0.0
-    asset_values = []
+    """
+    Generate portfolio summary data as one vectorized pass over the quotes and
+    histories already in the run's snapshot (no extra fetches in a normal run).
+    """
+    snapshot = snapshot or MarketSnapshot()
 
-    for ticker, quantity, cost_basis, asset_type in portfolio_assets:
-        cost_total = quantity * cost_basis
-        total_cost += cost_total
+    tickers = [ticker for ticker, _, _, _ in portfolio_assets]
+    quantities = np.array([quantity for _, quantity, _, _ in portfolio_assets], dtype=float)
+    costs = quantities * np.array([cost_basis for _, _, cost_basis, _ in portfolio_assets], dtype=float)
+    prices = np.array([_current_price(ticker, snapshot) for ticker in tickers], dtype=float)
+    values = quantities * prices
 
-        # Get current price from yfinance
-        try:
-            stock = yf.Ticker(ticker)
-            current_price = stock.info.get("regularMarketPrice", 0) or 0
-            current_value = quantity * current_price
-            total_value += current_value
-            asset_values.append((ticker, current_value, cost_total, asset_type))
-        except Exception:
-            asset_values.append((ticker, 0, cost_total, asset_type))
+    total_cost = float(costs.sum())
+    total_value = float(values.sum())
 
     # Calculate period returns if requested
     period_return = None
     if period and total_value > 0:
-        period_days = {
-            "daily": 1,
-            "weekly": 7,
-            "monthly": 30,
-            "quarterly": 90,
-            "yearly": 365,
-        }.get(period, 30)
-
-        period_return = calculate_portfolio_period_return(portfolio_assets, period_days)
+        period_days = PORTFOLIO_PERIOD_DAYS.get(period, 30)
+        period_return = calculate_portfolio_period_return(portfolio_assets, period_days, snapshot=snapshot)
 
     # Concentration analysis
     concentrations = []
     if total_value > 0:
-        for ticker, value, _, asset_type in asset_values:
-            if value > 0:
-                pct = value / total_value * 100
-                if pct > 30:
-                    concentrations.append(f"{ticker}: {pct:.1f}%")
+        weights = values / total_value * 100
+        for i in np.flatnonzero(weights > 30):
+            concentrations.append(f"{tickers[i]}: {weights[i]:.1f}%")
 
     # Build summary
     total_pnl = total_value - total_cost
@@ -2448,34 +2635,115 @@ def generate_portfolio_summary(
         summary["period"] = period
         summary["period_return_pct"] = period_return
 
+    if total_value > 0:
+        risk = analyze_portfolio_risk(portfolio_name, portfolio_assets, values, snapshot)
+        if risk is not None:
+            summary["risk"] = asdict(risk)
+
     return summary
 
 
+def _current_price(ticker: str, snapshot: MarketSnapshot) -> float:
+    """Current price from the snapshot's quote (0 if unavailable)."""
+    try:
+        return snapshot.info(ticker).get("regularMarketPrice", 0) or 0
+    except Exception:
+        return 0
+
+
+def build_close_matrix(tickers: list[str], snapshot: MarketSnapshot) -> pd.DataFrame:
+    """
+    Daily closes as one date x ticker frame from the snapshot's histories.
+    Bars are keyed by calendar date (stocks are stamped in exchange time,
+    crypto in UTC) and forward-filled, so exchange and 24/7 assets line up.
+    Tickers without history are all-NaN columns.
+    """
+    columns = {}
+    for ticker in tickers:
+        try:
+            hist = snapshot.history(ticker)
+        except Exception:
+            continue
+        if hist is None or hist.empty:
+            continue
+        index = hist.index
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        close = pd.Series(hist["Close"].to_numpy(), index=index.normalize())
+        columns[ticker] = close[~close.index.duplicated(keep="last")]
+
+    matrix = pd.DataFrame(columns).sort_index() if columns else pd.DataFrame()
+    return matrix.reindex(columns=tickers).ffill()
+
+
+@traced()
+def analyze_portfolio_risk(
+    portfolio_name: str,
+    portfolio_assets: list[tuple[str, float, float, str]],
+    values: np.ndarray,
+    snapshot: MarketSnapshot,
+):
+    """
+    Volatility, VaR/CVaR, drawdown, beta and risk contributions (see risk.py)
+    from the snapshot's 1y histories. Cached per portfolio, day and holdings.
+    """
+    from risk import compute_portfolio_risk, load_cached_risk, risk_cache_key, save_cached_risk
+
+    holdings = [(ticker, quantity) for ticker, quantity, _, _ in portfolio_assets]
+    key = risk_cache_key(portfolio_name, holdings)
+    cached = load_cached_risk(key)
+    current_span().mark_cache(cached is not None)
+    if cached is not None:
+        return cached
+
+    try:
+        tickers = [ticker for ticker, _, _, _ in portfolio_assets]
+        closes = build_close_matrix(tickers, snapshot)
+        benchmark = build_close_matrix(["SPY"], snapshot)["SPY"]
+        risk = compute_portfolio_risk(closes, dict(zip(tickers, values.tolist())), benchmark)
+    except Exception:
+        return None
+
+    if risk is not None:
+        save_cached_risk(key, risk)
+    return risk
+
+
+@traced()
 def calculate_portfolio_period_return(
     portfolio_assets: list[tuple[str, float, float, str]],
     period_days: int,
+    snapshot: MarketSnapshot | None = None,
 ) -> float | None:
-    """Calculate portfolio return over a period using historical prices."""
+    """
+    Calculate portfolio return over the last `period_days` (1 to 365) as
+    start-value weights · per-asset returns, from the 1y histories in the
+    snapshot. An asset listed mid-period counts from its first close.
+    """
+    snapshot = snapshot or MarketSnapshot()
     try:
-        total_start_value = 0.0
-        total_current_value = 0.0
-
-        for ticker, quantity, _, _ in portfolio_assets:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period=f"{period_days + 5}d")
+        tickers = [ticker for ticker, _, _, _ in portfolio_assets]
+        closes = build_close_matrix(tickers, snapshot)
+        if len(closes) < 2:
+            return None
 
-            if hist.empty or len(hist) < 2:
-                continue
+        quantities = np.array([quantity for _, quantity, _, _ in portfolio_assets], dtype=float)
+        prices = closes.bfill().to_numpy()
 
-            # Get price at period start and now
-            current_price = hist["Close"].iloc[-1]
-            start_price = hist["Close"].iloc[0]
+        # Last close on or before the period start (first row if history is shorter)
+        cutoff = closes.index[-1] - pd.Timedelta(days=period_days)
+        start_row = max(int(closes.index.searchsorted(cutoff, side="right")) - 1, 0)
+        start, end = prices[start_row], prices[-1]
 
-            total_current_value += quantity * current_price
-            total_start_value += quantity * start_price
+        held = ~(np.isnan(start) | np.isnan(end))
+        start_values = quantities[held] * start[held]
+        total_start_value = start_values.sum()
+        if total_start_value <= 0:
+            return None
 
-        if total_start_value > 0:
-            return (total_current_value - total_start_value) / total_start_value * 100
+        weights = start_values / total_start_value
+        returns = end[held] / start[held] - 1
+        return float(weights @ returns * 100)
 
     except Exception:
         pass
@@ -2483,14 +2751,9 @@ def calculate_portfolio_period_return(
     return None
 
 
-def print_portfolio_summary(
-    results: list,
-    portfolio_assets: list[tuple[str, float, float, str]],
-    portfolio_name: str,
-    period: str | None = None,
-) -> None:
-    """Print portfolio summary in text format."""
-    summary = generate_portfolio_summary(results, portfolio_assets, portfolio_name, period)
+def print_portfolio_summary(summary: dict, results: list) -> None:
+    """Print a summary from generate_portfolio_summary in text format."""
+    portfolio_name = summary["portfolio_name"]
 
     print("\n" + "=" * 77)
     print(f"PORTFOLIO SUMMARY: {portfolio_name}")
@@ -2513,6 +2776,24 @@ def print_portfolio_summary(
         period_sign = "+" if period_return >= 0 else ""
         print(f"{summary['period'].capitalize()} Return: {period_sign}{period_return:.1f}%")
 
+    # Risk
+    risk = summary.get("risk")
+    if risk:
+        confidence = f"{risk['confidence'] * 100:.0f}%"
+        print(f"\nRISK ({risk['observations']} days to {risk['as_of']}):")
+        print(f"   Volatility:     {risk['volatility_annual_pct']:.1f}% annualized ({risk['volatility_daily_pct']:.2f}% daily)")
+        print(f"   1-day VaR {confidence}:  {risk['var_historical_pct']:.2f}% (${total_value * risk['var_historical_pct'] / 100:,.0f}) historical, "
+              f"{risk['var_parametric_pct']:.2f}% parametric")
+        print(f"   1-day CVaR {confidence}: {risk['cvar_historical_pct']:.2f}% historical, {risk['cvar_parametric_pct']:.2f}% parametric")
+        print(f"   Max Drawdown:   {risk['max_drawdown_pct']:.1f}% (trough {risk['max_drawdown_date']})")
+        if risk.get("beta_spy") is not None:
+            print(f"   Beta (SPY):     {risk['beta_spy']:.2f}")
+        top = list(risk["risk_contributions"].items())[:5]
+        if top:
+            print("   Top risk contributors: " + ", ".join(f"{t} {pct:.0f}%" for t, pct in top))
+        if risk.get("excluded"):
+            print(f"   Not enough history: {', '.join(risk['excluded'])}")
+
     # Concentration warnings
     if summary.get("concentration_warnings"):
         print("\n⚠️ CONCENTRATION WARNINGS:")
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#     "yfinance>=0.2.40",
+#     "pandas>=2.0.0",
+#     "fear-and-greed>=0.4",
+#     "edgartools>=2.0.0",
+#     "feedparser>=6.0.0",
+# ]
+# ///
+"""
+Offline benchmark suite for stock-analysis.
+
+Runs each scenario against recorded fixtures (see replay.py), reports wall
+time and memory, and compares against stored baselines.
+
+Scenarios:
+    single_ticker   analyze_stock.py AAPL --output json
+    portfolio_20    analyze_stock.py --portfolio (20 assets) --period monthly
+    hot_scan        HotScanner(include_social=True).scan_all()
+    rumor_scan      rumor_scanner.main()
+    startup_help    analyze_stock.py --help in a fresh interpreter (import cost)
+
+Usage:
+    uv run bench.py                          # All scenarios, compare to baselines
+    uv run bench.py single_ticker hot_scan   # Selected scenarios
+    uv run bench.py --record                 # Re-record fixtures (needs network)
+    uv run bench.py --update-baseline        # Store current numbers as baseline
+    uv run bench.py --repeat 10 --json
+
+Exit codes: 0 ok, 1 regression, 2 missing/incomplete fixtures or scenario error.
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+
+from replay import use_cassette
+
+SCRIPTS_DIR = Path(__file__).parent
+BENCH_DIR = SCRIPTS_DIR.parent / "benchmarks"
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+BASELINE_FILE = BENCH_DIR / "baselines.json"
+
+DEFAULT_TIME_TOLERANCE = 0.25   # Fail if median wall time is >25% over baseline
+DEFAULT_MEMORY_TOLERANCE = 0.15  # Fail if peak traced memory is >15% over baseline
+
+PORTFOLIO_TICKERS = [
+    "AAPL", "MSFT", "NVDA", "GOOGL", "AMZN", "META", "TSLA", "JPM", "V", "JNJ",
+    "PG", "KO", "XOM", "UNH", "HD", "COST", "AVGO", "LLY", "BTC-USD", "ETH-USD",
+]
+
+
+@dataclass
+class BenchResult:
+    scenario: str
+    runs: int
+    median_ms: float
+    min_ms: float
+    max_ms: float
+    peak_kib: float      # tracemalloc peak during one run
+    net_blocks: int      # memory blocks still allocated after the run
+    replay_hits: int
+    replay_misses: int
+
+
+# ============================================================================
+# Scenarios
+# ============================================================================
+
+def _run_cli(main, argv: list[str]) -> None:
+    """Run a script's main() with argv, treating non-zero sys.exit as failure."""
+    old_argv = sys.argv
+    sys.argv = argv
+    try:
+        main()
+    except SystemExit as e:
+        if e.code not in (0, None):
+            raise RuntimeError(f"{argv[0]} exited with {e.code}") from None
+    finally:
+        sys.argv = old_argv
+
+
+# On-disk caches that would turn later runs into cache hits: (module, path attribute)
+DISK_CACHES = [("quotes", "QUOTE_CACHE_FILE"), ("risk", "RISK_CACHE_FILE")]
+_isolated_cache_dir: Path | None = None
+
+
+@contextlib.contextmanager
+def isolated_caches():
+    """Point the on-disk caches at a temp dir (emptied by reset_state) for a benchmark."""
+    global _isolated_cache_dir
+    modules = [(importlib.import_module(module), attr) for module, attr in DISK_CACHES]
+    saved = [getattr(module, attr) for module, attr in modules]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _isolated_cache_dir = Path(cache_dir)
+        for module, attr in modules:
+            setattr(module, attr, _isolated_cache_dir / getattr(module, attr).name)
+        try:
+            yield
+        finally:
+            _isolated_cache_dir = None
+            for (module, attr), path in zip(modules, saved):
+                setattr(module, attr, path)
+
+
+def reset_state() -> None:
+    """Clear in-process and on-disk caches so every run starts cold (like a fresh CLI call)."""
+    import analyze_stock
+    import quotes
+    analyze_stock._SENTIMENT_CACHE.clear()
+    quotes._MEMORY.clear()
+    if _isolated_cache_dir is not None:
+        for path in _isolated_cache_dir.iterdir():
+            path.unlink()
+
+
+def scenario_single_ticker() -> None:
+    import analyze_stock
+    _run_cli(analyze_stock.main, ["analyze_stock.py", "AAPL", "--output", "json"])
+
+
+@contextlib.contextmanager
+def _bench_portfolio():
+    """Point PortfolioStore at a temp state dir holding a 20-asset portfolio."""
+    from portfolio import PortfolioStore, detect_asset_type
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        old_state = os.environ.get("CLAWDBOT_STATE_DIR")
+        os.environ["CLAWDBOT_STATE_DIR"] = state_dir
+        try:
+            store = PortfolioStore()
+            store.create_portfolio("Bench")
+            # Write rows directly: add_asset would validate each ticker online
+            with store.backend.transaction():
+                for ticker in PORTFOLIO_TICKERS:
+                    store.backend.upsert_asset("bench", {
+                        "ticker": ticker,
+                        "type": detect_asset_type(ticker),
+                        "quantity": 10.0,
+                        "cost_basis": 100.0,
+                        "added_at": "2024-01-02T00:00:00",
+                    })
+            yield
+        finally:
+            if old_state is None:
+                os.environ.pop("CLAWDBOT_STATE_DIR", None)
+            else:
+                os.environ["CLAWDBOT_STATE_DIR"] = old_state
+
+
+def scenario_portfolio_20() -> None:
+    import analyze_stock
+    with _bench_portfolio():
+        _run_cli(analyze_stock.main, [
+            "analyze_stock.py", "--portfolio", "Bench", "--output", "json", "--period", "monthly",
+        ])
+
+
+def scenario_hot_scan() -> None:
+    from hot_scanner import HotScanner
+    scanner = HotScanner(include_social=True)
+    scanner.scan_all()
+    scanner.get_hot_summary()
+
+
+def scenario_rumor_scan() -> None:
+    import rumor_scanner
+    rumor_scanner.main()
+
+
+SCENARIOS = {
+    "single_ticker": scenario_single_ticker,
+    "portfolio_20": scenario_portfolio_20,
+    "hot_scan": scenario_hot_scan,
+    "rumor_scan": scenario_rumor_scan,
+}
+
+# Run in a fresh interpreter because import cost is what they measure; no fixtures
+STARTUP_SCENARIOS = {
+    "startup_help": ["analyze_stock.py", "--help"],
+}
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+
+def fixture_path(name: str) -> Path:
+    return FIXTURES_DIR / f"{name}.json"
+
+
+def _quiet_call(func) -> None:
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        func()
+
+
+def record_scenario(name: str) -> Path:
+    """Run a scenario against the live network and save its cassette."""
+    with isolated_caches(), use_cassette(fixture_path(name), mode="record") as cassette:
+        reset_state()
+        _quiet_call(SCENARIOS[name])
+    return cassette.path
+
+
+def run_scenario(name: str, repeat: int = 5, warmup: int = 1) -> BenchResult:
+    """
+    Time a scenario against its fixture. Timing runs and the memory run are
+    separate because tracemalloc slows allocation-heavy code considerably.
+    """
+    func = SCENARIOS[name]
+    with isolated_caches(), use_cassette(fixture_path(name)) as cassette:
+        for _ in range(warmup):
+            reset_state()
+            _quiet_call(func)
+
+        timings = []
+        for _ in range(repeat):
+            reset_state()
+            start = time.perf_counter()
+            _quiet_call(func)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        reset_state()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            _quiet_call(func)
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        net_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    return BenchResult(
+        scenario=name,
+        runs=repeat,
+        median_ms=round(statistics.median(timings), 2),
+        min_ms=round(min(timings), 2),
+        max_ms=round(max(timings), 2),
+        peak_kib=round(peak / 1024, 1),
+        net_blocks=net_blocks,
+        replay_hits=cassette.hits,
+        replay_misses=len(set(cassette.misses)),
+    )
+
+
+def run_startup_scenario(name: str, repeat: int = 5) -> BenchResult:
+    """Time a fresh `python <script> ...` process (interpreter + imports + argparse)."""
+    argv = STARTUP_SCENARIOS[name]
+    timings = []
+    for _ in range(repeat + 1):  # First run warms the OS file cache and .pyc files
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *argv], cwd=SCRIPTS_DIR, capture_output=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings = timings[1:]
+
+    return BenchResult(
+        scenario=name,
+        runs=repeat,
+        median_ms=round(statistics.median(timings), 2),
+        min_ms=round(min(timings), 2),
+        max_ms=round(max(timings), 2),
+        peak_kib=0.0,
+        net_blocks=0,
+        replay_hits=0,
+        replay_misses=0,
+    )
+
+
+# ============================================================================
+# Baselines
+# ============================================================================
+
+def load_baselines(path: Path = BASELINE_FILE) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def save_baselines(results: list[BenchResult], path: Path = BASELINE_FILE) -> None:
+    baselines = load_baselines(path)
+    for r in results:
+        baselines[r.scenario] = {
+            "median_ms": r.median_ms,
+            "peak_kib": r.peak_kib,
+            "python": platform.python_version(),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+
+
+def compare_to_baseline(
+    result: BenchResult,
+    baseline: dict | None,
+    time_tolerance: float = DEFAULT_TIME_TOLERANCE,
+    memory_tolerance: float = DEFAULT_MEMORY_TOLERANCE,
+) -> list[str]:
+    """Return regression messages (empty if within tolerance or no baseline)."""
+    if not baseline:
+        return []
+    regressions = []
+    base_ms = baseline.get("median_ms")
+    if base_ms and result.median_ms > base_ms * (1 + time_tolerance):
+        regressions.append(
+            f"{result.scenario}: median {result.median_ms:.0f}ms vs baseline {base_ms:.0f}ms "
+            f"(+{(result.median_ms / base_ms - 1) * 100:.0f}%, limit +{time_tolerance * 100:.0f}%)"
+        )
+    base_kib = baseline.get("peak_kib")
+    if base_kib and result.peak_kib > base_kib * (1 + memory_tolerance):
+        regressions.append(
+            f"{result.scenario}: peak memory {result.peak_kib:.0f}KiB vs baseline {base_kib:.0f}KiB "
+            f"(+{(result.peak_kib / base_kib - 1) * 100:.0f}%, limit +{memory_tolerance * 100:.0f}%)"
+        )
+    return regressions
+
+
+def format_results(results: list[BenchResult], baselines: dict) -> str:
+    lines = [
+        f"{'Scenario':<16} {'Median':>10} {'Min':>10} {'Max':>10} {'Peak':>10} {'Blocks':>8} {'vs base':>9}",
+        "-" * 78,
+    ]
+    for r in results:
+        base_ms = baselines.get(r.scenario, {}).get("median_ms")
+        delta = f"{(r.median_ms / base_ms - 1) * 100:+.0f}%" if base_ms else "n/a"
+        peak = f"{r.peak_kib / 1024:.1f}MiB" if r.peak_kib else "-"
+        blocks = str(r.net_blocks) if r.peak_kib else "-"
+        lines.append(
+            f"{r.scenario:<16} {r.median_ms:>8.0f}ms {r.min_ms:>8.0f}ms {r.max_ms:>8.0f}ms "
+            f"{peak:>10} {blocks:>8} {delta:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks against recorded fixtures")
+    parser.add_argument("scenarios", nargs="*",
+                        help=f"Scenarios to run (default: all of {', '.join([*SCENARIOS, *STARTUP_SCENARIOS])})")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per scenario (default: 5)")
+    parser.add_argument("--record", action="store_true", help="Re-record fixtures from the live network")
+    parser.add_argument("--update-baseline", action="store_true", help="Save results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TIME_TOLERANCE,
+                        help=f"Allowed wall-time regression (default: {DEFAULT_TIME_TOLERANCE})")
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE,
+                        help=f"Allowed peak-memory regression (default: {DEFAULT_MEMORY_TOLERANCE})")
+    parser.add_argument("--json", action="store_true", help="Output results as JSON")
+    args = parser.parse_args()
+
+    names = args.scenarios or list(SCENARIOS) + list(STARTUP_SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS and n not in STARTUP_SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    if args.record:
+        for name in (n for n in names if n in SCENARIOS):
+            print(f"Recording {name}...", file=sys.stderr)
+            path = record_scenario(name)
+            print(f"  saved {path}", file=sys.stderr)
+        return
+
+    missing = [n for n in names if n in SCENARIOS and not fixture_path(n).exists()]
+    if missing:
+        print(f"Error: no fixtures for {', '.join(missing)}. Run: uv run bench.py --record {' '.join(missing)}",
+              file=sys.stderr)
+        sys.exit(2)
+
+    results = []
+    for name in names:
+        try:
+            if name in STARTUP_SCENARIOS:
+                results.append(run_startup_scenario(name, repeat=args.repeat))
+            else:
+                results.append(run_scenario(name, repeat=args.repeat))
+        except Exception as e:
+            print(f"Error: scenario {name} failed: {e}", file=sys.stderr)
+            sys.exit(2)
+
+    baselines = load_baselines()
+    regressions = []
+    for r in results:
+        regressions += compare_to_baseline(r, baselines.get(r.scenario), args.tolerance, args.memory_tolerance)
+
+    if args.json:
+        print(json.dumps({"results": [asdict(r) for r in results], "regressions": regressions}, indent=2))
+    else:
+        print(format_results(results, baselines))
+
+    incomplete = [r.scenario for r in results if r.replay_misses]
+    if incomplete:
+        print(f"\nError: fixtures incomplete for {', '.join(incomplete)} (requests not in cassette); "
+              f"re-record with --record", file=sys.stderr)
+        sys.exit(2)
+
+    if args.update_baseline:
+        save_baselines(results)
+        print(f"\nBaseline updated: {BASELINE_FILE}", file=sys.stderr)
+        return
+
+    if regressions:
+        print("\nREGRESSIONS:", file=sys.stderr)
+        for msg in regressions:
+            print(f"  ❌ {msg}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,20 +16,49 @@ Analyzes dividend metrics for income investors:
 - Dividend Safety Score
 - Ex-Dividend Date
 
+Portfolio income (`income` mode):
+- Projected dividend cash flow for the next 12 months, by month
+- Yield on cost and trailing income growth per holding and in total
+
+Screener (`screen` mode):
+- Precomputed metrics for a whole universe in cache/dividends.db
+- Filter/sort queries answered from the local index; only stale rows refetched
+
 Usage:
     uv run dividends.py AAPL
     uv run dividends.py JNJ PG KO --output json
+    uv run dividends.py $(cat universe.txt) --workers 16
+    uv run dividends.py income --portfolio "Retirement"
+    uv run dividends.py income --all --output json
+    uv run dividends.py screen --universe universe.txt --min-yield 3 --max-payout 70
+    uv run dividends.py screen --min-streak 10 --min-rating good --sort safety
+
+Tickers are fetched concurrently. Dividend histories are cached in
+cache/dividends.db and only the days since the last check are refetched;
+`income` reads holdings from portfolio.py's store and needs no quote lookups.
 """
 
 import argparse
 import json
+import sqlite3
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 
+from profiling import CACHE_DIR
+
+DIVIDEND_CACHE_FILE = CACHE_DIR / "dividends.db"
+HISTORY_TTL = 12 * 3600  # Seconds before a ticker's history is checked for new payments
+MAX_WORKERS = 8
+
 
 @dataclass
 class DividendAnalysis:
@@ -63,222 +92,814 @@ class DividendAnalysis:
     summary: str
 
 
+# ============================================================================
+# Dividend history cache
+# ============================================================================
+
+class DividendHistoryCache:
+    """
+    Per-ticker dividend histories in SQLite. Paid dividends don't change, so a
+    refresh only fetches the days since the last check; a stock split (which
+    re-adjusts past amounts) triggers a full refetch for that ticker.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or DIVIDEND_CACHE_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS dividends (
+                ticker TEXT NOT NULL,
+                date TEXT NOT NULL,
+                amount REAL NOT NULL,
+                PRIMARY KEY (ticker, date)
+            );
+            CREATE TABLE IF NOT EXISTS checked (
+                ticker TEXT PRIMARY KEY,
+                checked_at REAL NOT NULL,  -- time.time() of the last fetch
+                through TEXT NOT NULL      -- Date the history is complete up to
+            );
+        """)
+
+    def checked(self, tickers: list[str]) -> dict[str, tuple[float, str]]:
+        """ticker -> (checked_at, through) for tickers fetched before."""
+        if not tickers:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT ticker, checked_at, through FROM checked WHERE ticker IN ({','.join('?' * len(tickers))})",
+                tickers,
+            ).fetchall()
+        return {ticker: (checked_at, through) for ticker, checked_at, through in rows}
+
+    def stale(self, tickers: list[str], max_age: float = HISTORY_TTL) -> list[str]:
+        checked = self.checked(tickers)
+        now = time.time()
+        return [t for t in tickers if t not in checked or now - checked[t][0] >= max_age]
+
+    def store(self, ticker: str, dividends: pd.Series, through: str, full: bool) -> None:
+        """Save fetched dividends; `full` replaces the ticker's history."""
+        rows = [(ticker, ts.strftime("%Y-%m-%d"), float(amount)) for ts, amount in dividends.items() if amount]
+        with self._lock, self._conn:
+            if full:
+                self._conn.execute("DELETE FROM dividends WHERE ticker = ?", (ticker,))
+            self._conn.executemany(
+                "INSERT INTO dividends (ticker, date, amount) VALUES (?, ?, ?) "
+                "ON CONFLICT (ticker, date) DO UPDATE SET amount = excluded.amount",
+                rows,
+            )
+            self._conn.execute(
+                "INSERT INTO checked (ticker, checked_at, through) VALUES (?, ?, ?) "
+                "ON CONFLICT (ticker) DO UPDATE SET checked_at = excluded.checked_at, through = excluded.through",
+                (ticker, time.time(), through),
+            )
+
+    def frame(self, tickers: list[str]) -> pd.DataFrame:
+        """All cached payments for `tickers` as one (ticker, date, amount) frame."""
+        rows = []
+        with self._lock:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(tickers), 500):
+                chunk = tickers[start:start + 500]
+                rows += self._conn.execute(
+                    f"SELECT ticker, date, amount FROM dividends WHERE ticker IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+        frame = pd.DataFrame(rows, columns=["ticker", "date", "amount"])
+        frame["date"] = pd.to_datetime(frame["date"])
+        return frame
+
+
+def _naive_dates(series: pd.Series) -> pd.Series:
+    index = pd.DatetimeIndex(series.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return pd.Series(series.to_numpy(), index=index.normalize())
+
+
+def fetch_dividend_history(stock, through: str | None) -> tuple[pd.Series, bool]:
+    """
+    Dividends since `through` (with a week of overlap for late postings), or
+    the full history if there is no cached copy or a split happened since.
+    Returns (dividends, full).
+    """
+    if through:
+        start = (pd.Timestamp(through) - pd.Timedelta(days=7)).strftime("%Y-%m-%d")
+        delta = stock.history(start=start, actions=True, auto_adjust=False)
+        splits = delta.get("Stock Splits") if delta is not None and not delta.empty else None
+        if splits is None or not (splits.fillna(0) != 0).any():
+            if delta is None or delta.empty or "Dividends" not in delta:
+                return pd.Series(dtype=float), False
+            return _naive_dates(delta["Dividends"]), False
+
+    dividends = stock.dividends
+    if dividends is None or len(dividends) == 0:
+        return pd.Series(dtype=float), True
+    return _naive_dates(dividends), True
+
+
+# ============================================================================
+# Vectorized history stats
+# ============================================================================
+
+def compute_dividend_stats(frame: pd.DataFrame, today: pd.Timestamp | None = None) -> pd.DataFrame:
+    """
+    Growth, streak, frequency and yearly history for every ticker in a
+    (ticker, date, amount) frame, via one groupby/pivot.
+
+    - dividend_growth_5y: CAGR of the last complete year vs five years earlier
+    - consecutive_years: complete years in a row with payouts >= the prior year
+    - payment_frequency: from the number of payments in the last 12 months
+    - history: up to 5 most recent calendar years (current year may be partial)
+    """
+    today = today or pd.Timestamp.now().normalize()
+    columns = ["dividend_growth_5y", "consecutive_years", "payment_frequency", "history"]
+    if frame.empty:
+        return pd.DataFrame(columns=columns)
+
+    yearly = frame.groupby(["ticker", frame["date"].dt.year])["amount"].sum().unstack(fill_value=0.0)
+    years = range(int(yearly.columns.min()), today.year + 1)
+    yearly = yearly.reindex(columns=years, fill_value=0.0)
+
+    complete = yearly.loc[:, yearly.columns < today.year]
+    growth = pd.Series(float("nan"), index=yearly.index)
+    streak = pd.Series(0, index=yearly.index)
+    if complete.shape[1] >= 2:
+        values = complete.to_numpy()
+        if complete.shape[1] >= 6:
+            last, base = values[:, -1], values[:, -6]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cagr = ((last / base) ** (1 / 5) - 1) * 100
+            growth[:] = np.where((base > 0) & (last > 0), cagr, np.nan)
+        # Trailing run of years that paid and didn't cut vs the year before
+        held = (values[:, 1:] >= values[:, :-1]) & (values[:, 1:] > 0) & (values[:, :-1] > 0)
+        streak[:] = np.cumprod(held[:, ::-1], axis=1).sum(axis=1)
+
+    recent = frame[frame["date"] > today - pd.DateOffset(years=1)].groupby("ticker").size()
+    recent = recent.reindex(yearly.index, fill_value=0)
+    total = frame.groupby("ticker").size().reindex(yearly.index, fill_value=0)
+    frequency = pd.Series(None, index=yearly.index, dtype=object)
+    frequency[(total >= 4) & (recent >= 1)] = "annual"
+    frequency[(total >= 4) & (recent >= 3)] = "quarterly"
+    frequency[(total >= 4) & (recent >= 10)] = "monthly"
+
+    paid = yearly.iloc[:, ::-1]
+    history = {
+        ticker: [{"year": int(year), "total": round(float(total_), 4)} for year, total_ in row[row > 0].head(5).items()]
+        for ticker, row in paid.iterrows()
+    }
+
+    return pd.DataFrame({
+        "dividend_growth_5y": growth,
+        "consecutive_years": streak.astype(int),
+        "payment_frequency": frequency,
+        "history": pd.Series(history),
+    })
+
+
+# ============================================================================
+# Analysis
+# ============================================================================
+
+def _fetch_ticker(ticker: str, through: str | None, refresh_history: bool) -> tuple[dict, pd.Series | None, bool]:
+    """Network part for one ticker (runs in a worker thread)."""
+    stock = yf.Ticker(ticker)
+    info = stock.info
+    if not refresh_history or not info.get("dividendRate"):
+        return info, None, False
+    dividends, full = fetch_dividend_history(stock, through)
+    return info, dividends, full
+
+
+def analyze_dividends_batch(
+    tickers: list[str],
+    verbose: bool = False,
+    max_workers: int = MAX_WORKERS,
+    cache: DividendHistoryCache | None = None,
+    max_age: float = HISTORY_TTL,
+) -> dict[str, DividendAnalysis]:
+    """
+    Analyze many tickers: quotes and history deltas are fetched concurrently,
+    histories come from the local cache, and the stats are computed once for
+    all tickers. Tickers that fail are left out (reported with --verbose).
+    """
+    cache = cache or DividendHistoryCache()
+    tickers = list(dict.fromkeys(tickers))
+    stale = set(cache.stale(tickers, max_age))
+    checked = cache.checked(tickers)
+
+    infos = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+        futures = {
+            pool.submit(_fetch_ticker, t, checked.get(t, (0, None))[1], t in stale): t
+            for t in tickers
+        }
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                info, dividends, full = future.result()
+            except Exception as e:
+                if verbose:
+                    print(f"Error analyzing {ticker}: {e}", file=sys.stderr)
+                continue
+            infos[ticker] = info
+            if dividends is not None:
+                cache.store(ticker, dividends, datetime.now().strftime("%Y-%m-%d"), full)
+
+    stats = compute_dividend_stats(cache.frame([t for t in tickers if t in infos]))
+
+    results = {}
+    for ticker in tickers:
+        if ticker not in infos:
+            continue
+        try:
+            row = stats.loc[ticker] if ticker in stats.index else None
+            results[ticker] = build_dividend_analysis(ticker, infos[ticker], row)
+        except Exception as e:
+            if verbose:
+                print(f"Error analyzing {ticker}: {e}", file=sys.stderr)
+    return results
+
+
 def analyze_dividends(ticker: str, verbose: bool = False) -> DividendAnalysis | None:
     """Analyze dividend metrics for a stock."""
-    try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        company_name = info.get("longName") or info.get("shortName") or ticker
-        current_price = info.get("regularMarketPrice") or info.get("currentPrice")
-        
-        # Basic dividend info
-        dividend_yield = info.get("dividendYield")
-        if dividend_yield:
-            dividend_yield = dividend_yield * 100  # Convert to percentage
-        
-        annual_dividend = info.get("dividendRate")
-        
-        # No dividend
-        if not annual_dividend or annual_dividend == 0:
-            return DividendAnalysis(
-                ticker=ticker,
-                company_name=company_name,
-                dividend_yield=None,
-                annual_dividend=None,
-                current_price=current_price,
-                payout_ratio=None,
-                payout_status="no_dividend",
-                dividend_growth_5y=None,
-                consecutive_years=None,
-                dividend_history=None,
-                ex_dividend_date=None,
-                payment_frequency=None,
-                safety_score=0,
-                safety_factors=["No dividend paid"],
-                income_rating="no_dividend",
-                summary=f"{ticker} does not pay a dividend.",
-            )
-        
-        # Payout ratio
-        trailing_eps = info.get("trailingEps")
-        payout_ratio = None
-        payout_status = "unknown"
-        
-        if trailing_eps and trailing_eps > 0 and annual_dividend:
-            payout_ratio = (annual_dividend / trailing_eps) * 100
-            
-            if payout_ratio < 40:
-                payout_status = "safe"
-            elif payout_ratio < 60:
-                payout_status = "moderate"
-            elif payout_ratio < 80:
-                payout_status = "high"
-            else:
-                payout_status = "unsustainable"
-        
-        # Dividend history (for growth calculation)
-        dividends = stock.dividends
-        dividend_history = None
-        dividend_growth_5y = None
-        consecutive_years = None
-        
-        if dividends is not None and len(dividends) > 0:
-            # Group by year
-            dividends_df = dividends.reset_index()
-            dividends_df["Year"] = pd.to_datetime(dividends_df["Date"]).dt.year
-            yearly = dividends_df.groupby("Year")["Dividends"].sum().sort_index(ascending=False)
-            
-            # Last 5 years history
-            dividend_history = []
-            for year in yearly.head(5).index:
-                dividend_history.append({
-                    "year": int(year),
-                    "total": round(float(yearly[year]), 4),
-                })
-            
-            # Calculate 5-year CAGR
-            if len(yearly) >= 5:
-                current_div = yearly.iloc[0]
-                div_5y_ago = yearly.iloc[4]
-                
-                if div_5y_ago > 0 and current_div > 0:
-                    dividend_growth_5y = ((current_div / div_5y_ago) ** (1/5) - 1) * 100
-            
-            # Count consecutive years of increases
-            consecutive_years = 0
-            prev_div = None
-            for div in yearly.values:
-                if prev_div is not None:
-                    if div >= prev_div:
-                        consecutive_years += 1
-                    else:
-                        break
-                prev_div = div
-        
-        # Ex-dividend date
-        ex_dividend_date = info.get("exDividendDate")
-        if ex_dividend_date:
-            ex_dividend_date = datetime.fromtimestamp(ex_dividend_date).strftime("%Y-%m-%d")
-        
-        # Payment frequency
-        payment_frequency = None
-        if dividends is not None and len(dividends) >= 4:
-            # Count dividends in last year
-            one_year_ago = pd.Timestamp.now() - pd.DateOffset(years=1)
-            recent_divs = dividends[dividends.index > one_year_ago]
-            count = len(recent_divs)
-            
-            if count >= 10:
-                payment_frequency = "monthly"
-            elif count >= 3:
-                payment_frequency = "quarterly"
-            elif count >= 1:
-                payment_frequency = "annual"
-        
-        # Safety score calculation (0-100)
-        safety_score = 50  # Base score
-        safety_factors = []
-        
-        # Payout ratio factor (+/- 20)
-        if payout_ratio:
-            if payout_ratio < 40:
-                safety_score += 20
-                safety_factors.append(f"Low payout ratio ({payout_ratio:.0f}%)")
-            elif payout_ratio < 60:
-                safety_score += 10
-                safety_factors.append(f"Moderate payout ratio ({payout_ratio:.0f}%)")
-            elif payout_ratio < 80:
-                safety_score -= 10
-                safety_factors.append(f"High payout ratio ({payout_ratio:.0f}%)")
-            else:
-                safety_score -= 20
-                safety_factors.append(f"Unsustainable payout ratio ({payout_ratio:.0f}%)")
-        
-        # Growth factor (+/- 15)
-        if dividend_growth_5y:
-            if dividend_growth_5y > 10:
-                safety_score += 15
-                safety_factors.append(f"Strong dividend growth ({dividend_growth_5y:.1f}% CAGR)")
-            elif dividend_growth_5y > 5:
-                safety_score += 10
-                safety_factors.append(f"Good dividend growth ({dividend_growth_5y:.1f}% CAGR)")
-            elif dividend_growth_5y > 0:
-                safety_score += 5
-                safety_factors.append(f"Positive dividend growth ({dividend_growth_5y:.1f}% CAGR)")
-            else:
-                safety_score -= 15
-                safety_factors.append(f"Dividend declining ({dividend_growth_5y:.1f}% CAGR)")
-        
-        # Consecutive years factor (+/- 15)
-        if consecutive_years:
-            if consecutive_years >= 25:
-                safety_score += 15
-                safety_factors.append(f"Dividend Aristocrat ({consecutive_years}+ years)")
-            elif consecutive_years >= 10:
-                safety_score += 10
-                safety_factors.append(f"Long dividend history ({consecutive_years} years)")
-            elif consecutive_years >= 5:
-                safety_score += 5
-                safety_factors.append(f"Consistent dividend ({consecutive_years} years)")
-        
-        # Yield factor (high yield can be risky)
-        if dividend_yield:
-            if dividend_yield > 8:
-                safety_score -= 10
-                safety_factors.append(f"Very high yield ({dividend_yield:.1f}%) - verify sustainability")
-            elif dividend_yield < 1:
-                safety_factors.append(f"Low yield ({dividend_yield:.2f}%)")
-        
-        # Clamp score
-        safety_score = max(0, min(100, safety_score))
-        
-        # Income rating
-        if safety_score >= 80:
-            income_rating = "excellent"
-        elif safety_score >= 60:
-            income_rating = "good"
-        elif safety_score >= 40:
-            income_rating = "moderate"
-        else:
-            income_rating = "poor"
-        
-        # Summary
-        summary_parts = []
-        if dividend_yield:
-            summary_parts.append(f"{dividend_yield:.2f}% yield")
-        if payout_ratio:
-            summary_parts.append(f"{payout_ratio:.0f}% payout")
-        if dividend_growth_5y:
-            summary_parts.append(f"{dividend_growth_5y:+.1f}% 5Y growth")
-        if consecutive_years and consecutive_years >= 5:
-            summary_parts.append(f"{consecutive_years}Y streak")
-        
-        summary = f"{ticker}: {', '.join(summary_parts)}. Rating: {income_rating.upper()}"
-        
+    return analyze_dividends_batch([ticker], verbose=verbose, max_workers=1).get(ticker)
+
+
+def build_dividend_analysis(ticker: str, info: dict, stats: pd.Series | None) -> DividendAnalysis:
+    """Score a ticker from its quote info and its row of compute_dividend_stats."""
+    company_name = info.get("longName") or info.get("shortName") or ticker
+    current_price = info.get("regularMarketPrice") or info.get("currentPrice")
+
+    # Basic dividend info
+    dividend_yield = info.get("dividendYield")
+    if dividend_yield:
+        dividend_yield = dividend_yield * 100  # Convert to percentage
+
+    annual_dividend = info.get("dividendRate")
+
+    # No dividend
+    if not annual_dividend or annual_dividend == 0:
         return DividendAnalysis(
             ticker=ticker,
             company_name=company_name,
-            dividend_yield=round(dividend_yield, 2) if dividend_yield else None,
-            annual_dividend=round(annual_dividend, 4) if annual_dividend else None,
+            dividend_yield=None,
+            annual_dividend=None,
             current_price=current_price,
-            payout_ratio=round(payout_ratio, 1) if payout_ratio else None,
-            payout_status=payout_status,
-            dividend_growth_5y=round(dividend_growth_5y, 2) if dividend_growth_5y else None,
-            consecutive_years=consecutive_years,
-            dividend_history=dividend_history,
-            ex_dividend_date=ex_dividend_date,
-            payment_frequency=payment_frequency,
-            safety_score=safety_score,
-            safety_factors=safety_factors,
-            income_rating=income_rating,
-            summary=summary,
+            payout_ratio=None,
+            payout_status="no_dividend",
+            dividend_growth_5y=None,
+            consecutive_years=None,
+            dividend_history=None,
+            ex_dividend_date=None,
+            payment_frequency=None,
+            safety_score=0,
+            safety_factors=["No dividend paid"],
+            income_rating="no_dividend",
+            summary=f"{ticker} does not pay a dividend.",
+        )
+
+    # Payout ratio
+    trailing_eps = info.get("trailingEps")
+    payout_ratio = None
+    payout_status = "unknown"
+
+    if trailing_eps and trailing_eps > 0 and annual_dividend:
+        payout_ratio = (annual_dividend / trailing_eps) * 100
+
+        if payout_ratio < 40:
+            payout_status = "safe"
+        elif payout_ratio < 60:
+            payout_status = "moderate"
+        elif payout_ratio < 80:
+            payout_status = "high"
+        else:
+            payout_status = "unsustainable"
+
+    # History stats (precomputed for all tickers at once)
+    dividend_history = None
+    dividend_growth_5y = None
+    consecutive_years = None
+    payment_frequency = None
+    if stats is not None:
+        dividend_history = stats["history"] or None
+        if pd.notna(stats["dividend_growth_5y"]):
+            dividend_growth_5y = float(stats["dividend_growth_5y"])
+        consecutive_years = int(stats["consecutive_years"])
+        if pd.notna(stats["payment_frequency"]):
+            payment_frequency = stats["payment_frequency"]
+
+    # Ex-dividend date
+    ex_dividend_date = info.get("exDividendDate")
+    if ex_dividend_date:
+        ex_dividend_date = datetime.fromtimestamp(ex_dividend_date).strftime("%Y-%m-%d")
+
+    # Safety score calculation (0-100)
+    safety_score = 50  # Base score
+    safety_factors = []
+
+    # Payout ratio factor (+/- 20)
+    if payout_ratio:
+        if payout_ratio < 40:
+            safety_score += 20
+            safety_factors.append(f"Low payout ratio ({payout_ratio:.0f}%)")
+        elif payout_ratio < 60:
+            safety_score += 10
+            safety_factors.append(f"Moderate payout ratio ({payout_ratio:.0f}%)")
+        elif payout_ratio < 80:
+            safety_score -= 10
+            safety_factors.append(f"High payout ratio ({payout_ratio:.0f}%)")
+        else:
+            safety_score -= 20
+            safety_factors.append(f"Unsustainable payout ratio ({payout_ratio:.0f}%)")
+
+    # Growth factor (+/- 15)
+    if dividend_growth_5y:
+        if dividend_growth_5y > 10:
+            safety_score += 15
+            safety_factors.append(f"Strong dividend growth ({dividend_growth_5y:.1f}% CAGR)")
+        elif dividend_growth_5y > 5:
+            safety_score += 10
+            safety_factors.append(f"Good dividend growth ({dividend_growth_5y:.1f}% CAGR)")
+        elif dividend_growth_5y > 0:
+            safety_score += 5
+            safety_factors.append(f"Positive dividend growth ({dividend_growth_5y:.1f}% CAGR)")
+        else:
+            safety_score -= 15
+            safety_factors.append(f"Dividend declining ({dividend_growth_5y:.1f}% CAGR)")
+
+    # Consecutive years factor (+/- 15)
+    if consecutive_years:
+        if consecutive_years >= 25:
+            safety_score += 15
+            safety_factors.append(f"Dividend Aristocrat ({consecutive_years}+ years)")
+        elif consecutive_years >= 10:
+            safety_score += 10
+            safety_factors.append(f"Long dividend history ({consecutive_years} years)")
+        elif consecutive_years >= 5:
+            safety_score += 5
+            safety_factors.append(f"Consistent dividend ({consecutive_years} years)")
+
+    # Yield factor (high yield can be risky)
+    if dividend_yield:
+        if dividend_yield > 8:
+            safety_score -= 10
+            safety_factors.append(f"Very high yield ({dividend_yield:.1f}%) - verify sustainability")
+        elif dividend_yield < 1:
+            safety_factors.append(f"Low yield ({dividend_yield:.2f}%)")
+
+    # Clamp score
+    safety_score = max(0, min(100, safety_score))
+
+    # Income rating
+    if safety_score >= 80:
+        income_rating = "excellent"
+    elif safety_score >= 60:
+        income_rating = "good"
+    elif safety_score >= 40:
+        income_rating = "moderate"
+    else:
+        income_rating = "poor"
+
+    # Summary
+    summary_parts = []
+    if dividend_yield:
+        summary_parts.append(f"{dividend_yield:.2f}% yield")
+    if payout_ratio:
+        summary_parts.append(f"{payout_ratio:.0f}% payout")
+    if dividend_growth_5y:
+        summary_parts.append(f"{dividend_growth_5y:+.1f}% 5Y growth")
+    if consecutive_years and consecutive_years >= 5:
+        summary_parts.append(f"{consecutive_years}Y streak")
+
+    summary = f"{ticker}: {', '.join(summary_parts)}. Rating: {income_rating.upper()}"
+
+    return DividendAnalysis(
+        ticker=ticker,
+        company_name=company_name,
+        dividend_yield=round(dividend_yield, 2) if dividend_yield else None,
+        annual_dividend=round(annual_dividend, 4) if annual_dividend else None,
+        current_price=current_price,
+        payout_ratio=round(payout_ratio, 1) if payout_ratio else None,
+        payout_status=payout_status,
+        dividend_growth_5y=round(dividend_growth_5y, 2) if dividend_growth_5y else None,
+        consecutive_years=consecutive_years,
+        dividend_history=dividend_history,
+        ex_dividend_date=ex_dividend_date,
+        payment_frequency=payment_frequency,
+        safety_score=safety_score,
+        safety_factors=safety_factors,
+        income_rating=income_rating,
+        summary=summary,
+    )
+
+
+# ============================================================================
+# Portfolio income
+# ============================================================================
+
+@dataclass
+class HoldingIncome:
+    ticker: str
+    quantity: float
+    payment_frequency: str | None
+    last_dividend: float | None  # Latest payment per share
+    next_ex_date: str | None  # First projected ex-dividend date
+    projected_income: float  # Next 12 months
+    trailing_income: float  # Last 12 months at the current quantity
+    yield_on_cost: float | None  # Projected income / cost of open lots, %
+    income_growth: float | None  # Trailing 12 months vs the 12 before, per share, %
+
+
+@dataclass
+class IncomeProjection:
+    portfolio: str
+    as_of: str
+    monthly: list[dict]  # [{"month": "2026-11", "income": 45.0}, ...]
+    projected_income: float
+    trailing_income: float
+    yield_on_cost: float | None
+    income_growth: float | None  # Over holdings with two comparable years
+    received: float  # Dividends recorded in the portfolio ledger
+    holdings: list[HoldingIncome]
+    non_payers: list[str]
+
+
+def refresh_histories(
+    tickers: list[str],
+    cache: DividendHistoryCache,
+    max_workers: int = MAX_WORKERS,
+    max_age: float = HISTORY_TTL,
+    verbose: bool = False,
+) -> None:
+    """Fetch the history deltas of stale tickers concurrently (no quote lookups)."""
+    stale = cache.stale(tickers, max_age)
+    if not stale:
+        return
+    checked = cache.checked(stale)
+    through = datetime.now().strftime("%Y-%m-%d")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(stale)))) as pool:
+        futures = {
+            pool.submit(fetch_dividend_history, yf.Ticker(t), checked.get(t, (0, None))[1]): t
+            for t in stale
+        }
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                dividends, full = future.result()
+            except Exception as e:
+                if verbose:
+                    print(f"Error fetching dividends for {ticker}: {e}", file=sys.stderr)
+                continue
+            cache.store(ticker, dividends, through, full)
+
+
+def projection_start(today: pd.Timestamp) -> pd.Timestamp:
+    """First day of the month after `today`, where income projections begin."""
+    return (today + pd.offsets.MonthBegin(1)).normalize()
+
+
+def project_dividends(frame: pd.DataFrame, today: pd.Timestamp | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Per-share dividend schedule for the next 12 calendar months (starting
+    next month), for every ticker in a (ticker, date, amount) frame at once.
+
+    Each payment of the last 12 months is assumed to recur a year later (same
+    ex-date, so the calendar follows the company's own cadence) at the latest
+    per-share amount; one that would recur later this month falls in the
+    window's last month instead. Only regular payers (see
+    compute_dividend_stats) are projected, so one-off specials don't repeat.
+
+    Returns (schedule, per_ticker): schedule has ticker/ex_date/amount rows;
+    per_ticker is indexed by ticker with payment_frequency, last_dividend,
+    trailing (last 12 months) and prior (the 12 months before, NaN when
+    that year had fewer payments) per share.
+    """
+    today = today or pd.Timestamp.now().normalize()
+    year_ago, two_years_ago = today - pd.DateOffset(years=1), today - pd.DateOffset(years=2)
+    columns = ["payment_frequency", "last_dividend", "trailing", "prior"]
+    if frame.empty:
+        schedule = pd.DataFrame({
+            "ticker": pd.Series(dtype=object),
+            "ex_date": pd.Series(dtype="datetime64[ns]"),
+            "amount": pd.Series(dtype=float),
+        })
+        per_ticker = pd.DataFrame(columns=columns).astype({"last_dividend": float, "trailing": float, "prior": float})
+        return schedule, per_ticker
+
+    frame = frame[frame["date"] <= today].sort_values(["ticker", "date"])
+    by_ticker = frame.groupby("ticker")
+    frequency = compute_dividend_stats(frame, today)["payment_frequency"]
+    recent = frame["date"] > year_ago
+    prior = (frame["date"] > two_years_ago) & ~recent
+
+    per_ticker = pd.DataFrame({
+        "payment_frequency": frequency,
+        "last_dividend": by_ticker["amount"].last(),
+        "trailing": frame[recent].groupby("ticker")["amount"].sum(),
+        "prior": frame[prior].groupby("ticker")["amount"].sum(),
+    }).reindex(columns=columns)
+    per_ticker["trailing"] = per_ticker["trailing"].fillna(0.0)
+    # Growth is only comparable when the earlier year has a full schedule
+    # (not a payer that started, or switched cadence, partway through it)
+    counts = pd.DataFrame({
+        "trailing": frame[recent].groupby("ticker").size(),
+        "prior": frame[prior].groupby("ticker").size(),
+    }).reindex(per_ticker.index).fillna(0)
+    per_ticker["prior"] = per_ticker["prior"].where(counts["prior"] >= counts["trailing"])
+
+    regular = per_ticker.index[per_ticker["payment_frequency"].notna()]
+    upcoming = frame[recent & frame["ticker"].isin(regular)]
+    ex_date = upcoming["date"] + pd.DateOffset(years=1)
+    ex_date = ex_date.where(ex_date >= projection_start(today), ex_date + pd.DateOffset(years=1))
+    schedule = pd.DataFrame({
+        "ticker": upcoming["ticker"].to_numpy(),
+        "ex_date": ex_date.to_numpy(),
+        "amount": upcoming["ticker"].map(per_ticker["last_dividend"]).to_numpy(),
+    })
+    return schedule, per_ticker
+
+
+def project_portfolio_income(
+    name: str,
+    holdings: pd.DataFrame,
+    schedule: pd.DataFrame,
+    per_ticker: pd.DataFrame,
+    today: pd.Timestamp | None = None,
+    received: float = 0.0,
+) -> IncomeProjection:
+    """
+    Scale per-share projections by `holdings` (indexed by ticker, with
+    quantity and cost columns) and bucket the cash flows by month.
+    """
+    today = today or pd.Timestamp.now().normalize()
+    quantity = holdings["quantity"]
+    flows = schedule[schedule["ticker"].isin(holdings.index)]
+    flows = flows.assign(income=flows["amount"] * flows["ticker"].map(quantity))
+
+    months = pd.period_range(projection_start(today), periods=12, freq="M")
+    monthly = flows.groupby(flows["ex_date"].dt.to_period("M"))["income"].sum().reindex(months, fill_value=0.0)
+
+    stats = per_ticker.reindex(holdings.index)
+    projected = flows.groupby("ticker")["income"].sum().reindex(holdings.index, fill_value=0.0)
+    next_ex = flows.groupby("ticker")["ex_date"].min().reindex(holdings.index)
+    trailing = stats["trailing"].fillna(0.0) * quantity
+    prior = stats["prior"] * quantity
+    comparable = prior > 0
+    cost = holdings["cost"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yield_on_cost = (projected / cost * 100).where(cost > 0)
+        growth = ((trailing / prior - 1) * 100).where(comparable)
+
+    def _value(value, digits=2):
+        return None if pd.isna(value) else round(float(value), digits)
+
+    rows = []
+    non_payers = []
+    for ticker in holdings.index:
+        if projected[ticker] == 0 and trailing[ticker] == 0:
+            non_payers.append(ticker)
+            continue
+        rows.append(HoldingIncome(
+            ticker=ticker,
+            quantity=float(quantity[ticker]),
+            payment_frequency=stats.at[ticker, "payment_frequency"] if pd.notna(stats.at[ticker, "payment_frequency"]) else None,
+            last_dividend=_value(stats.at[ticker, "last_dividend"], 4),
+            next_ex_date=next_ex[ticker].strftime("%Y-%m-%d") if pd.notna(next_ex[ticker]) else None,
+            projected_income=round(float(projected[ticker]), 2),
+            trailing_income=round(float(trailing[ticker]), 2),
+            yield_on_cost=_value(yield_on_cost[ticker]),
+            income_growth=_value(growth[ticker]),
+        ))
+    rows.sort(key=lambda h: -h.projected_income)
+
+    total_cost = float(cost[projected > 0].sum())
+    total_prior = float(prior[comparable].sum())
+    total_growth = None
+    if total_prior > 0:
+        total_growth = round((float(trailing[comparable].sum()) / total_prior - 1) * 100, 2)
+    return IncomeProjection(
+        portfolio=name,
+        as_of=today.strftime("%Y-%m-%d"),
+        monthly=[{"month": str(month), "income": round(float(value), 2)} for month, value in monthly.items()],
+        projected_income=round(float(projected.sum()), 2),
+        trailing_income=round(float(trailing.sum()), 2),
+        yield_on_cost=round(float(projected.sum()) / total_cost * 100, 2) if total_cost > 0 else None,
+        income_growth=total_growth,
+        received=round(received, 2),
+        holdings=rows,
+        non_payers=non_payers,
+    )
+
+
+def analyze_portfolio_income(
+    names: list[str],
+    store=None,
+    cache: DividendHistoryCache | None = None,
+    refresh: bool = True,
+    max_workers: int = MAX_WORKERS,
+    max_age: float = HISTORY_TTL,
+    verbose: bool = False,
+) -> list[IncomeProjection]:
+    """
+    Income projections for the named portfolios. Histories of all their
+    stock holdings are refreshed (deltas only) and projected in one pass.
+    """
+    from portfolio import PortfolioStore
+
+    store = store or PortfolioStore()
+    cache = cache or DividendHistoryCache()
+    portfolios = []
+    for name in names:
+        portfolio = store.get_portfolio(name)
+        if portfolio is None:
+            raise ValueError(f"Portfolio '{name}' not found")
+        portfolios.append(portfolio)
+
+    held = {
+        p.name: pd.DataFrame(
+            [
+                {
+                    "ticker": a.ticker,
+                    "quantity": a.quantity,
+                    "cost": p.positions[a.ticker].cost if a.ticker in p.positions else a.quantity * a.cost_basis,
+                }
+                for a in p.assets if a.type == "stock" and a.quantity > 0
+            ],
+            columns=["ticker", "quantity", "cost"],
+        ).set_index("ticker")
+        for p in portfolios
+    }
+    tickers = list(dict.fromkeys(t for holdings in held.values() for t in holdings.index))
+    if refresh:
+        refresh_histories(tickers, cache, max_workers, max_age, verbose)
+
+    today = pd.Timestamp.now().normalize()
+    schedule, per_ticker = project_dividends(cache.frame(tickers), today)
+    return [
+        project_portfolio_income(
+            p.name, held[p.name], schedule, per_ticker, today,
+            received=sum(pos.dividends for pos in p.positions.values()),
+        )
+        for p in portfolios
+    ]
+
+
+# ============================================================================
+# Screener index
+# ============================================================================
+
+SCREEN_TTL = 24 * 3600  # Seconds before a screener row is recomputed
+RATINGS = ("no_dividend", "poor", "moderate", "good", "excellent")
+SCREEN_SORTS = {
+    "yield": "dividend_yield DESC",
+    "safety": "safety_score DESC",
+    "payout": "payout_ratio ASC",
+    "streak": "consecutive_years DESC",
+    "growth": "dividend_growth_5y DESC",
+    "ticker": "ticker ASC",
+}
+
+
+class DividendScreenIndex:
+    """
+    Precomputed DividendAnalysis rows for a universe of tickers, stored next
+    to the history cache. Queries filter and sort in SQLite over indexed
+    columns, so they need no network; refresh() recomputes stale rows only.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or DIVIDEND_CACHE_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS screen (
+                ticker TEXT PRIMARY KEY,
+                refreshed_at REAL NOT NULL,  -- 0 = queued, never computed
+                dividend_yield REAL,
+                payout_ratio REAL,
+                dividend_growth_5y REAL,
+                consecutive_years INTEGER,
+                safety_score INTEGER,
+                rating_rank INTEGER,         -- Index into RATINGS
+                analysis TEXT                -- Full DividendAnalysis as JSON
+            );
+            CREATE INDEX IF NOT EXISTS screen_yield ON screen (dividend_yield);
+            CREATE INDEX IF NOT EXISTS screen_safety ON screen (safety_score);
+            CREATE INDEX IF NOT EXISTS screen_payout ON screen (payout_ratio);
+            CREATE INDEX IF NOT EXISTS screen_growth ON screen (dividend_growth_5y);
+            CREATE INDEX IF NOT EXISTS screen_streak ON screen (consecutive_years);
+            CREATE INDEX IF NOT EXISTS screen_rating ON screen (rating_rank);
+            CREATE INDEX IF NOT EXISTS screen_refreshed ON screen (refreshed_at);
+        """)
+
+    def add(self, tickers: list[str]) -> None:
+        """Add tickers to the universe; new ones are stale until refreshed."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO screen (ticker, refreshed_at) VALUES (?, 0) ON CONFLICT (ticker) DO NOTHING",
+                [(t,) for t in tickers],
+            )
+
+    def remove(self, tickers: list[str]) -> None:
+        with self._conn:
+            self._conn.executemany("DELETE FROM screen WHERE ticker = ?", [(t,) for t in tickers])
+
+    def tickers(self) -> list[str]:
+        return [row[0] for row in self._conn.execute("SELECT ticker FROM screen ORDER BY ticker")]
+
+    def stale(self, max_age: float = SCREEN_TTL, tickers: list[str] | None = None) -> list[str]:
+        rows = self._conn.execute(
+            "SELECT ticker FROM screen WHERE refreshed_at < ? ORDER BY refreshed_at, ticker",
+            (time.time() - max_age,),
+        ).fetchall()
+        stale = [row[0] for row in rows]
+        if tickers is not None:
+            wanted = set(tickers)
+            stale = [t for t in stale if t in wanted]
+        return stale
+
+    def store(self, analyses: list[DividendAnalysis]) -> None:
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO screen (ticker, refreshed_at, dividend_yield, payout_ratio, dividend_growth_5y,
+                                    consecutive_years, safety_score, rating_rank, analysis)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (ticker) DO UPDATE SET
+                    refreshed_at = excluded.refreshed_at, dividend_yield = excluded.dividend_yield,
+                    payout_ratio = excluded.payout_ratio, dividend_growth_5y = excluded.dividend_growth_5y,
+                    consecutive_years = excluded.consecutive_years, safety_score = excluded.safety_score,
+                    rating_rank = excluded.rating_rank, analysis = excluded.analysis
+                """,
+                [
+                    (a.ticker, now, a.dividend_yield, a.payout_ratio, a.dividend_growth_5y, a.consecutive_years,
+                     a.safety_score, RATINGS.index(a.income_rating), json.dumps(asdict(a)))
+                    for a in analyses
+                ],
+            )
+
+    def refresh(
+        self,
+        tickers: list[str] | None = None,
+        max_age: float = SCREEN_TTL,
+        max_workers: int = MAX_WORKERS,
+        verbose: bool = False,
+    ) -> tuple[int, int]:
+        """
+        Recompute rows older than `max_age` (limited to `tickers` if given).
+        Failed tickers keep their previous row. Returns (refreshed, stale).
+        """
+        stale = self.stale(max_age, tickers)
+        if not stale:
+            return 0, 0
+        analyses = analyze_dividends_batch(
+            stale, verbose=verbose, max_workers=max_workers, cache=DividendHistoryCache(self.path)
         )
-        
-    except Exception as e:
-        if verbose:
-            print(f"Error analyzing {ticker}: {e}", file=sys.stderr)
-        return None
+        self.store(list(analyses.values()))
+        return len(analyses), len(stale)
+
+    def query(
+        self,
+        min_yield: float | None = None,
+        max_payout: float | None = None,
+        min_streak: int | None = None,
+        min_rating: str | None = None,
+        min_safety: int | None = None,
+        min_growth: float | None = None,
+        tickers: list[str] | None = None,
+        sort: str = "yield",
+        limit: int | None = None,
+    ) -> list[DividendAnalysis]:
+        """Computed rows matching every given filter, best first by `sort`."""
+        where, params = ["refreshed_at > 0"], []
+        for clause, value in (
+            ("dividend_yield >= ?", min_yield),
+            ("payout_ratio <= ?", max_payout),
+            ("consecutive_years >= ?", min_streak),
+            ("rating_rank >= ?", RATINGS.index(min_rating) if min_rating else None),
+            ("safety_score >= ?", min_safety),
+            ("dividend_growth_5y >= ?", min_growth),
+        ):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if tickers is not None:
+            where.append("ticker IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(tickers))
+
+        # NULLs (e.g. no payout ratio) sort last in either direction
+        column, direction = SCREEN_SORTS[sort].split()
+        sql = (f"SELECT analysis FROM screen WHERE {' AND '.join(where)} "
+               f"ORDER BY {column} IS NULL, {column} {direction}, ticker")
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [DividendAnalysis(**json.loads(row[0])) for row in self._conn.execute(sql, params)]
 
 
 def format_text(analysis: DividendAnalysis) -> str:
@@ -333,19 +954,196 @@ def format_text(analysis: DividendAnalysis) -> str:
     return "\n".join(lines)
 
 
+def format_income_text(projection: IncomeProjection) -> str:
+    """Format a portfolio income projection as text."""
+    lines = [
+        "=" * 60,
+        f"DIVIDEND INCOME: {projection.portfolio} (as of {projection.as_of})",
+        "=" * 60,
+        "",
+    ]
+
+    if not projection.holdings:
+        lines.append("No dividend-paying stock holdings.")
+        lines.append("=" * 60)
+        return "\n".join(lines)
+
+    lines.append(f"Next 12 Months:   ${projection.projected_income:,.2f}")
+    lines.append(f"Last 12 Months:   ${projection.trailing_income:,.2f}")
+    if projection.yield_on_cost is not None:
+        lines.append(f"Yield on Cost:    {projection.yield_on_cost:.2f}%")
+    if projection.income_growth is not None:
+        lines.append(f"Income Growth:    {projection.income_growth:+.1f}%")
+    if projection.received:
+        lines.append(f"Received:         ${projection.received:,.2f} (ledger)")
+
+    lines.append("")
+    lines.append("Monthly Cash Flow:")
+    peak = max((m["income"] for m in projection.monthly), default=0)
+    for m in projection.monthly:
+        bar = "█" * round(m["income"] / peak * 20) if peak > 0 else ""
+        lines.append(f"  {m['month']}: ${m['income']:>10,.2f}  {bar}")
+
+    lines.append("")
+    lines.append("Holdings:")
+    for h in projection.holdings:
+        details = [h.payment_frequency or "irregular"]
+        if h.next_ex_date:
+            details.append(f"next ex {h.next_ex_date}")
+        if h.yield_on_cost is not None:
+            details.append(f"YoC {h.yield_on_cost:.2f}%")
+        if h.income_growth is not None:
+            details.append(f"growth {h.income_growth:+.1f}%")
+        lines.append(f"  {h.ticker:<8} ${h.projected_income:>10,.2f}  {', '.join(details)}")
+    if projection.non_payers:
+        lines.append(f"  No dividends: {', '.join(projection.non_payers)}")
+
+    lines.append("")
+    lines.append("=" * 60)
+    return "\n".join(lines)
+
+
+def format_screen_text(analyses: list[DividendAnalysis]) -> str:
+    """Format screener results as a table."""
+    def pct(value, fmt):
+        return format(value, fmt) + "%" if value is not None else "N/A"
+
+    lines = [
+        f"{'TICKER':<8} {'YIELD':>7} {'PAYOUT':>7} {'5Y GROWTH':>9} {'STREAK':>6} {'SAFETY':>6}  RATING",
+        "-" * 60,
+    ]
+    for a in analyses:
+        lines.append(
+            f"{a.ticker:<8} {pct(a.dividend_yield, '.2f'):>7} {pct(a.payout_ratio, '.1f'):>7} "
+            f"{pct(a.dividend_growth_5y, '+.1f'):>9} {a.consecutive_years or 0:>6} {a.safety_score:>6}  {a.income_rating}"
+        )
+    lines.append("-" * 60)
+    lines.append(f"{len(analyses)} match(es)")
+    return "\n".join(lines)
+
+
+def income_main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="dividends.py income", description="Portfolio dividend income projection")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--portfolio", "-p", help="Portfolio name (default: first portfolio)")
+    group.add_argument("--all", action="store_true", help="Every portfolio")
+    parser.add_argument("--offline", action="store_true", help="Use cached histories only")
+    parser.add_argument("--output", choices=["text", "json"], default="text")
+    parser.add_argument("--verbose", "-v", action="store_true")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help=f"Parallel fetches (default: {MAX_WORKERS})")
+
+    args = parser.parse_args(argv)
+
+    from portfolio import PortfolioStore
+
+    store = PortfolioStore()
+    if args.all:
+        names = store.list_portfolios()
+    else:
+        name = args.portfolio or store.get_default_portfolio_name()
+        names = [name] if name else []
+    if not names:
+        print("Error: No portfolios found. Create one with: portfolio.py create <name>", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        projections = analyze_portfolio_income(
+            names, store=store, refresh=not args.offline, max_workers=args.workers, verbose=args.verbose,
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.output == "json":
+        data = [asdict(p) for p in projections]
+        print(json.dumps(data[0] if len(data) == 1 else data, indent=2))
+    else:
+        print("\n\n".join(format_income_text(p) for p in projections))
+
+
+def screen_main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="dividends.py screen", description="Dividend screener over a cached universe")
+    parser.add_argument("tickers", nargs="*", help="Tickers to add to the universe and screen")
+    parser.add_argument("--universe", type=Path, help="File with one ticker per line")
+    parser.add_argument("--remove", nargs="+", metavar="TICKER", help="Drop tickers from the universe")
+    parser.add_argument("--refresh", action="store_true", help="Recompute stale rows of the whole universe first")
+    parser.add_argument("--max-age", type=float, default=SCREEN_TTL / 3600, help="Hours before a row is stale (default: 24)")
+    parser.add_argument("--min-yield", type=float, help="Minimum dividend yield %%")
+    parser.add_argument("--max-payout", type=float, help="Maximum payout ratio %%")
+    parser.add_argument("--min-streak", type=int, help="Minimum consecutive years without a cut")
+    parser.add_argument("--min-rating", choices=RATINGS[1:], help="Minimum income rating")
+    parser.add_argument("--min-safety", type=int, help="Minimum safety score (0-100)")
+    parser.add_argument("--min-growth", type=float, help="Minimum 5Y dividend growth %%")
+    parser.add_argument("--sort", choices=list(SCREEN_SORTS), default="yield")
+    parser.add_argument("--limit", type=int, help="Show at most N rows")
+    parser.add_argument("--output", choices=["text", "json"], default="text")
+    parser.add_argument("--verbose", "-v", action="store_true")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help=f"Parallel fetches (default: {MAX_WORKERS})")
+
+    args = parser.parse_args(argv)
+
+    index = DividendScreenIndex()
+    if args.remove:
+        index.remove([t.upper() for t in args.remove])
+
+    tickers = [t.upper() for t in args.tickers]
+    if args.universe:
+        try:
+            lines = args.universe.read_text().splitlines()
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        tickers += [line.split("#")[0].strip().upper() for line in lines if line.split("#")[0].strip()]
+    tickers = list(dict.fromkeys(tickers)) or None
+
+    max_age = args.max_age * 3600
+    if tickers:
+        index.add(tickers)
+    if tickers or args.refresh:
+        refreshed, stale = index.refresh(tickers if not args.refresh else None, max_age, args.workers, args.verbose)
+        if stale:
+            print(f"Refreshed {refreshed}/{stale} stale row(s)", file=sys.stderr)
+
+    results = index.query(
+        min_yield=args.min_yield,
+        max_payout=args.max_payout,
+        min_streak=args.min_streak,
+        min_rating=args.min_rating,
+        min_safety=args.min_safety,
+        min_growth=args.min_growth,
+        tickers=tickers,
+        sort=args.sort,
+        limit=args.limit,
+    )
+
+    if args.output == "json":
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(format_screen_text(results))
+
+
 def main():
+    if sys.argv[1:2] == ["income"]:
+        income_main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["screen"]:
+        screen_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description="Dividend Analysis")
     parser.add_argument("tickers", nargs="+", help="Stock ticker(s)")
     parser.add_argument("--output", choices=["text", "json"], default="text")
     parser.add_argument("--verbose", "-v", action="store_true")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help=f"Parallel fetches (default: {MAX_WORKERS})")
     
     args = parser.parse_args()
     
+    tickers = [ticker.upper() for ticker in args.tickers]
+    analyses = analyze_dividends_batch(tickers, verbose=args.verbose, max_workers=args.workers)
     results = []
-    for ticker in args.tickers:
-        analysis = analyze_dividends(ticker.upper(), verbose=args.verbose)
-        if analysis:
-            results.append(analysis)
+    for ticker in tickers:
+        if ticker in analyses:
+            results.append(analyses[ticker])
         else:
             print(f"Error: Could not analyze {ticker}", file=sys.stderr)
     
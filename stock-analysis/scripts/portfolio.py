@@ -9,26 +9,49 @@ Portfolio management for stock-analysis skill.
 Usage:
     uv run portfolio.py create "Portfolio Name"
     uv run portfolio.py list
-    uv run portfolio.py show [--portfolio NAME]
+    uv run portfolio.py show [--portfolio NAME] [--watch 30]
     uv run portfolio.py delete "Portfolio Name"
     uv run portfolio.py rename "Old Name" "New Name"
 
     uv run portfolio.py add TICKER --quantity 100 --cost 150.00 [--portfolio NAME]
     uv run portfolio.py update TICKER --quantity 150 [--portfolio NAME]
-    uv run portfolio.py remove TICKER [--portfolio NAME]
+    uv run portfolio.py remove TICKER [--portfolio NAME] [--purge]
+
+    uv run portfolio.py buy TICKER --quantity 10 --price 150.00 [--date 2024-01-15] [--fee 1]
+    uv run portfolio.py sell TICKER --quantity 5 --price 180.00 [--date 2024-06-01] [--fee 1]
+    uv run portfolio.py split TICKER --ratio 4 [--date 2024-06-10]
+    uv run portfolio.py dividend TICKER --per-share 0.24 | --amount 12.50 [--date 2024-05-16]
+    uv run portfolio.py history [TICKER]
+    uv run portfolio.py method fifo|lifo|average
+    uv run portfolio.py import positions.csv [--date 2024-01-02] [--dry-run] [--rejects rejects.csv]
+
+Every change is appended to a per-portfolio transaction ledger. Each ticker keeps
+a running position (open lots, cost, realized P&L, dividends) that is updated
+incrementally, so `show` is O(positions) however long the history gets.
+
+Storage: SQLite (portfolios.db, WAL mode) by default; an existing portfolios.json
+is imported on first run. Pass a *.json path to keep the JSON file backend.
 """
 
 import argparse
+import csv
 import json
 import os
+import re
+import sqlite3
 import sys
-from dataclasses import dataclass, asdict
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from pathlib import Path
 from typing import Literal
 
 import yfinance as yf
 
+from quotes import Quote, fetch_quotes, get_quotes, save_quotes as _save_quotes
+
 
 # Top 20 supported cryptocurrencies
 SUPPORTED_CRYPTOS = {
@@ -41,11 +64,11 @@ SUPPORTED_CRYPTOS = {
 
 def get_storage_path() -> Path:
     """Get the portfolio storage path."""
-    # Use ~/.clawdbot/skills/stock-analysis/portfolios.json
+    # Use ~/.clawdbot/skills/stock-analysis/portfolios.db (portfolios.json is migrated)
     state_dir = os.environ.get("CLAWDBOT_STATE_DIR", os.path.expanduser("~/.clawdbot"))
     portfolio_dir = Path(state_dir) / "skills" / "stock-analysis"
     portfolio_dir.mkdir(parents=True, exist_ok=True)
-    return portfolio_dir / "portfolios.json"
+    return portfolio_dir / "portfolios.db"
 
 
 def detect_asset_type(ticker: str) -> Literal["stock", "crypto"]:
@@ -70,20 +93,235 @@ class Asset:
     added_at: str
 
 
+# ============================================================================
+# Transaction ledger
+# ============================================================================
+
+CostMethod = Literal["fifo", "lifo", "average"]
+COST_METHODS = ("fifo", "lifo", "average")
+TransactionKind = Literal["buy", "sell", "split", "dividend", "adjust"]
+QUANTITY_EPSILON = 1e-9
+
+
+@dataclass
+class Transaction:
+    ticker: str
+    kind: TransactionKind
+    quantity: float  # Units traded; ratio for "split"; units held for "dividend"
+    price: float  # Per unit; amount per share for "dividend"
+    date: str  # YYYY-MM-DD
+    fee: float = 0.0
+
+
+@dataclass
+class Lot:
+    quantity: float
+    unit_cost: float  # Including buy fees
+    date: str
+
+
+@dataclass
+class Position:
+    ticker: str
+    quantity: float = 0.0
+    cost: float = 0.0  # Total cost of open lots
+    realized_pnl: float = 0.0
+    dividends: float = 0.0
+    last_date: str = ""
+    lots: list[Lot] = field(default_factory=list)
+
+    @property
+    def cost_basis(self) -> float:
+        """Average cost per unit of the open lots."""
+        return self.cost / self.quantity if self.quantity > 0 else 0.0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Position":
+        return cls(**{**data, "lots": [Lot(**lot) for lot in data.get("lots", [])]})
+
+
+def apply_transaction(position: Position, txn: Transaction, method: CostMethod = "fifo") -> Position:
+    """
+    Return the position after `txn`; `position` itself is not modified.
+
+    Sells consume the oldest lots (fifo), newest lots (lifo), or the single
+    merged lot (average). Raises ValueError for invalid or oversized trades.
+    """
+    lots = [Lot(lot.quantity, lot.unit_cost, lot.date) for lot in position.lots]
+    quantity, cost = position.quantity, position.cost
+    realized, dividends = position.realized_pnl, position.dividends
+
+    if txn.kind in ("buy", "sell", "split") and txn.quantity <= 0:
+        raise ValueError(f"{txn.kind.capitalize()} quantity must be positive")
+
+    if txn.kind == "buy":
+        total = txn.quantity * txn.price + txn.fee
+        if method == "average" and lots:
+            merged = quantity + txn.quantity
+            lots = [Lot(merged, (cost + total) / merged, lots[0].date)]
+        else:
+            lots.append(Lot(txn.quantity, total / txn.quantity, txn.date))
+        quantity += txn.quantity
+        cost += total
+
+    elif txn.kind == "sell":
+        if txn.quantity > quantity + QUANTITY_EPSILON:
+            raise ValueError(f"Cannot sell {txn.quantity:g} {txn.ticker}: only {quantity:g} held")
+        index = -1 if method == "lifo" else 0
+        remaining, removed = txn.quantity, 0.0
+        while remaining > QUANTITY_EPSILON and lots:
+            lot = lots[index]
+            take = min(lot.quantity, remaining)
+            removed += take * lot.unit_cost
+            lot.quantity -= take
+            remaining -= take
+            if lot.quantity <= QUANTITY_EPSILON:
+                lots.pop(index)
+        realized += txn.quantity * txn.price - txn.fee - removed
+        quantity -= txn.quantity
+        cost -= removed
+        if quantity <= QUANTITY_EPSILON:
+            quantity, cost, lots = 0.0, 0.0, []
+
+    elif txn.kind == "split":
+        lots = [Lot(lot.quantity * txn.quantity, lot.unit_cost / txn.quantity, lot.date) for lot in lots]
+        quantity *= txn.quantity
+
+    elif txn.kind == "dividend":
+        dividends += txn.quantity * txn.price - txn.fee
+
+    elif txn.kind == "adjust":
+        # Manual correction: replace the open lots with one lot
+        lots = [Lot(txn.quantity, txn.price, txn.date)] if txn.quantity > 0 else []
+        quantity = max(txn.quantity, 0.0)
+        cost = quantity * txn.price
+
+    else:
+        raise ValueError(f"Unknown transaction kind: {txn.kind}")
+
+    return Position(
+        ticker=position.ticker,
+        quantity=quantity,
+        cost=cost,
+        realized_pnl=realized,
+        dividends=dividends,
+        last_date=max(position.last_date, txn.date),
+        lots=lots,
+    )
+
+
+def replay_transactions(ticker: str, transactions: list[Transaction], method: CostMethod = "fifo") -> Position:
+    """Rebuild a position from its full history (date order, stable for same-day trades)."""
+    position = Position(ticker=ticker)
+    for txn in sorted(transactions, key=lambda t: t.date):
+        position = apply_transaction(position, txn, method)
+    return position
+
+
 @dataclass
 class Portfolio:
     name: str
     created_at: str
     updated_at: str
     assets: list[Asset]
+    cost_method: CostMethod = "fifo"
+    positions: dict[str, Position] = field(default_factory=dict)  # Includes closed positions
 
 
-class PortfolioStore:
-    """Manages portfolio storage with atomic writes."""
+# ============================================================================
+# Storage backends
+# ============================================================================
 
-    def __init__(self, path: Path | None = None):
-        self.path = path or get_storage_path()
+def _portfolio_key(name: str) -> str:
+    """Convert portfolio name to storage key."""
+    return name.lower().replace(" ", "-")
+
+
+class StorageBackend(ABC):
+    """
+    Row-level storage used by PortfolioStore. Records are plain dicts shaped
+    like the JSON file: portfolio headers (key, name, created_at, updated_at,
+    cost_method), assets, positions and transactions. Writes made inside
+    `transaction()` are committed together.
+    """
+
+    @abstractmethod
+    def transaction(self):
+        ...
+
+    @abstractmethod
+    def list_portfolios(self) -> list[dict]:
+        ...
+
+    @abstractmethod
+    def find_portfolio(self, name: str) -> dict | None:
+        """Header by key or case-insensitive name."""
+
+    @abstractmethod
+    def insert_portfolio(self, header: dict) -> None:
+        ...
+
+    @abstractmethod
+    def update_portfolio(self, key: str, **fields) -> None:
+        """Update header fields; `new_key` re-keys the portfolio and its rows."""
+
+    @abstractmethod
+    def delete_portfolio(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def get_assets(self, key: str) -> list[dict]:
+        ...
+
+    @abstractmethod
+    def get_asset(self, key: str, ticker: str) -> dict | None:
+        ...
+
+    @abstractmethod
+    def upsert_asset(self, key: str, asset: dict) -> None:
+        ...
+
+    @abstractmethod
+    def delete_asset(self, key: str, ticker: str) -> bool:
+        ...
+
+    @abstractmethod
+    def get_positions(self, key: str) -> dict[str, dict]:
+        ...
+
+    @abstractmethod
+    def get_position(self, key: str, ticker: str) -> dict | None:
+        ...
+
+    @abstractmethod
+    def upsert_position(self, key: str, position: dict) -> None:
+        ...
+
+    @abstractmethod
+    def delete_position(self, key: str, ticker: str) -> None:
+        ...
+
+    @abstractmethod
+    def get_transactions(self, key: str, ticker: str | None = None) -> list[dict]:
+        ...
+
+    @abstractmethod
+    def append_transactions(self, key: str, transactions: list[dict]) -> None:
+        ...
+
+    @abstractmethod
+    def delete_transactions(self, key: str, ticker: str) -> None:
+        ...
+
+
+class JsonBackend(StorageBackend):
+    """Whole-file JSON storage with atomic writes (the original format)."""
+
+    def __init__(self, path: Path):
+        self.path = path
         self._data: dict | None = None
+        self._depth = 0
+        self._dirty = False
 
     def _load(self) -> dict:
         """Load portfolios from disk."""
@@ -121,108 +359,427 @@ class PortfolioStore:
                 tmp_path.unlink()
             raise
 
-    def _get_portfolio_key(self, name: str) -> str:
-        """Convert portfolio name to storage key."""
-        return name.lower().replace(" ", "-")
+    def _changed(self) -> None:
+        if self._depth:
+            self._dirty = True
+        else:
+            self._save()
 
-    def list_portfolios(self) -> list[str]:
-        """List all portfolio names."""
-        data = self._load()
-        return [p["name"] for p in data["portfolios"].values()]
+    @contextmanager
+    def transaction(self):
+        self._depth += 1
+        try:
+            yield
+        except Exception:
+            if self._depth == 1:
+                self._data = None  # Drop partial changes
+                self._dirty = False
+            raise
+        finally:
+            self._depth -= 1
+        if self._depth == 0 and self._dirty:
+            self._dirty = False
+            self._save()
 
-    def get_portfolio(self, name: str) -> Portfolio | None:
-        """Get a portfolio by name."""
-        data = self._load()
-        key = self._get_portfolio_key(name)
+    def _portfolio(self, key: str) -> dict:
+        portfolio = self._load()["portfolios"][key]
+        portfolio.setdefault("cost_method", "fifo")
+        portfolio.setdefault("positions", {})
+        portfolio.setdefault("transactions", [])
+        return portfolio
+
+    @staticmethod
+    def _header(key: str, portfolio: dict) -> dict:
+        return {
+            "key": key,
+            "name": portfolio["name"],
+            "created_at": portfolio["created_at"],
+            "updated_at": portfolio["updated_at"],
+            "cost_method": portfolio.get("cost_method", "fifo"),
+        }
 
-        if key not in data["portfolios"]:
+    def list_portfolios(self) -> list[dict]:
+        return [self._header(k, p) for k, p in self._load()["portfolios"].items()]
+
+    def find_portfolio(self, name: str) -> dict | None:
+        portfolios = self._load()["portfolios"]
+        key = _portfolio_key(name)
+        if key not in portfolios:
             # Try case-insensitive match
-            for k, v in data["portfolios"].items():
+            for k, v in portfolios.items():
                 if v["name"].lower() == name.lower():
                     key = k
                     break
             else:
                 return None
+        return self._header(key, portfolios[key])
+
+    def insert_portfolio(self, header: dict) -> None:
+        record = {k: v for k, v in header.items() if k != "key"}
+        self._load()["portfolios"][header["key"]] = {**record, "assets": [], "positions": {}, "transactions": []}
+        self._changed()
+
+    def update_portfolio(self, key: str, **fields) -> None:
+        portfolios = self._load()["portfolios"]
+        new_key = fields.pop("new_key", key)
+        portfolio = portfolios.pop(key) if new_key != key else portfolios[key]
+        portfolio.update(fields)
+        portfolios[new_key] = portfolio
+        self._changed()
+
+    def delete_portfolio(self, key: str) -> None:
+        del self._load()["portfolios"][key]
+        self._changed()
+
+    def get_assets(self, key: str) -> list[dict]:
+        return [dict(a) for a in self._portfolio(key)["assets"]]
+
+    def get_asset(self, key: str, ticker: str) -> dict | None:
+        for asset in self._portfolio(key)["assets"]:
+            if asset["ticker"] == ticker:
+                return dict(asset)
+        return None
 
-        p = data["portfolios"][key]
-        assets = [
-            Asset(
-                ticker=a["ticker"],
-                type=a["type"],
-                quantity=a["quantity"],
-                cost_basis=a["cost_basis"],
-                added_at=a["added_at"],
-            )
-            for a in p.get("assets", [])
-        ]
+    def upsert_asset(self, key: str, asset: dict) -> None:
+        assets = self._portfolio(key)["assets"]
+        for i, existing in enumerate(assets):
+            if existing["ticker"] == asset["ticker"]:
+                assets[i] = {**existing, **asset, "added_at": existing["added_at"]}
+                break
+        else:
+            assets.append(dict(asset))
+        self._changed()
+
+    def delete_asset(self, key: str, ticker: str) -> bool:
+        portfolio = self._portfolio(key)
+        original_len = len(portfolio["assets"])
+        portfolio["assets"] = [a for a in portfolio["assets"] if a["ticker"] != ticker]
+        if len(portfolio["assets"]) == original_len:
+            return False
+        self._changed()
+        return True
+
+    def get_positions(self, key: str) -> dict[str, dict]:
+        return dict(self._portfolio(key)["positions"])
+
+    def get_position(self, key: str, ticker: str) -> dict | None:
+        return self._portfolio(key)["positions"].get(ticker)
+
+    def upsert_position(self, key: str, position: dict) -> None:
+        self._portfolio(key)["positions"][position["ticker"]] = position
+        self._changed()
+
+    def delete_position(self, key: str, ticker: str) -> None:
+        self._portfolio(key)["positions"].pop(ticker, None)
+        self._changed()
+
+    def get_transactions(self, key: str, ticker: str | None = None) -> list[dict]:
+        return [t for t in self._portfolio(key)["transactions"] if ticker is None or t["ticker"] == ticker]
+
+    def append_transactions(self, key: str, transactions: list[dict]) -> None:
+        self._portfolio(key)["transactions"].extend(transactions)
+        self._changed()
+
+    def delete_transactions(self, key: str, ticker: str) -> None:
+        portfolio = self._portfolio(key)
+        portfolio["transactions"] = [t for t in portfolio["transactions"] if t["ticker"] != ticker]
+        self._changed()
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS portfolios (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    cost_method TEXT NOT NULL DEFAULT 'fifo'
+);
+CREATE TABLE IF NOT EXISTS assets (
+    portfolio TEXT NOT NULL REFERENCES portfolios(key) ON DELETE CASCADE ON UPDATE CASCADE,
+    ticker TEXT NOT NULL,
+    type TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    cost_basis REAL NOT NULL,
+    added_at TEXT NOT NULL,
+    UNIQUE (portfolio, ticker)
+);
+CREATE TABLE IF NOT EXISTS positions (
+    portfolio TEXT NOT NULL REFERENCES portfolios(key) ON DELETE CASCADE ON UPDATE CASCADE,
+    ticker TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (portfolio, ticker)
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    portfolio TEXT NOT NULL REFERENCES portfolios(key) ON DELETE CASCADE ON UPDATE CASCADE,
+    ticker TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    price REAL NOT NULL,
+    date TEXT NOT NULL,
+    fee REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_ticker ON transactions (portfolio, ticker, id);
+"""
+
+TRANSACTION_COLUMNS = ("ticker", "kind", "quantity", "price", "date", "fee")
+ASSET_COLUMNS = ("ticker", "type", "quantity", "cost_basis", "added_at")
+
+
+class SqliteBackend(StorageBackend):
+    """
+    SQLite storage: indexed tables, row-level upserts and WAL journaling so
+    readers never block on a writer. Each store operation is one
+    `BEGIN IMMEDIATE` transaction, so concurrent writers serialize instead of
+    overwriting each other. An existing JSON file is imported on first use.
+    """
+
+    def __init__(self, path: Path, legacy_json: Path | None = None):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SQLITE_SCHEMA)
+        self._depth = 0
+        if legacy_json is not None and legacy_json.exists():
+            self._migrate(legacy_json)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def transaction(self):
+        if self._depth:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._depth = 1
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        else:
+            self._conn.execute("COMMIT")
+        finally:
+            self._depth = 0
+
+    def _migrate(self, legacy_json: Path) -> None:
+        """
+        Import portfolios.json once, then rename it to *.migrated. A database
+        that already has portfolios (e.g. migrated by another process) keeps
+        them; the legacy file is still renamed so it isn't re-read on every open.
+        """
+        source = JsonBackend(legacy_json)
+        with self.transaction():
+            if not self._conn.execute("SELECT 1 FROM portfolios LIMIT 1").fetchone():
+                for header in source.list_portfolios():
+                    key = header["key"]
+                    self.insert_portfolio(header)
+                    for asset in source.get_assets(key):
+                        self.upsert_asset(key, asset)
+                    for position in source.get_positions(key).values():
+                        self.upsert_position(key, position)
+                    self.append_transactions(key, source.get_transactions(key))
+        legacy_json.replace(legacy_json.with_name(legacy_json.name + ".migrated"))
+
+    def list_portfolios(self) -> list[dict]:
+        rows = self._conn.execute(
+            "SELECT key, name, created_at, updated_at, cost_method FROM portfolios ORDER BY rowid"
+        )
+        return [dict(row) for row in rows]
+
+    def find_portfolio(self, name: str) -> dict | None:
+        row = self._conn.execute(
+            "SELECT key, name, created_at, updated_at, cost_method FROM portfolios "
+            "WHERE key = ? OR name_lower = ? ORDER BY key = ? DESC LIMIT 1",
+            (_portfolio_key(name), name.lower(), _portfolio_key(name)),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def insert_portfolio(self, header: dict) -> None:
+        self._conn.execute(
+            "INSERT INTO portfolios (key, name, name_lower, created_at, updated_at, cost_method) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (header["key"], header["name"], header["name"].lower(), header["created_at"],
+             header["updated_at"], header.get("cost_method", "fifo")),
+        )
+
+    def update_portfolio(self, key: str, **fields) -> None:
+        if "new_key" in fields:
+            fields["key"] = fields.pop("new_key")
+        if "name" in fields:
+            fields["name_lower"] = fields["name"].lower()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        self._conn.execute(f"UPDATE portfolios SET {assignments} WHERE key = ?", (*fields.values(), key))
+
+    def delete_portfolio(self, key: str) -> None:
+        self._conn.execute("DELETE FROM portfolios WHERE key = ?", (key,))
+
+    def get_assets(self, key: str) -> list[dict]:
+        rows = self._conn.execute(
+            f"SELECT {', '.join(ASSET_COLUMNS)} FROM assets WHERE portfolio = ? ORDER BY rowid", (key,)
+        )
+        return [dict(row) for row in rows]
+
+    def get_asset(self, key: str, ticker: str) -> dict | None:
+        row = self._conn.execute(
+            f"SELECT {', '.join(ASSET_COLUMNS)} FROM assets WHERE portfolio = ? AND ticker = ?", (key, ticker)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def upsert_asset(self, key: str, asset: dict) -> None:
+        self._conn.execute(
+            "INSERT INTO assets (portfolio, ticker, type, quantity, cost_basis, added_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (portfolio, ticker) DO UPDATE SET "
+            "type = excluded.type, quantity = excluded.quantity, cost_basis = excluded.cost_basis",
+            (key, *(asset[column] for column in ASSET_COLUMNS)),
+        )
+
+    def delete_asset(self, key: str, ticker: str) -> bool:
+        cursor = self._conn.execute("DELETE FROM assets WHERE portfolio = ? AND ticker = ?", (key, ticker))
+        return cursor.rowcount > 0
+
+    def get_positions(self, key: str) -> dict[str, dict]:
+        rows = self._conn.execute("SELECT ticker, data FROM positions WHERE portfolio = ?", (key,))
+        return {row["ticker"]: json.loads(row["data"]) for row in rows}
+
+    def get_position(self, key: str, ticker: str) -> dict | None:
+        row = self._conn.execute(
+            "SELECT data FROM positions WHERE portfolio = ? AND ticker = ?", (key, ticker)
+        ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def upsert_position(self, key: str, position: dict) -> None:
+        self._conn.execute(
+            "INSERT INTO positions (portfolio, ticker, data) VALUES (?, ?, ?) "
+            "ON CONFLICT (portfolio, ticker) DO UPDATE SET data = excluded.data",
+            (key, position["ticker"], json.dumps(position)),
+        )
+
+    def delete_position(self, key: str, ticker: str) -> None:
+        self._conn.execute("DELETE FROM positions WHERE portfolio = ? AND ticker = ?", (key, ticker))
+
+    def get_transactions(self, key: str, ticker: str | None = None) -> list[dict]:
+        query = f"SELECT {', '.join(TRANSACTION_COLUMNS)} FROM transactions WHERE portfolio = ?"
+        params: tuple = (key,)
+        if ticker is not None:
+            query += " AND ticker = ?"
+            params += (ticker,)
+        return [dict(row) for row in self._conn.execute(query + " ORDER BY id", params)]
+
+    def append_transactions(self, key: str, transactions: list[dict]) -> None:
+        self._conn.executemany(
+            f"INSERT INTO transactions (portfolio, {', '.join(TRANSACTION_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(key, *(t.get(column, 0.0) for column in TRANSACTION_COLUMNS)) for t in transactions],
+        )
+
+    def delete_transactions(self, key: str, ticker: str) -> None:
+        self._conn.execute("DELETE FROM transactions WHERE portfolio = ? AND ticker = ?", (key, ticker))
+
+
+def open_backend(path: Path) -> StorageBackend:
+    """JSON for *.json paths, otherwise SQLite (importing portfolios.json next to it)."""
+    if path.suffix == ".json":
+        return JsonBackend(path)
+    return SqliteBackend(path, legacy_json=path.with_name("portfolios.json"))
+
+
+# ============================================================================
+# Portfolio store
+# ============================================================================
+
+class PortfolioStore:
+    """Manages portfolios on a storage backend (SQLite by default)."""
+
+    def __init__(self, path: Path | None = None, backend: StorageBackend | None = None):
+        self.path = path or get_storage_path()
+        self.backend = backend or open_backend(self.path)
+
+    def _get_portfolio_key(self, name: str) -> str:
+        """Convert portfolio name to storage key."""
+        return _portfolio_key(name)
+
+    def list_portfolios(self) -> list[str]:
+        """List all portfolio names."""
+        return [p["name"] for p in self.backend.list_portfolios()]
+
+    def get_portfolio(self, name: str) -> Portfolio | None:
+        """Get a portfolio by name."""
+        header = self.backend.find_portfolio(name)
+        if header is None:
+            return None
+
+        key = header["key"]
+        assets = [Asset(**a) for a in self.backend.get_assets(key)]
+        positions = {t: Position.from_dict(pos) for t, pos in self.backend.get_positions(key).items()}
+        for asset in assets:
+            # Portfolios saved before the ledger: one lot per asset
+            if asset.ticker not in positions:
+                positions[asset.ticker] = _opening_position(asset)
         return Portfolio(
-            name=p["name"],
-            created_at=p["created_at"],
-            updated_at=p["updated_at"],
+            name=header["name"],
+            created_at=header["created_at"],
+            updated_at=header["updated_at"],
             assets=assets,
+            cost_method=header["cost_method"],
+            positions=positions,
         )
 
-    def create_portfolio(self, name: str) -> Portfolio:
+    def create_portfolio(self, name: str, cost_method: CostMethod = "fifo") -> Portfolio:
         """Create a new portfolio."""
-        data = self._load()
-        key = self._get_portfolio_key(name)
-
-        if key in data["portfolios"]:
-            raise ValueError(f"Portfolio '{name}' already exists")
+        if cost_method not in COST_METHODS:
+            raise ValueError(f"Unknown cost method '{cost_method}' (use {', '.join(COST_METHODS)})")
 
+        key = self._get_portfolio_key(name)
         now = datetime.now().isoformat()
-        portfolio = {
-            "name": name,
-            "created_at": now,
-            "updated_at": now,
-            "assets": [],
-        }
-        data["portfolios"][key] = portfolio
-        self._save()
-
-        return Portfolio(name=name, created_at=now, updated_at=now, assets=[])
+        with self.backend.transaction():
+            if self.backend.find_portfolio(name) is not None:
+                raise ValueError(f"Portfolio '{name}' already exists")
+            self.backend.insert_portfolio({
+                "key": key,
+                "name": name,
+                "created_at": now,
+                "updated_at": now,
+                "cost_method": cost_method,
+            })
+
+        return Portfolio(name=name, created_at=now, updated_at=now, assets=[], cost_method=cost_method)
 
     def delete_portfolio(self, name: str) -> bool:
         """Delete a portfolio."""
-        data = self._load()
-        key = self._get_portfolio_key(name)
-
-        # Try case-insensitive match
-        if key not in data["portfolios"]:
-            for k, v in data["portfolios"].items():
-                if v["name"].lower() == name.lower():
-                    key = k
-                    break
-            else:
+        with self.backend.transaction():
+            header = self.backend.find_portfolio(name)
+            if header is None:
                 return False
-
-        del data["portfolios"][key]
-        self._save()
+            self.backend.delete_portfolio(header["key"])
         return True
 
     def rename_portfolio(self, old_name: str, new_name: str) -> bool:
         """Rename a portfolio."""
-        data = self._load()
-        old_key = self._get_portfolio_key(old_name)
         new_key = self._get_portfolio_key(new_name)
-
-        # Find old portfolio
-        if old_key not in data["portfolios"]:
-            for k, v in data["portfolios"].items():
-                if v["name"].lower() == old_name.lower():
-                    old_key = k
-                    break
-            else:
+        with self.backend.transaction():
+            header = self.backend.find_portfolio(old_name)
+            if header is None:
                 return False
 
-        if new_key in data["portfolios"] and new_key != old_key:
-            raise ValueError(f"Portfolio '{new_name}' already exists")
+            existing = self.backend.find_portfolio(new_name)
+            if existing is not None and existing["key"] != header["key"]:
+                raise ValueError(f"Portfolio '{new_name}' already exists")
 
-        portfolio = data["portfolios"].pop(old_key)
-        portfolio["name"] = new_name
-        portfolio["updated_at"] = datetime.now().isoformat()
-        data["portfolios"][new_key] = portfolio
-        self._save()
+            self.backend.update_portfolio(
+                header["key"], new_key=new_key, name=new_name, updated_at=datetime.now().isoformat()
+            )
         return True
 
     def add_asset(
@@ -233,49 +790,22 @@ class PortfolioStore:
         cost_basis: float,
     ) -> Asset:
         """Add an asset to a portfolio."""
-        data = self._load()
-        key = self._get_portfolio_key(portfolio_name)
-
-        # Find portfolio
-        if key not in data["portfolios"]:
-            for k, v in data["portfolios"].items():
-                if v["name"].lower() == portfolio_name.lower():
-                    key = k
-                    break
-            else:
-                raise ValueError(f"Portfolio '{portfolio_name}' not found")
-
-        portfolio = data["portfolios"][key]
         ticker = ticker.upper()
+        header = self.backend.find_portfolio(portfolio_name)
+        if header is None:
+            raise ValueError(f"Portfolio '{portfolio_name}' not found")
+        if self.backend.get_asset(header["key"], ticker) is not None:
+            raise ValueError(f"Asset '{ticker}' already in portfolio. Use 'update' to modify.")
 
-        # Check if asset already exists
-        for asset in portfolio["assets"]:
-            if asset["ticker"] == ticker:
-                raise ValueError(f"Asset '{ticker}' already in portfolio. Use 'update' to modify.")
-
-        # Validate ticker
-        asset_type = detect_asset_type(ticker)
-        try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            if "regularMarketPrice" not in info:
-                raise ValueError(f"Invalid ticker: {ticker}")
-        except Exception as e:
-            raise ValueError(f"Could not validate ticker '{ticker}': {e}")
+        _validate_ticker(ticker)
 
-        now = datetime.now().isoformat()
-        asset = {
-            "ticker": ticker,
-            "type": asset_type,
-            "quantity": quantity,
-            "cost_basis": cost_basis,
-            "added_at": now,
-        }
-        portfolio["assets"].append(asset)
-        portfolio["updated_at"] = now
-        self._save()
+        with self.backend.transaction():
+            header = self._find_portfolio(portfolio_name)
+            if self.backend.get_asset(header["key"], ticker) is not None:
+                raise ValueError(f"Asset '{ticker}' already in portfolio. Use 'update' to modify.")
+            self._record(header, Transaction(ticker, "buy", quantity, cost_basis, _today()))
 
-        return Asset(**asset)
+        return Asset(**self.backend.get_asset(header["key"], ticker))
 
     def update_asset(
         self,
@@ -285,64 +815,384 @@ class PortfolioStore:
         cost_basis: float | None = None,
     ) -> Asset | None:
         """Update an asset in a portfolio."""
-        data = self._load()
-        key = self._get_portfolio_key(portfolio_name)
-
-        # Find portfolio
-        if key not in data["portfolios"]:
-            for k, v in data["portfolios"].items():
-                if v["name"].lower() == portfolio_name.lower():
-                    key = k
-                    break
-            else:
+        ticker = ticker.upper()
+        with self.backend.transaction():
+            header = self.backend.find_portfolio(portfolio_name)
+            if header is None:
+                return None
+            asset = self.backend.get_asset(header["key"], ticker)
+            if asset is None:
                 return None
 
-        portfolio = data["portfolios"][key]
-        ticker = ticker.upper()
+            self._ensure_ledger(header["key"])
+            txn = Transaction(
+                ticker,
+                "adjust",
+                asset["quantity"] if quantity is None else quantity,
+                asset["cost_basis"] if cost_basis is None else cost_basis,
+                _today(),
+            )
+            self._record(header, txn)
+            updated = self.backend.get_asset(header["key"], ticker)
 
-        for asset in portfolio["assets"]:
-            if asset["ticker"] == ticker:
-                if quantity is not None:
-                    asset["quantity"] = quantity
-                if cost_basis is not None:
-                    asset["cost_basis"] = cost_basis
-                portfolio["updated_at"] = datetime.now().isoformat()
-                self._save()
-                return Asset(**asset)
+        return Asset(**(updated or {**asset, "quantity": 0.0}))
 
-        return None
+    def remove_asset(self, portfolio_name: str, ticker: str, purge: bool = False) -> bool:
+        """
+        Remove an asset from a portfolio. The ledger keeps its history (the
+        position is closed with an adjustment) unless `purge` erases it.
+        """
+        ticker = ticker.upper()
+        with self.backend.transaction():
+            header = self.backend.find_portfolio(portfolio_name)
+            if header is None:
+                return False
 
-    def remove_asset(self, portfolio_name: str, ticker: str) -> bool:
-        """Remove an asset from a portfolio."""
-        data = self._load()
-        key = self._get_portfolio_key(portfolio_name)
+            key = header["key"]
+            asset = self.backend.get_asset(key, ticker)
+            if asset is None:
+                return False
 
-        # Find portfolio
-        if key not in data["portfolios"]:
-            for k, v in data["portfolios"].items():
-                if v["name"].lower() == portfolio_name.lower():
-                    key = k
-                    break
+            if purge:
+                self.backend.delete_asset(key, ticker)
+                self.backend.delete_position(key, ticker)
+                self.backend.delete_transactions(key, ticker)
+                self.backend.update_portfolio(key, updated_at=datetime.now().isoformat())
             else:
-                return False
+                self._ensure_ledger(key)
+                self._record(header, Transaction(ticker, "adjust", 0.0, asset["cost_basis"], _today()))
+        return True
 
-        portfolio = data["portfolios"][key]
+    def get_default_portfolio_name(self) -> str | None:
+        """Get the default (first) portfolio name, or None if empty."""
+        portfolios = self.list_portfolios()
+        return portfolios[0] if portfolios else None
+
+    # ------------------------------------------------------------------
+    # Ledger
+    # ------------------------------------------------------------------
+
+    def _find_portfolio(self, name: str) -> dict:
+        """Portfolio header by name, with ledger rows for every asset."""
+        header = self.backend.find_portfolio(name)
+        if header is None:
+            raise ValueError(f"Portfolio '{name}' not found")
+        self._ensure_ledger(header["key"])
+        return header
+
+    def _ensure_ledger(self, key: str) -> None:
+        """Give assets stored before the ledger an opening buy."""
+        positions = self.backend.get_positions(key)
+        for asset in self.backend.get_assets(key):
+            if asset["ticker"] not in positions:
+                opening = _opening_position(Asset(**asset))
+                self.backend.append_transactions(key, [asdict(Transaction(
+                    asset["ticker"], "buy", asset["quantity"], asset["cost_basis"], opening.last_date
+                ))])
+                self.backend.upsert_position(key, asdict(opening))
+
+    def _record(self, header: dict, txn: Transaction) -> Position:
+        """
+        Append `txn` and update only its ticker's position. A back-dated
+        transaction replays that ticker's history; nothing changes on error.
+        """
+        key, method = header["key"], header["cost_method"]
+        stored = self.backend.get_position(key, txn.ticker)
+        position = Position.from_dict(stored) if stored else Position(ticker=txn.ticker)
+
+        if txn.date < position.last_date:
+            history = [Transaction(**t) for t in self.backend.get_transactions(key, txn.ticker)]
+            position = replay_transactions(txn.ticker, history + [txn], method)
+        else:
+            position = apply_transaction(position, txn, method)
+
+        self.backend.append_transactions(key, [asdict(txn)])
+        self.backend.upsert_position(key, asdict(position))
+        self._sync_asset(key, position)
+        self.backend.update_portfolio(key, updated_at=datetime.now().isoformat())
+        return position
+
+    def _sync_asset(self, key: str, position: Position) -> None:
+        """Mirror a position into the assets table (open positions only)."""
+        if position.quantity <= QUANTITY_EPSILON:
+            self.backend.delete_asset(key, position.ticker)
+            return
+        self.backend.upsert_asset(key, {
+            "ticker": position.ticker,
+            "type": detect_asset_type(position.ticker),
+            "quantity": position.quantity,
+            "cost_basis": position.cost_basis,
+            "added_at": datetime.now().isoformat(),  # Kept from the existing row on update
+        })
+
+    def record_transaction(
+        self,
+        portfolio_name: str,
+        ticker: str,
+        kind: TransactionKind,
+        quantity: float,
+        price: float = 0.0,
+        date: str | None = None,
+        fee: float = 0.0,
+    ) -> Position:
+        """
+        Record a buy, sell, split (quantity = ratio) or dividend (quantity =
+        units the dividend was paid on, price = amount per share) and return
+        the new position.
+        """
         ticker = ticker.upper()
+        date = date or _today()
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError(f"Invalid date '{date}' (use YYYY-MM-DD)")
+        if kind not in ("buy", "sell", "split", "dividend"):
+            raise ValueError(f"Unknown transaction kind: {kind}")
+
+        header = self.backend.find_portfolio(portfolio_name)
+        if header is None:
+            raise ValueError(f"Portfolio '{portfolio_name}' not found")
+        held = (self.backend.get_position(header["key"], ticker) is not None
+                or self.backend.get_asset(header["key"], ticker) is not None)
+        if kind != "buy" and not held:
+            raise ValueError(f"Asset '{ticker}' not in portfolio '{portfolio_name}'")
+        if kind == "buy" and not held:
+            _validate_ticker(ticker)
+
+        with self.backend.transaction():
+            header = self._find_portfolio(portfolio_name)
+            return self._record(header, Transaction(ticker, kind, quantity, price, date, fee))
+
+    def get_transactions(self, portfolio_name: str, ticker: str | None = None) -> list[Transaction]:
+        """Ledger entries in the order they were recorded."""
+        with self.backend.transaction():
+            header = self._find_portfolio(portfolio_name)
+            rows = self.backend.get_transactions(header["key"], ticker.upper() if ticker else None)
+        return [Transaction(**t) for t in rows]
+
+    def set_cost_method(self, portfolio_name: str, method: CostMethod) -> None:
+        """Switch lot accounting and rebuild every position from the ledger."""
+        if method not in COST_METHODS:
+            raise ValueError(f"Unknown cost method '{method}' (use {', '.join(COST_METHODS)})")
+
+        with self.backend.transaction():
+            header = self._find_portfolio(portfolio_name)
+            key = header["key"]
+
+            by_ticker: dict[str, list[Transaction]] = {}
+            for t in self.backend.get_transactions(key):
+                by_ticker.setdefault(t["ticker"], []).append(Transaction(**t))
+
+            for ticker, txns in by_ticker.items():
+                position = replay_transactions(ticker, txns, method)
+                self.backend.upsert_position(key, asdict(position))
+                self._sync_asset(key, position)
+            self.backend.update_portfolio(key, cost_method=method, updated_at=datetime.now().isoformat())
+
+    def import_transactions(
+        self,
+        portfolio_name: str,
+        transactions: list[Transaction],
+    ) -> list[tuple[Transaction, str]]:
+        """
+        Record many transactions in one backend transaction, in date order.
+        Rows the ledger refuses (e.g. selling more than held) are skipped and
+        returned as (transaction, reason); everything else is committed together.
+        """
+        rejected = []
+        with self.backend.transaction():
+            header = self._find_portfolio(portfolio_name)
+            for txn in sorted(transactions, key=lambda t: t.date):
+                try:
+                    self._record(header, txn)
+                except ValueError as e:
+                    rejected.append((txn, str(e)))
+        return rejected
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def _opening_position(asset: Asset) -> Position:
+    """Single-lot position for an asset stored without ledger history."""
+    date = asset.added_at[:10]
+    lots = [Lot(asset.quantity, asset.cost_basis, date)] if asset.quantity > 0 else []
+    return Position(
+        ticker=asset.ticker,
+        quantity=asset.quantity,
+        cost=asset.quantity * asset.cost_basis,
+        last_date=date,
+        lots=lots,
+    )
+
+
+def _validate_ticker(ticker: str) -> None:
+    """Raise ValueError unless Yahoo Finance has a price for `ticker`."""
+    try:
+        stock = yf.Ticker(ticker)
+        info = stock.info
+        if "regularMarketPrice" not in info:
+            raise ValueError(f"Invalid ticker: {ticker}")
+    except Exception as e:
+        raise ValueError(f"Could not validate ticker '{ticker}': {e}")
+
+
+# ============================================================================
+# Bulk import
+# ============================================================================
+
+# Header aliases (lower-cased) for our own CSVs and common broker exports
+IMPORT_COLUMNS = {
+    "ticker": ("ticker", "symbol", "instrument", "security symbol"),
+    "quantity": ("quantity", "qty", "shares", "units"),
+    "price": ("price", "cost_basis", "cost", "average cost", "average cost basis", "avg cost",
+              "cost per share", "cost/share", "unit cost", "price paid"),
+    "cost_total": ("cost basis", "cost basis total", "total cost", "total cost basis"),
+    "amount": ("amount", "amount ($)", "net amount"),
+    "date": ("date", "trade date", "run date", "activity date", "acquired", "date acquired"),
+    "action": ("action", "side", "trans code", "transaction type", "activity"),
+    "fee": ("fee", "fees", "commission", "fees & comm", "commission ($)", "fees ($)"),
+}
+TICKER_PATTERN = re.compile(r"^[A-Z0-9][A-Z0-9.\-^=]{0,14}$")
 
-        original_len = len(portfolio["assets"])
-        portfolio["assets"] = [a for a in portfolio["assets"] if a["ticker"] != ticker]
 
-        if len(portfolio["assets"]) < original_len:
-            portfolio["updated_at"] = datetime.now().isoformat()
-            self._save()
-            return True
+@dataclass
+class ImportReject:
+    line: int
+    ticker: str
+    reason: str
 
-        return False
 
-    def get_default_portfolio_name(self) -> str | None:
-        """Get the default (first) portfolio name, or None if empty."""
-        portfolios = self.list_portfolios()
-        return portfolios[0] if portfolios else None
+def _parse_number(value: str | None) -> float | None:
+    """Parse broker number formats: "$1,234.50", "(12.00)", "-3", "" -> None."""
+    if value is None:
+        return None
+    text = value.strip().replace("$", "").replace(",", "")
+    if not text or text in ("--", "n/a", "N/A"):
+        return None
+    negative = text.startswith("(") and text.endswith(")")
+    number = float(text.strip("()"))
+    return -number if negative else number
+
+
+def _parse_date(value: str | None) -> str | None:
+    """Normalize YYYY-MM-DD, MM/DD/YYYY or MM/DD/YY to YYYY-MM-DD."""
+    if not value or not value.strip():
+        return None
+    text = value.strip().split(" ")[0]
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y"):
+        try:
+            return datetime.strptime(text, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognized date '{value.strip()}'")
+
+
+def _parse_action(value: str | None) -> TransactionKind | None:
+    """Map a broker action ("YOU BOUGHT", "Sell", "CDIV", ...) to a transaction kind."""
+    if value is None or not value.strip():
+        return "buy"
+    text = value.strip().lower()
+    if "split" in text:
+        return "split"
+    if "div" in text:
+        return "dividend"
+    if "sell" in text or "sold" in text:
+        return "sell"
+    if "buy" in text or "bought" in text or text in ("b", "reinvest"):
+        return "buy"
+    if text == "s":
+        return "sell"
+    return None
+
+
+def read_import_rows(lines, default_date: str | None = None) -> tuple[list[tuple[int, Transaction]], list[ImportReject]]:
+    """
+    Stream CSV lines (a file or positions/activity export) into transactions.
+
+    Preamble lines before the header row are skipped. Position rows become
+    buys; rows with an action column become buys, sells, splits (quantity =
+    ratio) or dividends (quantity 1, price = total when only an amount is given).
+    Returns (line number, transaction) pairs and rejected rows.
+    """
+    rows = iter(csv.reader(lines))
+    line_number = 0
+    columns = {}
+    for header in rows:
+        line_number += 1
+        names = [name.strip().lower() for name in header]
+        if any(name in IMPORT_COLUMNS["ticker"] for name in names):
+            for field_name, aliases in IMPORT_COLUMNS.items():
+                for alias in aliases:
+                    if alias in names:
+                        columns[field_name] = names.index(alias)
+                        break
+            break
+    if "ticker" not in columns:
+        raise ValueError("No header row with a ticker/symbol column found")
+
+    default_date = default_date or _today()
+    transactions, rejects = [], []
+    for row in rows:
+        line_number += 1
+
+        def get(field_name):
+            index = columns.get(field_name)
+            return row[index] if index is not None and index < len(row) else None
+
+        raw_ticker = (get("ticker") or "").strip()
+        if not raw_ticker:
+            continue  # Blank or spacer row
+        ticker = raw_ticker.upper().rstrip("*")
+        try:
+            if not TICKER_PATTERN.match(ticker):
+                raise ValueError("not a ticker symbol")
+            kind = _parse_action(get("action"))
+            if kind is None:
+                raise ValueError(f"unsupported action '{get('action').strip()}'")
+
+            quantity = _parse_number(get("quantity"))
+            price = _parse_number(get("price"))
+            amount = _parse_number(get("amount"))
+            cost_total = _parse_number(get("cost_total"))
+            fee = abs(_parse_number(get("fee")) or 0.0)
+            date = _parse_date(get("date")) or default_date
+
+            if kind == "dividend":
+                if quantity and price is not None:
+                    quantity, price = abs(quantity), abs(price)
+                elif amount is not None:
+                    quantity, price = 1.0, abs(amount)
+                else:
+                    raise ValueError("dividend needs an amount or quantity and price")
+            else:
+                if not quantity:
+                    raise ValueError("missing quantity")
+                quantity = abs(quantity)
+                if kind == "split":
+                    price = 0.0
+                elif price is None and cost_total is not None:
+                    price = abs(cost_total) / quantity
+                elif price is None and amount is not None:
+                    price = max(abs(amount) - fee, 0.0) / quantity if kind == "buy" else (abs(amount) + fee) / quantity
+                if price is None:
+                    raise ValueError("missing price/cost")
+                price = abs(price)
+        except ValueError as e:
+            rejects.append(ImportReject(line_number, raw_ticker, str(e)))
+            continue
+
+        transactions.append((line_number, Transaction(ticker, kind, quantity, price, date, fee)))
+
+    return transactions, rejects
+
+
+def validate_tickers(tickers: list[str]) -> set[str]:
+    """Tickers with recent prices, checked with batched yf.download calls."""
+    quotes = fetch_quotes(tickers)
+    _save_quotes(quotes)
+    return set(quotes)
 
 
 def format_currency(value: float) -> str:
@@ -355,8 +1205,8 @@ def format_currency(value: float) -> str:
         return f"${value:.2f}"
 
 
-def show_portfolio(portfolio: Portfolio, verbose: bool = False) -> None:
-    """Display portfolio details with current prices."""
+def show_portfolio(portfolio: Portfolio, verbose: bool = False, quotes: dict[str, Quote] | None = None) -> None:
+    """Display portfolio details with current prices (one batch quote fetch if `quotes` is None)."""
     print(f"\n{'='*60}")
     print(f"PORTFOLIO: {portfolio.name}")
     print(f"Created: {portfolio.created_at[:10]} | Updated: {portfolio.updated_at[:10]}")
@@ -366,6 +1216,9 @@ def show_portfolio(portfolio: Portfolio, verbose: bool = False) -> None:
         print("  No assets in portfolio. Use 'add' to add assets.\n")
         return
 
+    if quotes is None:
+        quotes = get_quotes([asset.ticker for asset in portfolio.assets])
+
     total_cost = 0.0
     total_value = 0.0
 
@@ -373,11 +1226,8 @@ def show_portfolio(portfolio: Portfolio, verbose: bool = False) -> None:
     print("-" * 82)
 
     for asset in portfolio.assets:
-        try:
-            stock = yf.Ticker(asset.ticker)
-            current_price = stock.info.get("regularMarketPrice", 0) or 0
-        except Exception:
-            current_price = 0
+        quote = quotes.get(asset.ticker)
+        current_price = quote.price if quote else 0
 
         cost_total = asset.quantity * asset.cost_basis
         current_value = asset.quantity * current_price
@@ -398,9 +1248,101 @@ def show_portfolio(portfolio: Portfolio, verbose: bool = False) -> None:
     total_pnl_pct = (total_pnl / total_cost * 100) if total_cost > 0 else 0
     print(f"{'TOTAL':<12} {'':<8} {'':<10} {format_currency(total_cost):>12} {'':<12} "
           f"{format_currency(total_value):>14} {'+' if total_pnl >= 0 else ''}{format_currency(total_pnl)} ({total_pnl_pct:+.1f}%)")
+
+    # Realized P&L and dividends are running totals kept per position
+    realized = sum(p.realized_pnl for p in portfolio.positions.values())
+    dividends = sum(p.dividends for p in portfolio.positions.values())
+    if realized or dividends:
+        print(f"\nRealized P&L: {'+' if realized >= 0 else ''}{format_currency(realized)} | "
+              f"Dividends: {format_currency(dividends)} | Lots: {portfolio.cost_method.upper()}")
     print()
 
 
+def watch_portfolio(portfolio: Portfolio, interval: float) -> None:
+    """Redraw the portfolio table every `interval` seconds, refetching only quotes."""
+    tickers = [asset.ticker for asset in portfolio.assets]
+    redraw = sys.stdout.isatty()
+    try:
+        while True:
+            quotes = get_quotes(tickers, max_age=interval)
+            if redraw:
+                print("\033[H\033[J", end="")  # Cursor home + clear screen
+            show_portfolio(portfolio, quotes=quotes)
+            print(f"Updated {datetime.now():%H:%M:%S} - refreshing every {interval:g}s (Ctrl+C to stop)")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print()
+
+
+def show_transactions(transactions: list[Transaction]) -> None:
+    """Display ledger entries."""
+    if not transactions:
+        print("No transactions recorded.")
+        return
+
+    print(f"\n{'Date':<12} {'Ticker':<12} {'Type':<9} {'Qty':>12} {'Price':>12} {'Fee':>8}")
+    print("-" * 70)
+    for t in transactions:
+        quantity = f"{t.quantity:g}:1" if t.kind == "split" else f"{t.quantity:.4f}"
+        price = "" if t.kind == "split" else format_currency(t.price)
+        print(f"{t.date:<12} {t.ticker:<12} {t.kind:<9} {quantity:>12} {price:>12} {format_currency(t.fee) if t.fee else '':>8}")
+    print()
+
+
+def import_file(
+    store: PortfolioStore,
+    portfolio_name: str,
+    path: str,
+    default_date: str | None = None,
+    validate: bool = True,
+    dry_run: bool = False,
+    rejects_path: str | None = None,
+) -> tuple[int, list[ImportReject]]:
+    """Parse, validate and import a CSV; prints a summary. Returns (imported, rejects)."""
+    if default_date:
+        default_date = _parse_date(default_date)
+
+    if path == "-":
+        transactions, rejects = read_import_rows(sys.stdin, default_date)
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            transactions, rejects = read_import_rows(f, default_date)
+
+    if validate and transactions:
+        tickers = sorted({txn.ticker for _, txn in transactions})
+        print(f"Validating {len(tickers)} tickers...", file=sys.stderr)
+        valid = validate_tickers(tickers)
+        rejects += [
+            ImportReject(line, txn.ticker, "no price data on Yahoo Finance")
+            for line, txn in transactions if txn.ticker not in valid
+        ]
+        transactions = [(line, txn) for line, txn in transactions if txn.ticker in valid]
+
+    imported = len(transactions)
+    if not dry_run and transactions:
+        lines = {id(txn): line for line, txn in transactions}
+        refused = store.import_transactions(portfolio_name, [txn for _, txn in transactions])
+        rejects += [ImportReject(lines[id(txn)], txn.ticker, reason) for txn, reason in refused]
+        imported -= len(refused)
+
+    rejects.sort(key=lambda r: r.line)
+    verb = "Would import" if dry_run else "Imported"
+    print(f"{verb} {imported} rows into {portfolio_name}; {len(rejects)} rejected")
+    for reject in rejects[:20]:
+        print(f"  line {reject.line}: {reject.ticker} - {reject.reason}")
+    if len(rejects) > 20:
+        print(f"  ... and {len(rejects) - 20} more")
+
+    if rejects_path and rejects:
+        with open(rejects_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["line", "ticker", "reason"])
+            writer.writerows((r.line, r.ticker, r.reason) for r in rejects)
+        print(f"Rejected rows written to {rejects_path}")
+
+    return imported, rejects
+
+
 def main():
     parser = argparse.ArgumentParser(description="Portfolio management for stock-analysis")
     subparsers = parser.add_subparsers(dest="command", help="Commands")
@@ -408,6 +1350,7 @@ def main():
     # create
     create_parser = subparsers.add_parser("create", help="Create a new portfolio")
     create_parser.add_argument("name", help="Portfolio name")
+    create_parser.add_argument("--method", choices=COST_METHODS, default="fifo", help="Lot accounting (default: fifo)")
 
     # list
     subparsers.add_parser("list", help="List all portfolios")
@@ -415,6 +1358,7 @@ def main():
     # show
     show_parser = subparsers.add_parser("show", help="Show portfolio details")
     show_parser.add_argument("--portfolio", "-p", help="Portfolio name (default: first portfolio)")
+    show_parser.add_argument("--watch", type=float, metavar="SECONDS", help="Redraw with fresh quotes every N seconds")
 
     # delete
     delete_parser = subparsers.add_parser("delete", help="Delete a portfolio")
@@ -443,6 +1387,53 @@ def main():
     remove_parser = subparsers.add_parser("remove", help="Remove an asset from portfolio")
     remove_parser.add_argument("ticker", help="Stock/crypto ticker")
     remove_parser.add_argument("--portfolio", "-p", help="Portfolio name (default: first portfolio)")
+    remove_parser.add_argument("--purge", action="store_true",
+                               help="Also erase the ticker's transaction history")
+
+    # buy / sell
+    for command, help_text in (("buy", "Record a purchase"), ("sell", "Record a sale")):
+        trade_parser = subparsers.add_parser(command, help=help_text)
+        trade_parser.add_argument("ticker", help="Stock/crypto ticker")
+        trade_parser.add_argument("--quantity", "-q", type=float, required=True, help="Quantity")
+        trade_parser.add_argument("--price", type=float, required=True, help="Price per unit")
+        trade_parser.add_argument("--fee", type=float, default=0.0, help="Commission/fees")
+        trade_parser.add_argument("--date", help="Trade date YYYY-MM-DD (default: today)")
+        trade_parser.add_argument("--portfolio", "-p", help="Portfolio name (default: first portfolio)")
+
+    # split
+    split_parser = subparsers.add_parser("split", help="Record a stock split")
+    split_parser.add_argument("ticker", help="Stock ticker")
+    split_parser.add_argument("--ratio", type=float, required=True, help="New shares per old share (4 for 4:1, 0.1 for 1:10)")
+    split_parser.add_argument("--date", help="Split date YYYY-MM-DD (default: today)")
+    split_parser.add_argument("--portfolio", "-p", help="Portfolio name (default: first portfolio)")
+
+    # dividend
+    dividend_parser = subparsers.add_parser("dividend", help="Record a dividend payment")
+    dividend_parser.add_argument("ticker", help="Stock ticker")
+    amount_group = dividend_parser.add_mutually_exclusive_group(required=True)
+    amount_group.add_argument("--per-share", type=float, help="Dividend per share")
+    amount_group.add_argument("--amount", type=float, help="Total cash received")
+    dividend_parser.add_argument("--date", help="Payment date YYYY-MM-DD (default: today)")
+    dividend_parser.add_argument("--portfolio", "-p", help="Portfolio name (default: first portfolio)")
+
+    # history
+    history_parser = subparsers.add_parser("history", help="Show transaction history")
+    history_parser.add_argument("ticker", nargs="?", help="Only this ticker")
+    history_parser.add_argument("--portfolio", "-p", help="Portfolio name (default: first portfolio)")
+
+    # import
+    import_parser = subparsers.add_parser("import", help="Import positions or trades from a CSV/broker export")
+    import_parser.add_argument("file", help="CSV file ('-' for stdin)")
+    import_parser.add_argument("--portfolio", "-p", help="Portfolio name (default: first portfolio)")
+    import_parser.add_argument("--date", help="Date for rows without one (default: today)")
+    import_parser.add_argument("--no-validate", action="store_true", help="Skip the Yahoo Finance ticker check")
+    import_parser.add_argument("--dry-run", action="store_true", help="Parse and validate without writing")
+    import_parser.add_argument("--rejects", help="Write rejected rows to this CSV")
+
+    # method
+    method_parser = subparsers.add_parser("method", help="Set lot accounting (recomputes P&L)")
+    method_parser.add_argument("method", choices=COST_METHODS, help="fifo, lifo or average")
+    method_parser.add_argument("--portfolio", "-p", help="Portfolio name (default: first portfolio)")
 
     args = parser.parse_args()
 
@@ -454,8 +1445,8 @@ def main():
 
     try:
         if args.command == "create":
-            portfolio = store.create_portfolio(args.name)
-            print(f"Created portfolio: {portfolio.name}")
+            portfolio = store.create_portfolio(args.name, args.method)
+            print(f"Created portfolio: {portfolio.name} ({portfolio.cost_method.upper()})")
 
         elif args.command == "list":
             portfolios = store.list_portfolios()
@@ -480,7 +1471,10 @@ def main():
                 print(f"Portfolio '{portfolio_name}' not found.")
                 sys.exit(1)
 
-            show_portfolio(portfolio)
+            if args.watch:
+                watch_portfolio(portfolio, max(args.watch, 1.0))
+            else:
+                show_portfolio(portfolio)
 
         elif args.command == "delete":
             if store.delete_portfolio(args.name):
@@ -530,12 +1524,60 @@ def main():
                 print("No portfolios found.")
                 sys.exit(1)
 
-            if store.remove_asset(portfolio_name, args.ticker):
+            if store.remove_asset(portfolio_name, args.ticker, purge=args.purge):
                 print(f"Removed {args.ticker.upper()} from {portfolio_name}")
             else:
                 print(f"Asset '{args.ticker}' not found in portfolio '{portfolio_name}'.")
                 sys.exit(1)
 
+        elif args.command == "import":
+            portfolio_name = args.portfolio or store.get_default_portfolio_name()
+            if not portfolio_name or not store.get_portfolio(portfolio_name):
+                print(f"Portfolio '{portfolio_name or ''}' not found. Use 'create' to create one first.")
+                sys.exit(1)
+            import_file(store, portfolio_name, args.file, args.date, not args.no_validate, args.dry_run, args.rejects)
+
+        elif args.command in ("buy", "sell", "split", "dividend", "history", "method"):
+            portfolio_name = args.portfolio or store.get_default_portfolio_name()
+            if not portfolio_name:
+                print("No portfolios found. Use 'create' to create one first.")
+                sys.exit(1)
+
+            if args.command == "history":
+                show_transactions(store.get_transactions(portfolio_name, args.ticker))
+
+            elif args.command == "method":
+                store.set_cost_method(portfolio_name, args.method)
+                print(f"{portfolio_name} now uses {args.method.upper()} lot accounting")
+
+            elif args.command == "split":
+                position = store.record_transaction(portfolio_name, args.ticker, "split", args.ratio, date=args.date)
+                print(f"Split {position.ticker} {args.ratio:g}:1 -> {position.quantity:g} units "
+                      f"@ {format_currency(position.cost_basis)}")
+
+            elif args.command == "dividend":
+                portfolio = store.get_portfolio(portfolio_name)
+                held = portfolio.positions.get(args.ticker.upper()) if portfolio else None
+                if not held or held.quantity <= 0:
+                    print(f"Asset '{args.ticker}' not held in portfolio '{portfolio_name}'.")
+                    sys.exit(1)
+                per_share = args.per_share if args.per_share is not None else args.amount / held.quantity
+                position = store.record_transaction(
+                    portfolio_name, args.ticker, "dividend", held.quantity, per_share, date=args.date
+                )
+                print(f"Recorded {format_currency(held.quantity * per_share)} dividend for {position.ticker} "
+                      f"(total {format_currency(position.dividends)})")
+
+            else:
+                position = store.record_transaction(
+                    portfolio_name, args.ticker, args.command, args.quantity, args.price,
+                    date=args.date, fee=args.fee,
+                )
+                verb = "Bought" if args.command == "buy" else "Sold"
+                print(f"{verb} {args.quantity:g} {position.ticker} @ {format_currency(args.price)}: "
+                      f"now {position.quantity:g} units @ {format_currency(position.cost_basis)}, "
+                      f"realized {'+' if position.realized_pnl >= 0 else ''}{format_currency(position.realized_pnl)}")
+
     except ValueError as e:
         print(f"Error: {e}")
         sys.exit(1)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Lightweight tracing for the stock-analysis pipeline.
+
+Spans record wall time, bytes fetched and cache hit/miss for each stage
+(fetch_stock_data, analyze_*, sentiment sub-tasks, network calls). Tracing
+is off by default; a disabled span is a shared no-op object, so the
+instrumentation costs one flag check per call.
+
+Usage:
+    from profiling import TRACER, span, traced, timed_fetch
+
+    @traced()
+    def analyze_something(data): ...
+
+    with span("fetch_stock_data", ticker="AAPL") as s:
+        info = timed_fetch("yf.info", lambda: stock.info, ticker="AAPL")
+
+    TRACER.enable()
+    ...
+    print(format_profile_table(TRACER.spans, record_stage_history(TRACER.spans)))
+    write_chrome_trace(TRACER.spans, Path("trace.json"))
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Shared with hot_scanner.py / rumor_scanner.py
+CACHE_DIR = Path(__file__).parent.parent / "cache"
+PROFILE_HISTORY_FILE = CACHE_DIR / "profile_history.json"
+HISTORY_MAX_SAMPLES = 200  # Per stage, oldest samples are dropped
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    start: float  # perf_counter() seconds
+    end: float | None = None
+    parent: str | None = None
+    thread_id: int = 0
+    bytes_fetched: int = 0
+    cache: str | None = None  # "hit", "miss" or None if not cached
+    attrs: dict = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def record_payload(self, payload) -> None:
+        """Add the approximate size of a fetched payload to this span."""
+        self.bytes_fetched += payload_size(payload)
+
+    def mark_cache(self, hit: bool) -> None:
+        self.cache = "hit" if hit else "miss"
+
+
+class _NullSpan:
+    """Stand-in returned while tracing is disabled. Ignores everything."""
+
+    def record_payload(self, payload) -> None:
+        pass
+
+    def mark_cache(self, hit: bool) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Collects spans for one process. Thread- and asyncio-safe."""
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: list[Span] = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.origin = time.perf_counter()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans = []
+        self.origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **attrs):
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+
+        parent = _current_span.get()
+        s = Span(
+            name=name,
+            category=category,
+            start=time.perf_counter(),
+            parent=parent.name if parent else None,
+            thread_id=threading.get_ident(),
+            attrs=attrs,
+        )
+        token = _current_span.set(s)
+        try:
+            yield s
+        finally:
+            s.end = time.perf_counter()
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(s)
+
+
+TRACER = Tracer()
+
+
+def span(name: str, category: str = "stage", **attrs):
+    """Open a span on the global tracer (no-op unless TRACER.enable() was called)."""
+    return TRACER.span(name, category, **attrs)
+
+
+def current_span() -> Span | _NullSpan:
+    """Return the innermost open span, or a no-op span."""
+    if not TRACER.enabled:
+        return _NULL_SPAN
+    return _current_span.get() or _NULL_SPAN
+
+
+def traced(name: str | None = None, category: str = "stage"):
+    """Decorator wrapping a sync or async function in a span."""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, category):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def timed_fetch(name: str, fetch, **attrs):
+    """Run a zero-arg network call inside a "network" span and record its payload size."""
+    with span(name, "network", **attrs) as s:
+        result = fetch()
+        s.record_payload(result)
+        return result
+
+
+def payload_size(payload) -> int:
+    """Approximate size in bytes of a fetched payload (DataFrame, dict, str, ...)."""
+    if payload is None:
+        return 0
+    if isinstance(payload, (bytes, bytearray, str)):
+        return len(payload)
+    memory_usage = getattr(payload, "memory_usage", None)
+    if callable(memory_usage):  # pandas DataFrame / Series
+        try:
+            usage = memory_usage(deep=False)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        except Exception:
+            return 0
+    try:
+        return len(json.dumps(payload, default=str))
+    except Exception:
+        return 0
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def summarize_spans(spans: list[Span]) -> dict[str, dict]:
+    """Aggregate spans by name: count, total/max wall time, bytes, cache hits."""
+    stages: dict[str, dict] = {}
+    for s in spans:
+        stage = stages.setdefault(s.name, {
+            "category": s.category,
+            "count": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "bytes": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+        })
+        duration = s.duration_ms
+        stage["count"] += 1
+        stage["total_ms"] += duration
+        stage["max_ms"] = max(stage["max_ms"], duration)
+        stage["bytes"] += s.bytes_fetched
+        if s.cache == "hit":
+            stage["cache_hits"] += 1
+        elif s.cache == "miss":
+            stage["cache_misses"] += 1
+    return stages
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Linear-interpolated percentile (pct in 0-100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def record_stage_history(spans: list[Span], path: Path | None = None) -> dict[str, dict]:
+    """
+    Append this run's span durations to the on-disk history and return
+    per-stage p50/p95 across all recorded runs.
+    """
+    path = path or PROFILE_HISTORY_FILE
+    history: dict[str, list[float]] = {}
+    if path.exists():
+        try:
+            history = json.loads(path.read_text())
+        except (json.JSONDecodeError, OSError):
+            history = {}
+
+    for s in spans:
+        samples = history.setdefault(s.name, [])
+        samples.append(round(s.duration_ms, 3))
+        if len(samples) > HISTORY_MAX_SAMPLES:
+            del samples[:-HISTORY_MAX_SAMPLES]
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(history))
+    except OSError:
+        pass
+
+    return {
+        name: {
+            "samples": len(samples),
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+        }
+        for name, samples in history.items()
+    }
+
+
+def format_size(num_bytes: int) -> str:
+    if num_bytes >= 1_000_000:
+        return f"{num_bytes / 1_000_000:.1f}MB"
+    if num_bytes >= 1_000:
+        return f"{num_bytes / 1_000:.1f}KB"
+    return f"{num_bytes}B"
+
+
+def format_profile_table(spans: list[Span], history: dict[str, dict] | None = None) -> str:
+    """Render a per-stage timing table, slowest stages first."""
+    stages = summarize_spans(spans)
+    history = history or {}
+
+    lines = [
+        "=" * 100,
+        "PROFILE (wall time per stage)",
+        "=" * 100,
+        f"{'Stage':<34} {'Cat':<9} {'N':>4} {'Total':>10} {'Max':>10} {'Bytes':>9} {'Cache':>7} {'p50':>8} {'p95':>8}",
+        "-" * 100,
+    ]
+
+    for name, stage in sorted(stages.items(), key=lambda kv: kv[1]["total_ms"], reverse=True):
+        cache = ""
+        if stage["cache_hits"] or stage["cache_misses"]:
+            cache = f"{stage['cache_hits']}/{stage['cache_hits'] + stage['cache_misses']}"
+
+        hist = history.get(name, {})
+        p50 = f"{hist['p50_ms']:.0f}ms" if hist.get("p50_ms") is not None else ""
+        p95 = f"{hist['p95_ms']:.0f}ms" if hist.get("p95_ms") is not None else ""
+        flag = ""
+        if hist.get("p95_ms") and hist.get("samples", 0) >= 5 and stage["max_ms"] > hist["p95_ms"]:
+            flag = " ⚠️"
+
+        lines.append(
+            f"{name[:34]:<34} {stage['category'][:9]:<9} {stage['count']:>4} "
+            f"{stage['total_ms']:>8.0f}ms {stage['max_ms']:>8.0f}ms "
+            f"{format_size(stage['bytes']):>9} {cache:>7} {p50:>8} {p95:>8}{flag}"
+        )
+
+    lines.append("-" * 100)
+    lines.append("Cache = hits/lookups; p50/p95 across recorded runs; ⚠️ = slower than historical p95")
+    return "\n".join(lines)
+
+
+def write_chrome_trace(spans: list[Span], path: Path, origin: float | None = None) -> Path:
+    """Write spans as Chrome trace-event JSON (open in chrome://tracing or Perfetto)."""
+    origin = TRACER.origin if origin is None else origin
+    thread_ids: dict[int, int] = {}
+    events = []
+
+    for s in sorted(spans, key=lambda x: x.start):
+        tid = thread_ids.setdefault(s.thread_id, len(thread_ids) + 1)
+        args = {**s.attrs, "bytes": s.bytes_fetched}
+        if s.cache:
+            args["cache"] = s.cache
+        events.append({
+            "name": s.name,
+            "cat": s.category,
+            "ph": "X",
+            "ts": round((s.start - origin) * 1_000_000),
+            "dur": round(s.duration_ms * 1000),
+            "pid": 1,
+            "tid": tid,
+            "args": {k: v if isinstance(v, (int, float, str, bool)) or v is None else str(v) for k, v in args.items()},
+        })
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+    return path
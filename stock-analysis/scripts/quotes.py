@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Shared quote cache: latest prices for many tickers in one batch request.
+
+Quotes come from a single yf.download call (last daily close, intraday while
+the market is open) rather than one full Ticker.info profile per symbol.
+Results are kept in memory and in cache/quotes.json for QUOTE_TTL seconds, so
+repeated commands and redraws only refetch what has gone stale.
+
+Usage:
+    from quotes import get_quotes
+
+    quotes = get_quotes(["AAPL", "BTC-USD"])
+    quotes["AAPL"].price, quotes["AAPL"].change_pct
+"""
+
+import json
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+from profiling import CACHE_DIR
+
+QUOTE_CACHE_FILE = CACHE_DIR / "quotes.json"
+QUOTE_TTL = 60  # Seconds
+QUOTE_BATCH_SIZE = 200
+
+
+@dataclass
+class Quote:
+    ticker: str
+    price: float
+    previous_close: float | None
+    fetched_at: float  # time.time()
+
+    @property
+    def change_pct(self) -> float | None:
+        if not self.previous_close:
+            return None
+        return (self.price / self.previous_close - 1) * 100
+
+
+_MEMORY: dict[str, Quote] = {}
+
+
+def _load_disk(path: Path) -> dict[str, Quote]:
+    try:
+        return {t: Quote(**q) for t, q in json.loads(path.read_text()).items()}
+    except (OSError, ValueError, TypeError):
+        return {}
+
+
+def save_quotes(quotes: dict[str, Quote], path: Path | None = None) -> None:
+    """Add quotes fetched elsewhere (e.g. ticker validation) to both caches."""
+    _MEMORY.update(quotes)
+    if quotes:
+        _save_disk(path or QUOTE_CACHE_FILE, quotes)
+
+
+def _save_disk(path: Path, quotes: dict[str, Quote]) -> None:
+    """Merge into the on-disk cache with an atomic replace."""
+    merged = _load_disk(path)
+    merged.update(quotes)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({t: asdict(q) for t, q in merged.items()}))
+        tmp_path.replace(path)
+    except OSError:
+        pass
+
+
+def fetch_quotes(tickers: list[str]) -> dict[str, Quote]:
+    """Latest and previous close for each ticker via batched yf.download calls."""
+    import yfinance as yf
+
+    quotes = {}
+    now = time.time()
+    for start in range(0, len(tickers), QUOTE_BATCH_SIZE):
+        batch = tickers[start:start + QUOTE_BATCH_SIZE]
+        try:
+            data = yf.download(batch, period="5d", group_by="ticker", progress=False, threads=True, auto_adjust=False)
+        except Exception:
+            continue
+        if data is None or data.empty:
+            continue
+
+        grouped = set(data.columns.get_level_values(0)) if data.columns.nlevels > 1 else set()
+        for ticker in batch:
+            if ticker in grouped:
+                closes = data[ticker]["Close"].dropna()
+            elif len(batch) == 1 and "Close" in data.columns:
+                closes = data["Close"].dropna()
+            else:
+                continue
+            if closes.empty:
+                continue
+            previous = float(closes.iloc[-2]) if len(closes) > 1 else None
+            quotes[ticker] = Quote(ticker, float(closes.iloc[-1]), previous, now)
+    return quotes
+
+
+def get_quotes(
+    tickers: list[str],
+    max_age: float = QUOTE_TTL,
+    path: Path | None = None,
+) -> dict[str, Quote]:
+    """
+    Quotes for `tickers`, fetching only those missing or older than `max_age`
+    seconds (memory first, then disk). Tickers with no data are left out.
+    """
+    path = path or QUOTE_CACHE_FILE
+    now = time.time()
+    wanted = list(dict.fromkeys(t.upper() for t in tickers))
+
+    result = {t: _MEMORY[t] for t in wanted if t in _MEMORY and now - _MEMORY[t].fetched_at < max_age}
+    missing = [t for t in wanted if t not in result]
+    if missing:
+        disk = _load_disk(path)
+        for t in missing:
+            if t in disk and now - disk[t].fetched_at < max_age:
+                result[t] = _MEMORY[t] = disk[t]
+        missing = [t for t in wanted if t not in result]
+
+    if missing:
+        fetched = fetch_quotes(missing)
+        save_quotes(fetched, path)
+        result.update(fetched)
+
+    return {t: result[t] for t in wanted if t in result}
@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+Record/replay of network traffic for deterministic offline runs.
+
+A cassette is a JSON file of recorded responses. In "record" mode every
+external call goes to the network and its result is stored; in "replay"
+mode results are served from the cassette and nothing touches the network.
+Unrecorded requests raise ReplayMiss (and are counted in cassette.misses),
+which the scripts treat like any other fetch failure.
+
+Intercepted traffic:
+- urllib (hot_scanner, rumor_scanner, feedparser): Google News RSS,
+  CoinGecko, Reddit, Yahoo screeners
+- yfinance: Ticker attributes/methods and yf.download
+- edgartools: Company(...).get_filings(form=...) and Filing.obj()
+- fear_and_greed.get
+- the bird CLI (subprocess.run)
+
+Usage:
+    from replay import use_cassette
+
+    with use_cassette(Path("fixtures/aapl.json"), mode="record"):
+        analyze_stock.main()      # hits the network, saves the cassette
+
+    with use_cassette(Path("fixtures/aapl.json")) as cassette:
+        analyze_stock.main()      # offline
+    assert not cassette.misses
+"""
+
+import base64
+import builtins
+import copy
+import email.message
+import hashlib
+import io
+import json
+import subprocess
+import sys
+import threading
+import types
+import urllib.error
+import urllib.request
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from unittest.mock import patch
+
+CASSETTE_VERSION = 1
+RECORDED_COMMANDS = {"bird"}  # subprocess.run argv[0] basenames to intercept
+FORM4_FIELDS = ("common_stock_purchases", "common_stock_sales")
+
+
+class ReplayMiss(LookupError):
+    """Raised in replay mode for a request that is not in the cassette."""
+
+
+class ReplayedError(Exception):
+    """A recorded exception whose original type cannot be reconstructed."""
+
+
+# ============================================================================
+# Value encoding (JSON-safe, round-trips DataFrames and datetimes)
+# ============================================================================
+
+def encode_value(value):
+    """Convert a fetched value into a JSON-safe structure."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return {"__type__": "bytes", "b64": base64.b64encode(bytes(value)).decode("ascii")}
+
+    # Only look for pandas/numpy types if the caller already imported them
+    pd = sys.modules.get("pandas")
+    if pd is not None:
+        if isinstance(value, pd.DataFrame):
+            return {"__type__": "DataFrame", "table": value.to_json(orient="table", date_format="iso")}
+        if isinstance(value, pd.Series):
+            name = value.name
+            frame = value.to_frame(name="__series__")
+            return {
+                "__type__": "Series",
+                "name": name if isinstance(name, (str, int, float)) or name is None else str(name),
+                "table": frame.to_json(orient="table", date_format="iso"),
+            }
+        if isinstance(value, pd.Timestamp):
+            return {"__type__": "Timestamp", "iso": value.isoformat()}
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(value, np.generic):
+        return value.item()
+
+    if isinstance(value, datetime):
+        return {"__type__": "datetime", "iso": value.isoformat()}
+    if isinstance(value, date):
+        return {"__type__": "date", "iso": value.isoformat()}
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return {"__type__": "namespace", "fields": {k: encode_value(v) for k, v in zip(value._fields, value)}}
+    if isinstance(value, (list, tuple, set)):
+        return [encode_value(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): encode_value(v) for k, v in value.items()}
+    return {"__type__": "repr", "repr": repr(value)}
+
+
+def decode_value(value):
+    """Inverse of encode_value (namedtuples come back as SimpleNamespace)."""
+    if isinstance(value, list):
+        return [decode_value(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+
+    kind = value.get("__type__")
+    if kind is None:
+        return {k: decode_value(v) for k, v in value.items()}
+    if kind == "bytes":
+        return base64.b64decode(value["b64"])
+    if kind in ("DataFrame", "Series"):
+        import pandas as pd
+        frame = pd.read_json(io.StringIO(value["table"]), orient="table")
+        if kind == "Series":
+            series = frame["__series__"]
+            series.name = value.get("name")
+            return series
+        return frame
+    if kind == "Timestamp":
+        import pandas as pd
+        return pd.Timestamp(value["iso"])
+    if kind == "datetime":
+        return datetime.fromisoformat(value["iso"])
+    if kind == "date":
+        return date.fromisoformat(value["iso"])
+    if kind == "namespace":
+        return types.SimpleNamespace(**{k: decode_value(v) for k, v in value["fields"].items()})
+    if kind == "repr":
+        return value["repr"]
+    raise ValueError(f"Unknown encoded type: {kind}")
+
+
+def _call_key(prefix: str, args: tuple, kwargs: dict) -> str:
+    parts = [json.dumps(encode_value(a), sort_keys=True) for a in args]
+    parts += [f"{k}={json.dumps(encode_value(v), sort_keys=True)}" for k, v in sorted(kwargs.items())]
+    return f"{prefix}({', '.join(parts)})"
+
+
+# ============================================================================
+# Cassette
+# ============================================================================
+
+class Cassette:
+    """Recorded responses keyed by request. Thread-safe."""
+
+    def __init__(self, path: Path, mode: str = "replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"mode must be 'record' or 'replay', got {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self.entries: dict[str, dict] = {}
+        self.misses: list[str] = []
+        self.hits = 0
+        self._decoded: dict[str, object] = {}  # Replay: decode each entry once, hand out copies
+        self._lock = threading.Lock()
+
+        if mode == "replay":
+            if not self.path.exists():
+                raise FileNotFoundError(f"Cassette not found: {self.path} (record it first)")
+            data = json.loads(self.path.read_text())
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version in {self.path}: {data.get('version')}")
+            self.entries = data.get("entries", {})
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def save(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            payload = {
+                "version": CASSETTE_VERSION,
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                "entries": dict(sorted(self.entries.items())),
+            }
+        self.path.write_text(json.dumps(payload, indent=1))
+        return self.path
+
+    def put(self, key: str, entry: dict) -> None:
+        with self._lock:
+            self.entries[key] = entry
+
+    def get(self, key: str) -> dict:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses.append(key)
+            else:
+                self.hits += 1
+        if entry is None:
+            raise ReplayMiss(f"Not in cassette {self.path.name}: {key}")
+        return entry
+
+    def has_prefix(self, prefix: str) -> bool:
+        with self._lock:
+            return any(k.startswith(prefix) for k in self.entries)
+
+    def call(self, key: str, fetch):
+        """Record or replay a zero-arg call returning a JSON-encodable value."""
+        if not self.recording:
+            entry = self.get(key)
+            if "error" in entry:
+                _raise_recorded(entry["error"])
+            if key not in self._decoded:
+                self._decoded[key] = decode_value(entry["value"])
+            return copy.deepcopy(self._decoded[key])
+
+        try:
+            result = fetch()
+        except Exception as e:
+            self.put(key, {"error": _describe_error(e)})
+            raise
+        self.put(key, {"value": encode_value(result)})
+        return result
+
+
+def _describe_error(exc: BaseException) -> dict:
+    return {"type": type(exc).__name__, "message": str(exc)}
+
+
+def _raise_recorded(error: dict):
+    name, message = error.get("type", ""), error.get("message", "")
+    if name == "URLError":
+        raise urllib.error.URLError(message)
+    if name == "TimeoutExpired":
+        raise subprocess.TimeoutExpired(cmd=message, timeout=0)
+    exc_type = getattr(builtins, name, None)
+    if isinstance(exc_type, type) and issubclass(exc_type, Exception):
+        raise exc_type(message)
+    raise ReplayedError(f"{name}: {message}")
+
+
+# ============================================================================
+# urllib
+# ============================================================================
+
+class _RecordedResponse(io.BytesIO):
+    """Minimal stand-in for http.client.HTTPResponse."""
+
+    def __init__(self, body: bytes, status: int, headers: list, url: str):
+        super().__init__(body)
+        self.status = self.code = status
+        self.reason = ""
+        self.url = url
+        self.headers = self.msg = _message(headers)
+
+    def info(self):
+        return self.headers
+
+    def geturl(self):
+        return self.url
+
+    def getcode(self):
+        return self.status
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+
+def _message(headers: list) -> email.message.Message:
+    message = email.message.Message()
+    for name, value in headers:
+        message[name] = value
+    return message
+
+
+def _url_key(fullurl, data) -> str:
+    if isinstance(fullurl, urllib.request.Request):
+        method, url, data = fullurl.get_method(), fullurl.full_url, fullurl.data or data
+    else:
+        method, url = ("POST" if data else "GET"), fullurl
+    key = f"url {method} {url}"
+    if data:
+        body = data if isinstance(data, bytes) else str(data).encode()
+        key += f" #{hashlib.sha1(body).hexdigest()[:12]}"
+    return key
+
+
+def _patch_urllib(cassette: Cassette):
+    real_open = urllib.request.OpenerDirector.open
+
+    def open_(director, fullurl, data=None, timeout=None, **kwargs):
+        key = _url_key(fullurl, data)
+
+        if not cassette.recording:
+            entry = cassette.get(key)
+            if "error" in entry:
+                _raise_recorded(entry["error"])
+            body = base64.b64decode(entry["body"])
+            if entry["status"] >= 400:
+                raise urllib.error.HTTPError(entry["url"], entry["status"], "recorded", _message(entry["headers"]), io.BytesIO(body))
+            return _RecordedResponse(body, entry["status"], entry["headers"], entry["url"])
+
+        call_kwargs = dict(kwargs)
+        if timeout is not None:
+            call_kwargs["timeout"] = timeout
+        try:
+            resp = real_open(director, fullurl, data, **call_kwargs)
+        except urllib.error.HTTPError as e:
+            body = e.read() if e.fp else b""
+            cassette.put(key, {
+                "status": e.code,
+                "url": e.geturl() or "",
+                "headers": list(e.headers.items()) if e.headers else [],
+                "body": base64.b64encode(body).decode("ascii"),
+            })
+            raise
+        except Exception as e:
+            cassette.put(key, {"error": _describe_error(e)})
+            raise
+
+        with resp:
+            body = resp.read()
+            entry = {
+                "status": getattr(resp, "status", None) or resp.getcode() or 200,
+                "url": resp.geturl(),
+                "headers": list(resp.info().items()),
+                "body": base64.b64encode(body).decode("ascii"),
+            }
+        cassette.put(key, entry)
+        return _RecordedResponse(body, entry["status"], entry["headers"], entry["url"])
+
+    return patch.object(urllib.request.OpenerDirector, "open", open_)
+
+
+# ============================================================================
+# subprocess (bird CLI)
+# ============================================================================
+
+def _patch_subprocess(cassette: Cassette):
+    real_run = subprocess.run
+
+    def run(args, *popenargs, **kwargs):
+        argv = [args] if isinstance(args, str) else list(args)
+        if not argv or Path(str(argv[0])).name not in RECORDED_COMMANDS:
+            return real_run(args, *popenargs, **kwargs)
+
+        key = "cmd " + json.dumps([Path(str(argv[0])).name] + [str(a) for a in argv[1:]])
+
+        def _run():
+            result = real_run(args, *popenargs, **kwargs)
+            return {"returncode": result.returncode, "stdout": result.stdout, "stderr": result.stderr}
+
+        recorded = cassette.call(key, _run)
+        return subprocess.CompletedProcess(args, recorded["returncode"], recorded["stdout"], recorded["stderr"])
+
+    return patch.object(subprocess, "run", run)
+
+
+# ============================================================================
+# yfinance
+# ============================================================================
+
+def _ticker_class(cassette: Cassette, real_ticker):
+    class ReplayTicker:
+        """yf.Ticker stand-in: properties and method calls go through the cassette."""
+
+        def __init__(self, ticker, *args, **kwargs):
+            self.ticker = ticker.upper() if isinstance(ticker, str) else ticker
+            self._prefix = f"yf.Ticker({self.ticker})"
+            self._real = real_ticker(ticker, *args, **kwargs) if cassette.recording else None
+
+        def __getattr__(self, name):
+            if name.startswith("_"):
+                raise AttributeError(name)
+            key = f"{self._prefix}.{name}"
+
+            if cassette.recording:
+                value = getattr(self._real, name)
+                if callable(value):
+                    method = value
+                    return lambda *a, **kw: cassette.call(_call_key(key, a, kw), lambda: method(*a, **kw))
+                cassette.put(key, {"value": encode_value(value)})
+                return value
+
+            if key in cassette.entries:
+                return cassette.call(key, None)
+            if cassette.has_prefix(key + "("):
+                return lambda *a, **kw: cassette.call(_call_key(key, a, kw), None)
+            cassette.get(key)  # records the miss and raises ReplayMiss
+
+    return ReplayTicker
+
+
+def _patch_yfinance(cassette: Cassette, stack: ExitStack) -> None:
+    try:
+        import yfinance
+    except ImportError:
+        return
+
+    stack.enter_context(patch.object(yfinance, "Ticker", _ticker_class(cassette, yfinance.Ticker)))
+
+    real_download = yfinance.download
+
+    def download(*args, **kwargs):
+        kwargs.pop("progress", None)
+        key = _call_key("yf.download", args, kwargs)
+        return cassette.call(key, lambda: real_download(*args, progress=False, **kwargs))
+
+    stack.enter_context(patch.object(yfinance, "download", download))
+
+
+# ============================================================================
+# edgartools / fear_and_greed
+# ============================================================================
+
+class _ReplayFiling:
+    def __init__(self, record: dict, key: str, cassette: Cassette, real=None):
+        self._record = record
+        self._key = key
+        self._cassette = cassette
+        self._real = real
+
+    @property
+    def filing_date(self):
+        if self._real is not None:
+            value = self._real.filing_date
+            self._record["filing_date"] = encode_value(value)
+            return value
+        return decode_value(self._record.get("filing_date"))
+
+    def obj(self):
+        if self._real is not None:
+            form = self._real.obj()
+            self._record["obj"] = None if form is None else {
+                name: encode_value(getattr(form, name, None)) for name in FORM4_FIELDS
+            }
+            return form
+        if "obj" not in self._record:
+            self._cassette.get(f"{self._key}.obj()")  # records the miss and raises
+        if self._record["obj"] is None:
+            return None
+        return types.SimpleNamespace(**{k: decode_value(v) for k, v in self._record["obj"].items()})
+
+
+def _edgar_module(cassette: Cassette, real_module):
+    """Build an edgar stand-in exposing Company and set_identity."""
+
+    class Company:
+        def __init__(self, ticker):
+            self.ticker = ticker
+            self._real = real_module.Company(ticker) if cassette.recording else None
+
+        def get_filings(self, **kwargs):
+            key = _call_key(f"edgar.Company({self.ticker}).get_filings", (), kwargs)
+            if cassette.recording:
+                try:
+                    real_filings = self._real.get_filings(**kwargs)
+                except Exception as e:
+                    cassette.put(key, {"error": _describe_error(e)})
+                    raise
+                if real_filings is None:
+                    cassette.put(key, {"value": None})
+                    return None
+                # Filled in lazily as filings are read; serialized on save
+                records: list[dict] = []
+                cassette.put(key, {"value": {"filings": records}})
+                filings = []
+                for i, filing in enumerate(real_filings):
+                    if i >= 50:  # get_insider_activity never looks past 50
+                        break
+                    record: dict = {}
+                    records.append(record)
+                    filings.append(_ReplayFiling(record, f"{key}[{i}]", cassette, real=filing))
+                return filings
+
+            entry = cassette.get(key)
+            if "error" in entry:
+                _raise_recorded(entry["error"])
+            if entry["value"] is None:
+                return None
+            return [
+                _ReplayFiling(record, f"{key}[{i}]", cassette)
+                for i, record in enumerate(entry["value"]["filings"])
+            ]
+
+    module = types.ModuleType("edgar")
+    module.Company = Company
+    module.set_identity = (lambda identity: real_module.set_identity(identity)) if cassette.recording else (lambda identity: None)
+    return module
+
+
+@contextmanager
+def _swap_module(name: str, module: types.ModuleType):
+    """Temporarily replace one sys.modules entry (patch.dict would also drop modules imported inside the block)."""
+    previous = sys.modules.get(name)
+    sys.modules[name] = module
+    try:
+        yield module
+    finally:
+        if previous is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = previous
+
+
+def _patch_optional_modules(cassette: Cassette, stack: ExitStack) -> None:
+    """
+    edgartools and fear_and_greed are optional. When recording, wrap them if
+    installed; when replaying, stand in for them if the cassette has their
+    traffic, so replays don't depend on what is installed.
+    """
+    try:
+        import edgar as real_edgar
+    except ImportError:
+        real_edgar = None
+    if (cassette.recording and real_edgar is not None) or (not cassette.recording and cassette.has_prefix("edgar.")):
+        stack.enter_context(_swap_module("edgar", _edgar_module(cassette, real_edgar)))
+
+    try:
+        import fear_and_greed as real_fng
+    except ImportError:
+        real_fng = None
+    if (cassette.recording and real_fng is not None) or (not cassette.recording and cassette.has_prefix("fear_and_greed.")):
+        fng = types.ModuleType("fear_and_greed")
+        fng.get = lambda *a, **kw: cassette.call(_call_key("fear_and_greed.get", a, kw), lambda: real_fng.get(*a, **kw))
+        stack.enter_context(_swap_module("fear_and_greed", fng))
+
+
+# ============================================================================
+# Entry point
+# ============================================================================
+
+@contextmanager
+def use_cassette(path: Path, mode: str = "replay"):
+    """
+    Record or replay all external traffic inside the block.
+    Yields the Cassette; in record mode it is saved on exit (even on error,
+    so partial recordings can be inspected).
+    """
+    cassette = Cassette(path, mode)
+    with ExitStack() as stack:
+        stack.enter_context(_patch_urllib(cassette))
+        stack.enter_context(_patch_subprocess(cassette))
+        _patch_yfinance(cassette, stack)
+        _patch_optional_modules(cassette, stack)
+        try:
+            yield cassette
+        finally:
+            if cassette.recording:
+                cassette.save()
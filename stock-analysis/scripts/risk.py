@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Portfolio risk analytics on an aligned daily returns matrix.
+
+Given daily closes for every holding (stocks and crypto), computes:
+- Ledoit-Wolf shrinkage covariance (stable with hundreds of assets)
+- Portfolio volatility (daily and annualized)
+- 1-day historical and parametric (normal) VaR / CVaR
+- Max drawdown of the current weights over the lookback
+- Beta to SPY
+- Marginal risk contributions (share of portfolio volatility per asset)
+
+Calendar alignment: crypto trades 24/7, stocks on exchange days. Returns are
+measured between consecutive benchmark (SPY) sessions, so a crypto asset's
+Monday return includes its weekend move and every column covers the same
+intervals. Without a benchmark (e.g. crypto-only data) every calendar day is
+used and annualization switches from 252 to 365.
+
+Results are cached per (portfolio, date, holdings) in cache/portfolio_risk.json,
+so repeated --portfolio runs on the same day skip the computation.
+"""
+
+import hashlib
+import json
+import math
+from dataclasses import dataclass, asdict
+from datetime import date
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from profiling import CACHE_DIR
+
+RISK_CACHE_FILE = CACHE_DIR / "portfolio_risk.json"
+CONFIDENCE = 0.95
+MIN_OBSERVATIONS = 30  # Assets with fewer daily returns are left out of the risk model
+TRADING_DAYS = 252
+CALENDAR_DAYS = 365
+
+
+@dataclass
+class PortfolioRisk:
+    as_of: str
+    observations: int
+    confidence: float
+    volatility_daily_pct: float
+    volatility_annual_pct: float
+    var_historical_pct: float  # 1-day loss (positive = loss)
+    cvar_historical_pct: float
+    var_parametric_pct: float
+    cvar_parametric_pct: float
+    max_drawdown_pct: float  # Negative, e.g. -23.4
+    max_drawdown_date: str | None
+    beta_spy: float | None
+    shrinkage: float  # Ledoit-Wolf intensity (0 = sample cov, 1 = scaled identity)
+    risk_contributions: dict[str, float]  # Ticker -> % of portfolio volatility
+    excluded: list[str] | None  # Tickers without enough history
+
+
+# ============================================================================
+# Building blocks
+# ============================================================================
+
+def align_returns(closes: pd.DataFrame, calendar: pd.DatetimeIndex | None = None) -> pd.DataFrame:
+    """
+    Daily simple returns for each column, measured between consecutive
+    calendar dates. `closes` must already be forward-filled across days the
+    asset didn't trade; values before an asset's first close stay NaN.
+    """
+    if calendar is not None:
+        closes = closes.reindex(closes.index.union(calendar)).ffill().reindex(calendar)
+    return closes.pct_change(fill_method=None).iloc[1:]
+
+
+def ledoit_wolf(returns: np.ndarray) -> tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf (2004) shrinkage of the sample covariance towards a scaled
+    identity. `returns` is T x N. Returns (covariance, shrinkage intensity).
+    """
+    n_samples, n_assets = returns.shape
+    x = returns - returns.mean(axis=0)
+    sample = x.T @ x / n_samples
+
+    mu = np.trace(sample) / n_assets
+    target = mu * np.eye(n_assets)
+    delta = np.sum((sample - target) ** 2) / n_assets
+    if delta == 0:
+        return sample, 0.0
+
+    x2 = x ** 2
+    beta = np.sum(x2.T @ x2 / n_samples - sample ** 2) / (n_assets * n_samples)
+    shrinkage = float(min(max(beta, 0.0), delta) / delta)
+    return (1 - shrinkage) * sample + shrinkage * target, shrinkage
+
+
+def historical_var(portfolio_returns: np.ndarray, confidence: float = CONFIDENCE) -> tuple[float, float]:
+    """1-day historical VaR and CVaR as positive loss fractions."""
+    cutoff = np.quantile(portfolio_returns, 1 - confidence)
+    tail = portfolio_returns[portfolio_returns <= cutoff]
+    return float(-cutoff), float(-tail.mean()) if tail.size else float(-cutoff)
+
+
+def parametric_var(mean: float, std: float, confidence: float = CONFIDENCE) -> tuple[float, float]:
+    """1-day normal VaR and CVaR as positive loss fractions."""
+    alpha = 1 - confidence
+    normal = NormalDist()
+    z = normal.inv_cdf(alpha)
+    var = -(mean + z * std)
+    cvar = -(mean - std * normal.pdf(z) / alpha)
+    return var, cvar
+
+
+def max_drawdown(portfolio_returns: np.ndarray) -> tuple[float, int]:
+    """Largest peak-to-trough decline of cumulative returns and the trough's index."""
+    wealth = np.cumprod(1 + portfolio_returns)
+    peaks = np.maximum.accumulate(np.concatenate(([1.0], wealth)))[1:]
+    drawdowns = wealth / peaks - 1
+    trough = int(np.argmin(drawdowns))
+    return float(drawdowns[trough]), trough
+
+
+# ============================================================================
+# Portfolio risk
+# ============================================================================
+
+def compute_portfolio_risk(
+    closes: pd.DataFrame,
+    values: dict[str, float],
+    benchmark: pd.Series | None = None,
+    confidence: float = CONFIDENCE,
+) -> PortfolioRisk | None:
+    """
+    Risk metrics for holdings worth `values` (ticker -> current value).
+    `closes` is a forward-filled date x ticker close matrix; `benchmark` is
+    SPY's closes on its own trading dates (also used as the calendar).
+    """
+    if closes.empty:
+        return None
+    if benchmark is not None:
+        benchmark = benchmark.dropna()
+        benchmark = benchmark[benchmark.index >= closes.index[0]]
+    calendar = benchmark.index if benchmark is not None and len(benchmark) > 1 else None
+    returns = align_returns(closes, calendar)
+
+    counts = returns.notna().sum()
+    usable = [t for t in returns.columns if counts[t] >= MIN_OBSERVATIONS and values.get(t, 0) > 0]
+    excluded = [t for t in returns.columns if t not in usable]
+    if not usable:
+        return None
+
+    # Before an asset listed it contributes nothing (zero return)
+    matrix = returns[usable].fillna(0.0).to_numpy()
+    weights = np.array([values[t] for t in usable], dtype=float)
+    weights /= weights.sum()
+
+    covariance, shrinkage = ledoit_wolf(matrix)
+    variance = float(weights @ covariance @ weights)
+    volatility = math.sqrt(variance) if variance > 0 else 0.0
+    annualization = TRADING_DAYS if calendar is not None else CALENDAR_DAYS
+
+    portfolio_returns = matrix @ weights
+    var_hist, cvar_hist = historical_var(portfolio_returns, confidence)
+    var_param, cvar_param = parametric_var(float(portfolio_returns.mean()), volatility, confidence)
+    drawdown, trough = max_drawdown(portfolio_returns)
+
+    beta = None
+    if calendar is not None:
+        bench_returns = benchmark.pct_change().iloc[1:].to_numpy()
+        bench_var = np.var(bench_returns)
+        if len(bench_returns) >= MIN_OBSERVATIONS and bench_var > 0:
+            cov = np.mean((portfolio_returns - portfolio_returns.mean()) * (bench_returns - bench_returns.mean()))
+            beta = round(float(cov / bench_var), 3)
+
+    # Euler decomposition: w_i * (Σw)_i / σ² sums to 1
+    contributions = {}
+    if variance > 0:
+        shares = weights * (covariance @ weights) / variance * 100
+        order = np.argsort(-shares)
+        contributions = {usable[i]: round(float(shares[i]), 2) for i in order}
+
+    return PortfolioRisk(
+        as_of=returns.index[-1].strftime("%Y-%m-%d"),
+        observations=len(returns),
+        confidence=confidence,
+        volatility_daily_pct=round(volatility * 100, 3),
+        volatility_annual_pct=round(volatility * math.sqrt(annualization) * 100, 2),
+        var_historical_pct=round(var_hist * 100, 3),
+        cvar_historical_pct=round(cvar_hist * 100, 3),
+        var_parametric_pct=round(var_param * 100, 3),
+        cvar_parametric_pct=round(cvar_param * 100, 3),
+        max_drawdown_pct=round(drawdown * 100, 2),
+        max_drawdown_date=returns.index[trough].strftime("%Y-%m-%d"),
+        beta_spy=beta,
+        shrinkage=round(shrinkage, 4),
+        risk_contributions=contributions,
+        excluded=excluded or None,
+    )
+
+
+# ============================================================================
+# Cache (per portfolio, date and holdings)
+# ============================================================================
+
+def risk_cache_key(portfolio_name: str, holdings: list[tuple[str, float]], as_of: date | None = None) -> str:
+    """Key that changes when the day or any holding/quantity changes."""
+    as_of = as_of or date.today()
+    digest = hashlib.sha1(json.dumps(sorted(holdings)).encode()).hexdigest()[:16]
+    return f"{portfolio_name.lower()}|{as_of.isoformat()}|{digest}"
+
+
+def load_cached_risk(key: str, path: Path | None = None) -> PortfolioRisk | None:
+    path = path or RISK_CACHE_FILE
+    try:
+        entry = json.loads(path.read_text()).get(key)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return PortfolioRisk(**entry) if entry else None
+
+
+def save_cached_risk(key: str, risk: PortfolioRisk, path: Path | None = None) -> None:
+    """Store a result, dropping entries from previous days."""
+    path = path or RISK_CACHE_FILE
+    try:
+        cache = json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        cache = {}
+
+    today = key.split("|")[1]
+    cache = {k: v for k, v in cache.items() if k.split("|")[1] == today}
+    cache[key] = asdict(risk)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(cache))
+    except OSError:
+        pass
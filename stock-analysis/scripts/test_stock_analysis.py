@@ -14,6 +14,10 @@ Run with: uv run pytest test_stock_analysis.py -v
 """
 
 import json
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timezone
@@ -32,16 +36,52 @@ from analyze_stock import (
     Fundamentals,
     MomentumAnalysis,
     MarketContext,
+    MarketSnapshot,
     StockData,
+    analyze_crypto_fundamentals,
+    analyze_market_context,
+    calculate_portfolio_period_return,
+    generate_portfolio_summary,
+    get_vix_term_structure,
+)
+from dividends import (
+    DividendHistoryCache,
+    DividendScreenIndex,
+    analyze_dividends,
+    analyze_dividends_batch,
+    analyze_portfolio_income,
+    compute_dividend_stats,
+    project_dividends,
+    project_portfolio_income,
 )
-from dividends import analyze_dividends
 from watchlist import (
     add_to_watchlist,
     remove_from_watchlist,
     list_watchlist,
     WatchlistItem,
 )
-from portfolio import PortfolioStore
+from portfolio import (
+    PortfolioStore,
+    Position,
+    Transaction,
+    apply_transaction,
+    import_file,
+    read_import_rows,
+    validate_tickers,
+)
+from profiling import Tracer, format_profile_table, record_stage_history
+import quotes as quotes_module
+from quotes import get_quotes
+from replay import ReplayMiss, use_cassette
+from risk import (
+    align_returns,
+    compute_portfolio_risk,
+    ledoit_wolf,
+    load_cached_risk,
+    max_drawdown,
+    risk_cache_key,
+    save_cached_risk,
+)
 
 
 class TestAssetTypeDetection:
@@ -311,6 +351,11 @@ class TestWatchlist:
 
 class TestDividendAnalysis:
     """Test dividend analysis."""
+
+    @pytest.fixture(autouse=True)
+    def _history_cache(self, tmp_path):
+        with patch("dividends.DIVIDEND_CACHE_FILE", tmp_path / "dividends.db"):
+            yield
     
     @patch('yfinance.Ticker')
     def test_dividend_stock(self, mock_ticker):
@@ -353,6 +398,822 @@ class TestDividendAnalysis:
         assert result is not None
         assert result.income_rating == "no_dividend"
 
+    def test_stats_for_all_tickers_at_once(self):
+        today = pd.Timestamp("2024-03-01")
+        quarters = pd.date_range("2017-01-15", "2023-12-31", freq="QS-JAN") + pd.Timedelta(days=14)
+        monthly = pd.date_range("2018-01-01", "2024-02-01", freq="MS")
+        frame = pd.concat([
+            # Grows 10%/year; current year is partial and ignored for stats
+            pd.DataFrame({"ticker": "GROW", "date": quarters,
+                          "amount": [1.1 ** (d.year - 2017) for d in quarters]}),
+            pd.DataFrame({"ticker": "GROW", "date": [pd.Timestamp("2024-01-15")], "amount": [0.1]}),
+            # Cut in 2021, monthly payer
+            pd.DataFrame({"ticker": "CUT", "date": monthly,
+                          "amount": [0.5 if d.year == 2021 else 1.0 for d in monthly]}),
+        ])
+        stats = compute_dividend_stats(frame, today)
+
+        assert stats.loc["GROW", "dividend_growth_5y"] == pytest.approx(10.0)
+        assert stats.loc["GROW", "consecutive_years"] == 6
+        assert stats.loc["GROW", "payment_frequency"] == "quarterly"
+        assert stats.loc["GROW", "history"][0] == {"year": 2024, "total": 0.1}
+        assert stats.loc["CUT", "consecutive_years"] == 2
+        assert stats.loc["CUT", "payment_frequency"] == "monthly"
+        assert stats.loc["CUT", "dividend_growth_5y"] == pytest.approx(0.0)
+
+    def test_history_refreshes_incrementally(self, tmp_path):
+        cache = DividendHistoryCache(tmp_path / "history.db")
+        stock = Mock()
+        stock.info = {"dividendRate": 4.0, "regularMarketPrice": 100.0}
+        stock.dividends = pd.Series([1.0, 1.0], index=pd.to_datetime(["2024-01-10", "2024-04-10"]))
+        stock.history.return_value = pd.DataFrame(
+            {"Dividends": [0.0, 1.1], "Stock Splits": [0.0, 0.0]},
+            index=pd.to_datetime(["2024-07-01", "2024-07-10"]),
+        )
+
+        with patch("yfinance.Ticker", return_value=stock):
+            analyze_dividends_batch(["KO"], cache=cache)
+            analyze_dividends_batch(["KO"], cache=cache)  # Fresh: no history request
+            stock.history.assert_not_called()
+            analyze_dividends_batch(["KO"], cache=cache, max_age=0)
+
+        assert stock.history.call_args.kwargs["start"] < datetime.now().strftime("%Y-%m-%d")
+        assert cache.frame(["KO"])["amount"].tolist() == [1.0, 1.0, 1.1]
+
+        # A split re-adjusts past amounts: refetch everything
+        stock.history.return_value = pd.DataFrame({"Dividends": [0.0], "Stock Splits": [2.0]},
+                                                  index=pd.to_datetime(["2024-08-01"]))
+        stock.dividends = pd.Series([0.5, 0.5, 0.55], index=pd.to_datetime(["2024-01-10", "2024-04-10", "2024-07-10"]))
+        with patch("yfinance.Ticker", return_value=stock):
+            analyze_dividends_batch(["KO"], cache=cache, max_age=0)
+        assert cache.frame(["KO"])["amount"].tolist() == [0.5, 0.5, 0.55]
+
+
+class TestProfiling:
+    """Test tracing spans and profile history."""
+    
+    def test_nested_spans_and_table(self):
+        """Test spans nest, record payload size and cache status."""
+        tracer = Tracer()
+        tracer.enable()
+        
+        with tracer.span("fetch_stock_data") as outer:
+            with tracer.span("yf.info", "network") as inner:
+                inner.record_payload({"regularMarketPrice": 150.0})
+                inner.mark_cache(False)
+        
+        spans = {s.name: s for s in tracer.spans}
+        assert spans["yf.info"].parent == "fetch_stock_data"
+        assert spans["yf.info"].bytes_fetched > 0
+        assert spans["yf.info"].cache == "miss"
+        assert spans["fetch_stock_data"].duration_ms >= spans["yf.info"].duration_ms
+        
+        table = format_profile_table(tracer.spans)
+        assert "fetch_stock_data" in table
+        assert "yf.info" in table
+    
+    def test_disabled_tracer_records_nothing(self):
+        """Test disabled tracer yields a no-op span."""
+        tracer = Tracer()
+        with tracer.span("analyze_momentum") as s:
+            s.record_payload("x" * 100)
+        assert tracer.spans == []
+    
+    def test_stage_history_percentiles(self, tmp_path):
+        """Test p50/p95 aggregation across runs."""
+        history_file = tmp_path / "profile_history.json"
+        tracer = Tracer()
+        tracer.enable()
+        for _ in range(3):
+            with tracer.span("analyze_sentiment"):
+                pass
+            stats = record_stage_history(tracer.spans, history_file)
+            tracer.reset()
+        
+        assert stats["analyze_sentiment"]["samples"] == 3
+        assert stats["analyze_sentiment"]["p50_ms"] is not None
+        assert stats["analyze_sentiment"]["p95_ms"] >= stats["analyze_sentiment"]["p50_ms"]
+
+
+class TestReplay:
+    """Test record/replay cassettes."""
+
+    def test_yfinance_round_trip(self, tmp_path):
+        import yfinance as yf
+
+        history = pd.DataFrame(
+            {"Close": [150.0, 152.5], "Volume": [1000, 1200]},
+            index=pd.date_range("2024-01-02", periods=2, tz="America/New_York", name="Date"),
+        )
+        mock_ticker = Mock()
+        mock_ticker.return_value.info = {"longName": "Apple Inc.", "regularMarketPrice": 152.5}
+        mock_ticker.return_value.history.return_value = history
+
+        cassette_path = tmp_path / "aapl.json"
+        with patch("yfinance.Ticker", mock_ticker):
+            with use_cassette(cassette_path, mode="record"):
+                stock = yf.Ticker("AAPL")
+                assert stock.info["longName"] == "Apple Inc."
+                stock.history(period="1mo")
+
+        with use_cassette(cassette_path) as cassette:
+            stock = yf.Ticker("AAPL")
+            assert stock.info == {"longName": "Apple Inc.", "regularMarketPrice": 152.5}
+            pd.testing.assert_frame_equal(stock.history(period="1mo"), history, check_freq=False)
+            with pytest.raises(ReplayMiss):
+                stock.history(period="1y")
+
+        assert cassette.misses == ['yf.Ticker(AAPL).history(period="1y")']
+        assert mock_ticker.return_value.history.call_count == 1
+
+    def test_missing_cassette(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            with use_cassette(tmp_path / "missing.json"):
+                pass
+
+
+class TestLazyImports:
+    """Test that heavy modules load only when a stage needs them."""
+
+    def test_import_skips_heavy_modules(self):
+        code = (
+            "import sys, analyze_stock; "
+            "print(sorted(m for m in ('pandas', 'yfinance', 'edgar', 'feedparser') if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).parent, capture_output=True, text=True, check=True,
+        )
+        assert result.stdout.strip() == "[]"
+
+    def test_fast_mode_never_imports_edgar_or_feedparser(self, monkeypatch, capsys):
+        import analyze_stock
+
+        attempted = []
+
+        class ImportRecorder:
+            def find_spec(self, name, path=None, target=None):
+                if name.split(".")[0] in ("edgar", "feedparser"):
+                    attempted.append(name)
+                return None
+
+        monkeypatch.setattr(sys, "meta_path", [ImportRecorder()] + sys.meta_path)
+        for name in ("edgar", "feedparser"):
+            monkeypatch.delitem(sys.modules, name, raising=False)
+        monkeypatch.setattr(analyze_stock, "_SENTIMENT_CACHE", {})
+        monkeypatch.setattr(sys, "argv", ["analyze_stock.py", "AAPL", "--fast", "--output", "json"])
+
+        dates = pd.date_range(end="2024-06-28", periods=250, freq="B")
+        history = pd.DataFrame({"Close": [100 + i * 0.1 for i in range(250)], "Volume": [1_000_000] * 250}, index=dates)
+        mock_ticker = Mock()
+        mock_ticker.return_value.info = {
+            "longName": "Apple Inc.", "regularMarketPrice": 125.0, "sector": "Technology", "trailingPE": 25.0,
+        }
+        mock_ticker.return_value.earnings_dates = None
+        mock_ticker.return_value.recommendations = None
+        mock_ticker.return_value.analyst_price_targets = None
+        mock_ticker.return_value.history.return_value = history
+
+        with patch("yfinance.Ticker", mock_ticker):
+            analyze_stock.main()
+
+        assert json.loads(capsys.readouterr().out)["ticker"] == "AAPL"
+        assert attempted == []
+
+
+class TestMarketSnapshot:
+    """Test that shared symbols are fetched once per run."""
+
+    @staticmethod
+    def _history(periods=260):
+        dates = pd.date_range(end="2024-06-28", periods=periods, freq="D")
+        return pd.DataFrame({"Close": [100 + i * 0.5 for i in range(periods)]}, index=dates)
+
+    @patch('yfinance.Ticker')
+    def test_shared_symbols_fetched_once(self, mock_ticker, monkeypatch):
+        import asyncio
+        import analyze_stock
+
+        monkeypatch.setattr(analyze_stock, "_SENTIMENT_CACHE", {})
+        history = self._history()
+        mock_ticker.return_value.history.return_value = history
+
+        snapshot = MarketSnapshot()
+        context = analyze_market_context(snapshot=snapshot)
+        vix = asyncio.run(get_vix_term_structure(snapshot))
+        for ticker in ("ETH-USD", "SOL-USD"):
+            data = StockData(
+                ticker=ticker, info={"marketCap": 5e10}, earnings_history=None,
+                analyst_info=None, price_history=history, asset_type="crypto",
+            )
+            analyze_crypto_fundamentals(data, snapshot=snapshot)
+
+        assert context is not None and vix is not None
+        assert context.vix_level == history["Close"].iloc[-1]
+        fetched = [c.args[0] for c in mock_ticker.call_args_list]
+        assert sorted(fetched) == ["BTC-USD", "GLD", "QQQ", "SPY", "TLT", "UUP", "^VIX"]
+        assert all(count == 1 for count in snapshot.fetch_counts.values())
+        assert ("^VIX", "info") not in snapshot.fetch_counts
+
+    @patch('yfinance.Ticker')
+    def test_shorter_periods_sliced_from_one_fetch(self, mock_ticker):
+        mock_ticker.return_value.history.return_value = self._history()
+
+        snapshot = MarketSnapshot()
+        month = snapshot.history("SPY", "1mo")
+        year = snapshot.history("SPY", "1y")
+
+        assert len(month) == 32  # 31 days back from the last bar, inclusive
+        assert len(year) == 260
+        mock_ticker.return_value.history.assert_called_once_with(period="1y")
+
+
+class TestPortfolioSummary:
+    """Test vectorized portfolio aggregation over already-fetched data."""
+
+    @staticmethod
+    def _snapshot():
+        # Stock trades weekdays (exchange time), crypto daily (UTC)
+        stock_dates = pd.bdate_range(end="2024-06-28", periods=300, tz="America/New_York")
+        crypto_dates = pd.date_range(end="2024-06-30", periods=400, freq="D", tz="UTC")
+        tickers = {
+            "AAPL": (pd.DataFrame({"Close": [100.0 + i for i in range(300)]}, index=stock_dates), 399.0),
+            "BTC-USD": (pd.DataFrame({"Close": [1000.0] * 399 + [1100.0]}, index=crypto_dates), 1100.0),
+            "SPY": (pd.DataFrame({"Close": [400.0 + (i % 7) for i in range(300)]}, index=stock_dates), 406.0),
+        }
+
+        def make_ticker(symbol):
+            ticker = Mock()
+            ticker.info = {"regularMarketPrice": tickers[symbol][1]}
+            ticker.history.return_value = tickers[symbol][0]
+            return ticker
+
+        snapshot = MarketSnapshot()
+        with patch("yfinance.Ticker", side_effect=make_ticker):
+            for symbol in tickers:
+                snapshot.info(symbol)
+                snapshot.history(symbol)
+        return snapshot
+
+    def test_summary_uses_snapshot_only(self, tmp_path):
+        snapshot = self._snapshot()
+        assets = [("AAPL", 10, 300.0, "stock"), ("BTC-USD", 1, 1000.0, "crypto")]
+
+        with patch("yfinance.Ticker") as mock_ticker, patch("risk.RISK_CACHE_FILE", tmp_path / "risk.json"):
+            summary = generate_portfolio_summary([], assets, "Test", "weekly", snapshot=snapshot)
+            mock_ticker.assert_not_called()
+
+        assert summary["total_cost"] == 4000.0
+        assert summary["total_value"] == 5090.0
+        assert summary["concentration_warnings"] == ["AAPL: 78.4%"]
+        # AAPL 394 -> 399 over the week, BTC 1000 -> 1100
+        expected = (10 * 399 + 1100 - (10 * 394 + 1000)) / (10 * 394 + 1000) * 100
+        assert summary["period_return_pct"] == pytest.approx(expected)
+        assert summary["risk"]["observations"] == 299
+
+    def test_daily_return_uses_previous_close(self):
+        snapshot = self._snapshot()
+        daily = calculate_portfolio_period_return([("AAPL", 1, 0.0, "stock")], 1, snapshot=snapshot)
+        yearly = calculate_portfolio_period_return([("AAPL", 1, 0.0, "stock")], 365, snapshot=snapshot)
+
+        assert daily == pytest.approx((399 / 398 - 1) * 100)
+        assert yearly is not None and yearly > daily
+
+
+class TestPortfolioLedger:
+    """Test lot accounting and incremental positions."""
+
+    @pytest.fixture(params=["db", "json"])
+    def store_path(self, request, tmp_path):
+        return tmp_path / f"portfolios.{request.param}"
+
+    @staticmethod
+    def _store(path, method="fifo"):
+        store = PortfolioStore(path=path)
+        store.create_portfolio("Main", method)
+        return store
+
+    @staticmethod
+    def _trade(store, *trades):
+        with patch("portfolio.yf.Ticker") as mock_ticker:
+            mock_ticker.return_value.info = {"regularMarketPrice": 100.0}
+            for kind, quantity, price, date in trades:
+                position = store.record_transaction("Main", "AAPL", kind, quantity, price, date)
+        return position
+
+    @pytest.mark.parametrize("method,realized,basis", [
+        ("fifo", 15 * 20 - 10 * 100 - 5 * 110, 110.0),
+        ("lifo", 15 * 20 - 10 * 110 - 5 * 100, 100.0),
+        ("average", 15 * 20 - 15 * 105, 105.0),
+    ])
+    def test_cost_methods(self, store_path, method, realized, basis):
+        store = self._store(store_path, method)
+        position = self._trade(
+            store,
+            ("buy", 10, 100.0, "2024-01-02"),
+            ("buy", 10, 110.0, "2024-02-01"),
+            ("sell", 15, 20.0, "2024-03-01"),
+        )
+
+        assert position.quantity == 5
+        assert position.realized_pnl == pytest.approx(realized)
+        assert position.cost_basis == pytest.approx(basis)
+        asset = store.get_portfolio("Main").assets[0]
+        assert (asset.quantity, asset.cost_basis) == (5, pytest.approx(basis))
+
+    def test_split_dividend_and_close(self, store_path):
+        store = self._store(store_path)
+        position = self._trade(
+            store,
+            ("buy", 10, 400.0, "2024-01-02"),
+            ("split", 4, 0.0, "2024-06-10"),
+            ("dividend", 40, 0.25, "2024-08-15"),
+        )
+        assert position.quantity == 40
+        assert position.cost_basis == pytest.approx(100.0)
+        assert position.dividends == pytest.approx(10.0)
+
+        position = self._trade(store, ("sell", 40, 120.0, "2024-09-01"))
+        portfolio = store.get_portfolio("Main")
+        assert portfolio.assets == []
+        assert portfolio.positions["AAPL"].realized_pnl == pytest.approx(800.0)
+
+    def test_backdated_trade_replays_history(self, store_path):
+        store = self._store(store_path)
+        self._trade(store, ("buy", 10, 100.0, "2024-03-01"), ("sell", 5, 150.0, "2024-04-01"))
+        # An earlier, cheaper lot changes which shares the FIFO sale consumed
+        position = self._trade(store, ("buy", 5, 50.0, "2024-01-02"))
+
+        assert position.realized_pnl == pytest.approx(5 * 150 - 5 * 50)
+        assert position.quantity == 10
+        assert [t.date for t in store.get_transactions("Main")] == ["2024-03-01", "2024-04-01", "2024-01-02"]
+
+    def test_oversell_leaves_ledger_untouched(self, store_path):
+        store = self._store(store_path)
+        self._trade(store, ("buy", 10, 100.0, "2024-01-02"))
+
+        with pytest.raises(ValueError, match="only 10 held"):
+            self._trade(store, ("sell", 11, 100.0, "2024-02-01"))
+        assert len(store.get_transactions("Main")) == 1
+
+        position = Position(ticker="AAPL")
+        apply_transaction(position, Transaction("AAPL", "buy", 1, 10.0, "2024-01-02"))
+        assert position.quantity == 0 and position.lots == []
+
+    def test_remove_keeps_history_unless_purged(self, store_path):
+        store = self._store(store_path)
+        self._trade(store, ("buy", 10, 100.0, "2024-01-02"), ("sell", 4, 150.0, "2024-02-01"))
+
+        assert store.remove_asset("Main", "aapl")
+        portfolio = store.get_portfolio("Main")
+        assert portfolio.assets == []
+        assert portfolio.positions["AAPL"].quantity == 0
+        assert portfolio.positions["AAPL"].realized_pnl == pytest.approx(200.0)
+        assert [t.kind for t in store.get_transactions("Main")] == ["buy", "sell", "adjust"]
+
+        self._trade(store, ("buy", 1, 100.0, None))  # Re-added after the removal
+        assert store.remove_asset("Main", "AAPL", purge=True)
+        assert store.get_transactions("Main") == []
+        assert not store.remove_asset("Main", "AAPL")
+
+    def test_legacy_portfolio_gets_opening_lot(self, tmp_path):
+        path = tmp_path / "portfolios.json"
+        path.write_text(json.dumps({"version": 1, "portfolios": {"old": {
+            "name": "Old", "created_at": "2023-01-01T00:00:00", "updated_at": "2023-01-01T00:00:00",
+            "assets": [{"ticker": "MSFT", "type": "stock", "quantity": 4, "cost_basis": 250.0,
+                        "added_at": "2023-01-05T10:00:00"}],
+        }}}))
+        store = PortfolioStore(path=path)
+
+        assert store.get_portfolio("Old").positions["MSFT"].cost == 1000.0
+        position = store.record_transaction("Old", "MSFT", "sell", 1, 300.0, "2024-01-02")
+        assert position.realized_pnl == pytest.approx(50.0)
+        assert [t.kind for t in store.get_transactions("Old")] == ["buy", "sell"]
+
+
+class TestPortfolioStorage:
+    """Test the SQLite backend and migration from JSON."""
+
+    def test_migrates_json_once(self, tmp_path):
+        legacy = tmp_path / "portfolios.json"
+        legacy.write_text(json.dumps({"version": 1, "portfolios": {"my-stocks": {
+            "name": "My Stocks", "created_at": "2023-01-01T00:00:00", "updated_at": "2023-01-01T00:00:00",
+            "assets": [{"ticker": t, "type": "stock", "quantity": 1, "cost_basis": 10.0,
+                        "added_at": "2023-01-05T10:00:00"} for t in ("MSFT", "AAPL")],
+        }}}))
+
+        store = PortfolioStore(path=tmp_path / "portfolios.db")
+        portfolio = store.get_portfolio("my stocks")
+
+        assert [a.ticker for a in portfolio.assets] == ["MSFT", "AAPL"]
+        assert not legacy.exists() and (tmp_path / "portfolios.json.migrated").exists()
+        assert PortfolioStore(path=tmp_path / "portfolios.db").list_portfolios() == ["My Stocks"]
+
+        # A stray legacy file next to a populated database is set aside, not re-imported
+        legacy.write_text(json.dumps({"version": 1, "portfolios": {}}))
+        assert PortfolioStore(path=tmp_path / "portfolios.db").list_portfolios() == ["My Stocks"]
+        assert not legacy.exists()
+
+    def test_concurrent_stores_keep_both_writes(self, tmp_path):
+        path = tmp_path / "portfolios.db"
+        first, second = PortfolioStore(path=path), PortfolioStore(path=path)
+        first.create_portfolio("Main")
+        assert second.get_portfolio("MAIN") is not None
+
+        with patch("portfolio.yf.Ticker") as mock_ticker:
+            mock_ticker.return_value.info = {"regularMarketPrice": 1.0}
+            first.add_asset("Main", "AAPL", 1, 100.0)
+            second.add_asset("Main", "MSFT", 2, 200.0)
+            first.record_transaction("Main", "MSFT", "buy", 1, 230.0, "2024-01-02")
+
+        assets = {a.ticker: a.quantity for a in PortfolioStore(path=path).get_portfolio("Main").assets}
+        assert assets == {"AAPL": 1, "MSFT": 3}
+
+    def test_rename_and_delete_cascade(self, tmp_path):
+        store = PortfolioStore(path=tmp_path / "portfolios.db")
+        store.create_portfolio("Old")
+        with store.backend.transaction():
+            store.backend.upsert_asset("old", {"ticker": "AAPL", "type": "stock", "quantity": 1.0,
+                                              "cost_basis": 1.0, "added_at": "2024-01-02"})
+        store.record_transaction("Old", "AAPL", "sell", 1, 2.0, "2024-02-01")
+
+        assert store.rename_portfolio("old", "New Name")
+        assert len(store.get_transactions("new name")) == 2
+        assert store.get_portfolio("New Name").positions["AAPL"].realized_pnl == pytest.approx(1.0)
+
+        with pytest.raises(RuntimeError):
+            with store.backend.transaction():
+                store.delete_portfolio("New Name")
+                raise RuntimeError("rolled back")
+        assert store.list_portfolios() == ["New Name"]
+
+        assert store.delete_portfolio("New Name")
+        assert store.backend.get_transactions("new-name") == []
+
+
+class TestPortfolioImport:
+    """Test CSV/broker export import."""
+
+    def test_positions_export(self):
+        lines = [
+            "Brokerage positions as of 06/28/2024",
+            "Account,Symbol,Description,Quantity,Last Price,Cost Basis Total",
+            'X1,AAPL,APPLE INC,10,$180.00,"$1,500.00"',
+            "X1,SPAXX**,MONEY MARKET,,,",
+            "X1,Pending Activity,,,,",
+            ",,,,,",
+        ]
+        transactions, rejects = read_import_rows(lines, "2024-06-28")
+
+        assert [(line, txn) for line, txn in transactions] == [
+            (3, Transaction("AAPL", "buy", 10.0, 150.0, "2024-06-28"))
+        ]
+        assert [(r.line, r.reason) for r in rejects] == [(4, "missing quantity"), (5, "not a ticker symbol")]
+
+    def test_fidelity_positions_type_column_is_not_an_action(self):
+        lines = [
+            "Account Number,Account Name,Symbol,Description,Quantity,Last Price,Last Price Change,"
+            "Current Value,Today's Gain/Loss Dollar,Today's Gain/Loss Percent,Total Gain/Loss Dollar,"
+            "Total Gain/Loss Percent,Percent Of Account,Cost Basis Total,Average Cost Basis,Type",
+            "Z123,Individual,AAPL,APPLE INC,10,$180.00,+$1.00,$1800.00,+$10.00,+0.56%,+$300.00,+20.00%,"
+            "60.00%,$1500.00,$150.00,Cash",
+            "Z123,Individual,MSFT,MICROSOFT CORP,2,$420.00,-$2.00,$840.00,-$4.00,-0.47%,+$40.00,+5.00%,"
+            "28.00%,$800.00,$400.00,Margin",
+        ]
+        transactions, rejects = read_import_rows(lines, "2024-06-28")
+
+        assert [(t.ticker, t.kind, t.quantity, t.price) for _, t in transactions] == [
+            ("AAPL", "buy", 10.0, 150.0),
+            ("MSFT", "buy", 2.0, 400.0),
+        ]
+        assert rejects == []
+
+    def test_activity_export(self):
+        lines = [
+            "Run Date,Action,Symbol,Quantity,Price ($),Commission ($),Amount ($)",
+            "01/02/2024,YOU BOUGHT APPLE INC,AAPL,10,,1.00,(1501.00)",
+            "03/15/2024,DIVIDEND RECEIVED,AAPL,,,,2.40",
+            "04/01/2024,YOU SOLD APPLE INC,AAPL,-4,,,800.00",
+            "04/02/2024,TRANSFER,AAPL,1,,,",
+        ]
+        transactions, rejects = read_import_rows(lines)
+
+        assert [(t.kind, t.quantity, t.price, t.date) for _, t in transactions] == [
+            ("buy", 10.0, 150.0, "2024-01-02"),
+            ("dividend", 1.0, 2.4, "2024-03-15"),
+            ("sell", 4.0, 200.0, "2024-04-01"),
+        ]
+        assert rejects[0].reason == "unsupported action 'TRANSFER'"
+
+    def test_validate_tickers_in_one_download(self, tmp_path):
+        columns = pd.MultiIndex.from_product([["AAPL", "NOPE"], ["Close"]])
+        data = pd.DataFrame([[180.0, float("nan")]], columns=columns)
+        with patch("portfolio.yf.download", return_value=data) as mock_download, \
+                patch("quotes.QUOTE_CACHE_FILE", tmp_path / "quotes.json"), patch.dict("quotes._MEMORY", clear=True):
+            assert validate_tickers(["AAPL", "NOPE"]) == {"AAPL"}
+        mock_download.assert_called_once()
+
+    def test_import_commits_together_and_reports_rejects(self, tmp_path):
+        store = PortfolioStore(path=tmp_path / "portfolios.db")
+        store.create_portfolio("Main")
+        path = tmp_path / "trades.csv"
+        path.write_text(
+            "symbol,action,quantity,price,date\n"
+            "MSFT,sell,5,420,2024-02-01\n"
+            "MSFT,buy,10,400,2024-01-02\n"
+            "AAPL,sell,1,200,2024-01-03\n"
+            "NOPE,buy,1,1,2024-01-03\n"
+        )
+
+        with patch("portfolio.validate_tickers", return_value={"MSFT", "AAPL"}):
+            imported, rejects = import_file(store, "Main", str(path))
+
+        assert imported == 2
+        assert [(r.line, r.ticker) for r in rejects] == [(4, "AAPL"), (5, "NOPE")]
+        position = store.get_portfolio("Main").positions["MSFT"]
+        assert (position.quantity, position.realized_pnl) == (5, pytest.approx(100.0))
+
+
+class TestQuoteCache:
+    """Test batched quotes with the shared memory/disk cache."""
+
+    @staticmethod
+    def _download(*args, **kwargs):
+        tickers = args[0]
+        columns = pd.MultiIndex.from_product([tickers, ["Close"]])
+        return pd.DataFrame([[100.0] * len(tickers), [110.0] * len(tickers)], columns=columns)
+
+    def test_one_batch_then_cached(self, tmp_path):
+        path = tmp_path / "quotes.json"
+        with patch("yfinance.download", side_effect=self._download) as mock_download, \
+                patch.dict("quotes._MEMORY", clear=True):
+            quotes = get_quotes(["AAPL", "msft", "AAPL"], path=path)
+            assert list(quotes) == ["AAPL", "MSFT"]
+            assert quotes["AAPL"].price == 110.0
+            assert quotes["AAPL"].change_pct == pytest.approx(10.0)
+
+            get_quotes(["MSFT"], path=path)
+            assert mock_download.call_count == 1
+
+            # New process: memory is empty, disk cache still fresh
+            quotes_module._MEMORY.clear()
+            get_quotes(["AAPL", "NVDA"], path=path)
+            assert mock_download.call_count == 2
+            assert mock_download.call_args.args[0] == ["NVDA"]
+
+            get_quotes(["AAPL"], max_age=0, path=path)
+            assert mock_download.call_count == 3
+
+    def test_show_portfolio_uses_quotes(self, tmp_path, capsys):
+        from portfolio import show_portfolio
+
+        store = PortfolioStore(path=tmp_path / "portfolios.db")
+        store.create_portfolio("Main")
+        with store.backend.transaction():
+            for ticker in ("AAPL", "MSFT"):
+                store.backend.upsert_asset("main", {"ticker": ticker, "type": "stock", "quantity": 2.0,
+                                                    "cost_basis": 100.0, "added_at": "2024-01-02"})
+
+        with patch("yfinance.Ticker") as mock_ticker, \
+                patch("yfinance.download", side_effect=self._download) as mock_download, \
+                patch("quotes.QUOTE_CACHE_FILE", tmp_path / "quotes.json"), patch.dict("quotes._MEMORY", clear=True):
+            show_portfolio(store.get_portfolio("Main"))
+            mock_ticker.assert_not_called()
+            mock_download.assert_called_once()
+
+        assert "$440.00" in capsys.readouterr().out
+
+
+class TestPortfolioRisk:
+    """Test covariance, VaR, drawdown and beta on aligned returns."""
+
+    @staticmethod
+    def _closes(n_assets=3, days=400, seed=1):
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        dates = pd.date_range(end="2024-06-30", periods=days, freq="D")
+        market = rng.normal(0.0005, 0.01, days)
+        returns = market[:, None] + rng.normal(0, 0.01, (days, n_assets))
+        closes = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=dates,
+                              columns=[f"T{i}" for i in range(n_assets)])
+        spy = pd.Series(100 * np.cumprod(1 + market), index=dates)
+        return closes, spy[spy.index.dayofweek < 5]
+
+    def test_ledoit_wolf_is_well_conditioned(self):
+        import numpy as np
+
+        # More assets than observations: sample covariance is singular
+        returns = np.random.default_rng(0).normal(0, 0.01, (50, 200))
+        covariance, shrinkage = ledoit_wolf(returns)
+
+        assert 0 < shrinkage <= 1
+        assert np.allclose(covariance, covariance.T)
+        assert np.linalg.eigvalsh(covariance).min() > 0
+
+    def test_risk_metrics(self):
+        closes, spy = self._closes()
+        # Holding SPY itself: beta 1, all risk in one asset
+        closes["SPY"] = spy.reindex(closes.index).ffill()
+        risk = compute_portfolio_risk(closes[["SPY"]], {"SPY": 1000.0}, spy)
+
+        assert risk.beta_spy == pytest.approx(1.0)
+        assert risk.risk_contributions == {"SPY": 100.0}
+        assert risk.observations == len(spy) - 1
+        assert risk.var_parametric_pct > 0
+        assert risk.cvar_historical_pct >= risk.var_historical_pct
+
+        risk = compute_portfolio_risk(closes, {"T0": 500.0, "T1": 300.0, "T2": 200.0, "SPY": 0.0}, spy)
+        assert sum(risk.risk_contributions.values()) == pytest.approx(100, abs=0.1)
+        assert risk.excluded == ["SPY"]
+        assert 0.5 < risk.beta_spy < 1.5
+
+    def test_weekend_crypto_moves_land_on_monday(self):
+        dates = pd.date_range("2024-01-01", "2024-03-04", freq="D")
+        crypto = pd.DataFrame({"BTC-USD": 100.0}, index=dates)
+        crypto.loc["2024-03-02":, "BTC-USD"] = 110.0  # Jump on a Saturday
+        spy = pd.Series(400.0, index=dates[dates.dayofweek < 5])
+
+        returns = align_returns(crypto, spy.index)
+        assert (returns.index.dayofweek < 5).all()
+        assert returns.loc["2024-03-04", "BTC-USD"] == pytest.approx(0.1)
+
+        risk = compute_portfolio_risk(crypto, {"BTC-USD": 1.0}, spy)
+        assert risk.as_of == "2024-03-04"
+        assert risk.observations == len(spy) - 1
+        assert risk.max_drawdown_pct == 0
+
+    def test_max_drawdown(self):
+        import numpy as np
+
+        # Wealth 1.1, 0.55, 0.66, 0.594: worst point is right after the peak
+        drawdown, trough = max_drawdown(np.array([0.1, -0.5, 0.2, -0.1]))
+        assert drawdown == pytest.approx(-0.5)
+        assert trough == 1
+
+    def test_cache_keyed_by_day_and_holdings(self, tmp_path):
+        from datetime import date
+
+        closes, spy = self._closes()
+        risk = compute_portfolio_risk(closes, {"T0": 1.0, "T1": 1.0, "T2": 1.0}, spy)
+        path = tmp_path / "risk.json"
+        key = risk_cache_key("Main", [("T0", 1.0), ("T1", 2.0)], date(2024, 6, 30))
+        save_cached_risk(key, risk, path)
+
+        assert load_cached_risk(key, path) == risk
+        assert load_cached_risk(risk_cache_key("Main", [("T0", 1.0), ("T1", 3.0)], date(2024, 6, 30)), path) is None
+
+        # A new day drops yesterday's entries
+        save_cached_risk(risk_cache_key("Main", [("T0", 1.0)], date(2024, 7, 1)), risk, path)
+        assert load_cached_risk(key, path) is None
+
+
+class TestPortfolioIncome:
+    """Test dividend income projections for portfolio holdings."""
+
+    TODAY = pd.Timestamp("2024-06-15")
+
+    @classmethod
+    def _frame(cls):
+        quarters = pd.date_range("2022-02-10", cls.TODAY, freq="QS-FEB") + pd.Timedelta(days=9)
+        monthly = pd.date_range("2023-01-01", cls.TODAY, freq="MS")
+        return pd.concat([
+            # Raised from 1.00 to 1.10 a year ago
+            pd.DataFrame({"ticker": "JNJ", "date": quarters,
+                          "amount": [1.1 if d > cls.TODAY - pd.DateOffset(years=1) else 1.0 for d in quarters]}),
+            pd.DataFrame({"ticker": "O", "date": monthly, "amount": 0.25}),
+            # One special dividend isn't a schedule
+            pd.DataFrame({"ticker": "SPCL", "date": [pd.Timestamp("2024-03-01")], "amount": [5.0]}),
+        ], ignore_index=True)
+
+    def test_schedule_repeats_last_year_at_latest_amount(self):
+        schedule, per_ticker = project_dividends(self._frame(), self.TODAY)
+
+        jnj = schedule[schedule["ticker"] == "JNJ"]
+        assert list(jnj["ex_date"].dt.strftime("%Y-%m-%d")) == ["2024-08-10", "2024-11-10", "2025-02-10", "2025-05-10"]
+        assert (jnj["amount"] == 1.1).all()
+        assert (schedule["ticker"] == "O").sum() == 12
+        assert "SPCL" not in set(schedule["ticker"])
+        assert (schedule["ex_date"] > self.TODAY).all()
+        assert per_ticker.loc["JNJ", "trailing"] == pytest.approx(4.4)
+        assert per_ticker.loc["JNJ", "prior"] == pytest.approx(4.0)
+        assert pd.isna(per_ticker.loc["O", "prior"])
+
+    def test_payment_later_this_month_lands_in_the_last_month(self):
+        # Paid on the 20th: last June's payment would recur on 2024-06-20, before the window
+        dates = pd.date_range("2023-06-01", periods=12, freq="MS") + pd.Timedelta(days=19)
+        schedule, _ = project_dividends(pd.DataFrame({"ticker": "O", "date": dates, "amount": 0.25}), self.TODAY)
+
+        assert len(schedule) == 12
+
+        assert schedule["ex_date"].min() == pd.Timestamp("2024-07-20")
+        assert schedule["ex_date"].max() == pd.Timestamp("2025-06-20")
+
+    def test_portfolio_without_dividend_history(self):
+        schedule, per_ticker = project_dividends(pd.DataFrame(columns=["ticker", "date", "amount"]), self.TODAY)
+        holdings = pd.DataFrame({"quantity": [10.0], "cost": [1500.0]}, index=pd.Index(["AMZN"], name="ticker"))
+
+        income = project_portfolio_income("Growth", holdings, schedule, per_ticker, self.TODAY)
+
+        assert income.projected_income == 0.0
+        assert len(income.monthly) == 12 and all(m["income"] == 0.0 for m in income.monthly)
+        assert income.holdings == [] and income.non_payers == ["AMZN"]
+        assert income.yield_on_cost is None
+
+    def test_portfolio_income_from_cache(self, tmp_path):
+        store = PortfolioStore(path=tmp_path / "portfolios.db")
+        store.create_portfolio("Income")
+        with patch("portfolio._validate_ticker"):
+            store.record_transaction("Income", "JNJ", "buy", 100, 150, date="2022-01-03")
+            store.record_transaction("Income", "O", "buy", 200, 50, date="2022-01-03")
+            store.record_transaction("Income", "AMZN", "buy", 10, 150, date="2022-01-03")
+
+        cache = DividendHistoryCache(tmp_path / "dividends.db")
+        frame = self._frame()
+        for ticker, rows in frame.groupby("ticker"):
+            cache.store(ticker, rows.set_index("date")["amount"], "2024-06-15", full=True)
+
+        # AMZN has never been fetched: only its history is requested
+        mock_stock = Mock()
+        mock_stock.dividends = pd.Series(dtype=float)
+        with patch("yfinance.Ticker", return_value=mock_stock) as mock_ticker, \
+                patch("pandas.Timestamp.now", return_value=self.TODAY):
+            [income] = analyze_portfolio_income(["Income"], store=store, cache=cache)
+            mock_ticker.assert_called_once_with("AMZN")
+
+        assert income.projected_income == pytest.approx(100 * 4.4 + 200 * 3.0)
+        # O only started paying within the earlier year, so growth is JNJ's alone
+        assert income.income_growth == pytest.approx(10.0)
+        assert income.yield_on_cost == pytest.approx(1040 / 25000 * 100)
+        assert sum(m["income"] for m in income.monthly) == pytest.approx(income.projected_income)
+        assert [m["month"] for m in income.monthly] == [str(m) for m in pd.period_range("2024-07", "2025-06", freq="M")]
+        assert next(m for m in income.monthly if m["month"] == "2024-08")["income"] == pytest.approx(160.0)
+        assert [h.ticker for h in income.holdings] == ["O", "JNJ"]
+        assert income.holdings[1].next_ex_date == "2024-08-10"
+        assert income.holdings[1].income_growth == pytest.approx(10.0)
+        assert income.holdings[0].income_growth is None
+        assert income.non_payers == ["AMZN"]
+
+
+class TestDividendScreen:
+    """Test the precomputed dividend screener index."""
+
+    INFOS = {
+        "JNJ": {"regularMarketPrice": 160.0, "dividendYield": 0.03, "dividendRate": 4.8, "trailingEps": 9.6},
+        "T": {"regularMarketPrice": 17.0, "dividendYield": 0.065, "dividendRate": 1.11, "trailingEps": 1.0},
+        "AMZN": {"regularMarketPrice": 180.0, "dividendYield": None, "dividendRate": None},
+    }
+
+    def _ticker(self, symbol):
+        stock = Mock()
+        stock.info = {"longName": symbol, **self.INFOS[symbol]}
+        stock.dividends = pd.Series([1.0] * 28, index=pd.date_range("2018-01-15", periods=28, freq="QS"))
+        return stock
+
+    def test_refresh_only_stale_rows(self, tmp_path):
+        index = DividendScreenIndex(tmp_path / "dividends.db")
+        index.add(["JNJ", "T", "AMZN"])
+        assert index.query() == []
+
+        with patch("dividends.DIVIDEND_CACHE_FILE", tmp_path / "default.db"), \
+                patch("yfinance.Ticker", side_effect=self._ticker) as mock_ticker:
+            assert index.refresh() == (3, 3)
+            assert mock_ticker.call_count == 3
+
+            assert index.refresh() == (0, 0)
+            assert mock_ticker.call_count == 3
+
+            index.add(["JNJ", "T"])  # Already indexed: stays fresh
+            assert index.stale() == []
+            assert index.refresh(max_age=0, tickers=["T"]) == (1, 1)
+            assert mock_ticker.call_args.args == ("T",)
+
+        # Histories live in the index's own database, not the default cache
+        assert DividendHistoryCache(tmp_path / "dividends.db").frame(["JNJ"])["amount"].tolist()
+        assert not (tmp_path / "default.db").exists()
+
+    def test_filter_and_sort_queries(self, tmp_path):
+        index = DividendScreenIndex(tmp_path / "dividends.db")
+        index.add(list(self.INFOS))
+        with patch("dividends.DIVIDEND_CACHE_FILE", tmp_path / "dividends.db"), \
+                patch("yfinance.Ticker", side_effect=self._ticker):
+            index.refresh()
+
+        assert [a.ticker for a in index.query()] == ["T", "JNJ", "AMZN"]
+        assert [a.ticker for a in index.query(min_yield=2.0)] == ["T", "JNJ"]
+        assert [a.ticker for a in index.query(max_payout=60)] == ["JNJ"]
+        assert [a.ticker for a in index.query(sort="payout")] == ["JNJ", "T", "AMZN"]
+        assert [a.ticker for a in index.query(tickers=["AMZN", "JNJ"])] == ["JNJ", "AMZN"]
+        assert [a.ticker for a in index.query(min_rating="poor")] == ["T", "JNJ"]
+        assert len(index.query(limit=1)) == 1
+
+        jnj = index.query(tickers=["JNJ"])[0]
+        assert jnj.payout_ratio == 50.0
+        assert jnj.payment_frequency is None  # Mocked history ends years ago
+
+        index.remove(["T"])
+        assert index.tickers() == ["AMZN", "JNJ"]
+
 
 class TestIntegration:
     """Integration tests (require network)."""